@@ -6,6 +6,7 @@ from django.contrib.auth.models import User
 from rest_framework_simplejwt.tokens import UntypedToken
 from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
 from django.contrib.auth import get_user_model
+from sales.instrumentation import metrics, flush_metrics
 
 logger = logging.getLogger(__name__)
 User = get_user_model()
@@ -21,6 +22,7 @@ class AdminNotificationConsumer(AsyncWebsocketConsumer):
             
             if not token:
                 logger.warning("Connexion WebSocket refusée - pas de token")
+                self.record_connection('rejected')
                 await self.close()
                 return
             
@@ -36,6 +38,7 @@ class AdminNotificationConsumer(AsyncWebsocketConsumer):
                 user = await self.get_user(user_id)
                 if not user or not user.is_staff:
                     logger.warning(f"Connexion WebSocket refusée - utilisateur non autorisé: {user}")
+                    self.record_connection('rejected')
                     await self.close()
                     return
                 
@@ -43,6 +46,7 @@ class AdminNotificationConsumer(AsyncWebsocketConsumer):
                 
             except (InvalidToken, TokenError) as e:
                 logger.warning(f"Token JWT invalide: {e}")
+                self.record_connection('rejected')
                 await self.close()
                 return
             
@@ -54,10 +58,12 @@ class AdminNotificationConsumer(AsyncWebsocketConsumer):
             )
             
             await self.accept()
+            self.record_connection('connect')
             logger.info(f"Admin {self.user.email} connecté aux notifications WebSocket")
             
         except Exception as e:
             logger.error(f"Erreur lors de la connexion WebSocket: {e}")
+            self.record_connection('rejected')
             await self.close()
     
     async def disconnect(self, close_code):
@@ -69,6 +75,10 @@ class AdminNotificationConsumer(AsyncWebsocketConsumer):
                     self.channel_name
                 )
             
+            if getattr(self, 'connected', False):
+                self.connected = False
+                self.record_connection('disconnect')
+            
             if hasattr(self, 'user'):
                 logger.info(f"Admin {self.user.email} déconnecté des notifications WebSocket")
                 
@@ -78,6 +88,7 @@ class AdminNotificationConsumer(AsyncWebsocketConsumer):
     async def receive(self, text_data):
         """Réception de messages du client (optionnel)"""
         try:
+            metrics.inc('websocket_messages_total', labels={'direction': 'in'})
             data = json.loads(text_data)
             logger.info(f"Message reçu du client: {data}")
             
@@ -87,6 +98,7 @@ class AdminNotificationConsumer(AsyncWebsocketConsumer):
                     'type': 'pong',
                     'timestamp': data.get('timestamp')
                 }))
+                metrics.inc('websocket_messages_total', labels={'direction': 'out'})
                 
         except Exception as e:
             logger.error(f"Erreur lors de la réception du message: {e}")
@@ -100,12 +112,23 @@ class AdminNotificationConsumer(AsyncWebsocketConsumer):
                 'type': 'notification',
                 'data': message
             }))
+            metrics.inc('websocket_messages_total', labels={'direction': 'out'})
             
             logger.info(f"Notification envoyée à {self.user.email}: {message['type']}")
             
         except Exception as e:
             logger.error(f"Erreur lors de l'envoi de notification: {e}")
     
+    def record_connection(self, event):
+        """Compteurs de connexions exportés sur /metrics (connect / disconnect / rejected)"""
+        metrics.inc('websocket_connections_total', labels={'event': event})
+        if event == 'connect':
+            self.connected = True
+            metrics.inc_gauge('websocket_connections_active', 1)
+        elif event == 'disconnect':
+            metrics.inc_gauge('websocket_connections_active', -1)
+        flush_metrics()
+    
     @database_sync_to_async
     def get_user(self, user_id):
         """Récupérer l'utilisateur de manière asynchrone"""
@@ -1,19 +1,25 @@
 import os
-import firebase_admin
-from firebase_admin import credentials, auth, messaging
 from django.conf import settings
 import json
 
 class FirebaseConfig:
-    """Configuration Firebase pour les notifications push uniquement (authentification désactivée)"""
+    """
+    Configuration Firebase pour les notifications push uniquement (authentification désactivée)
+    firebase_admin (et google-api-client) n'est importé qu'à la première initialisation
+    """
     
     _app = None
+    _initialization_attempted = False
     
     @classmethod
     def initialize_firebase(cls):
-        """Initialise Firebase avec les credentials"""
-        if cls._app is None:
+        """Initialise Firebase avec les credentials (au premier appel)"""
+        if cls._app is None and not cls._initialization_attempted:
+            cls._initialization_attempted = True
             try:
+                import firebase_admin
+                from firebase_admin import credentials
+                
                 # Chemin vers le fichier de credentials Firebase
                 cred_path = os.path.join(settings.BASE_DIR, 'firebase-credentials.json')
                 
@@ -56,6 +62,8 @@ class FirebaseConfig:
         try:
             cls.initialize_firebase()
             if cls._app:
+                from firebase_admin import messaging
+                
                 message = messaging.Message(
                     notification=messaging.Notification(
                         title=title,
@@ -71,6 +79,3 @@ class FirebaseConfig:
         except Exception as e:
             print(f"❌ Erreur envoi notification: {e}")
             return None
-
-# Initialiser Firebase au démarrage
-FirebaseConfig.initialize_firebase()
@@ -1,7 +1,9 @@
 import os
-import requests
 import logging
 from typing import Optional
+from django.conf import settings
+from .sms_router_service import sms_router
+from .phone_normalizer import phone_normalizer
 
 logger = logging.getLogger(__name__)
 
@@ -10,33 +12,45 @@ class InternationalSMSService:
     
     def __init__(self):
         # Services SMS gratuits internationaux
+        # (URLs surchargeables pour pointer vers des serveurs HTTP locaux en test)
         self.services = [
             {
                 'name': 'Textbelt',
-                'url': 'https://textbelt.com/text',
+                'url': os.getenv('TEXTBELT_API_URL', 'https://textbelt.com/text'),
                 'key': 'textbelt',  # Gratuit: 1 SMS/jour/IP
-                'international': True
+                'international': True,
+                'batch': False
             },
             {
                 'name': 'SMS77',
-                'url': 'https://gateway.sms77.io/api/sms',
+                'url': os.getenv('SMS77_API_URL', 'https://gateway.sms77.io/api/sms'),
                 'key': os.getenv('SMS77_API_KEY', ''),
-                'international': True
+                'international': True,
+                'batch': True  # plusieurs destinataires séparés par des virgules
             },
             {
                 'name': 'SMSApi',
-                'url': 'https://api.smsapi.com/sms.do',
+                'url': os.getenv('SMSAPI_API_URL', 'https://api.smsapi.com/sms.do'),
                 'key': os.getenv('SMSAPI_TOKEN', ''),
-                'international': True
+                'international': True,
+                'batch': True
             }
         ]
+        self.senders = {
+            'Textbelt': self._send_via_textbelt,
+            'SMS77': self._send_via_sms77,
+            'SMSApi': self._send_via_smsapi,
+            'Twilio': self._send_via_twilio,
+        }
     
-    def send_invitation_sms(self, phone_number: str, invitation_url: str, contact_name: str) -> bool:
-        """Envoie un SMS d'invitation international"""
-        
-        formatted_phone = self.format_international_phone(phone_number)
-        
-        message_body = f"""🎉 Hello {contact_name}!
+    @property
+    def timeout(self):
+        """(connexion, lecture) en secondes, au lieu de 30s bloquantes"""
+        return getattr(settings, 'SMS_HTTP_TIMEOUT', (3.05, 10))
+    
+    def build_invitation_message(self, contact_name: str, invitation_url: str) -> str:
+        """Construit le texte du SMS d'invitation"""
+        return f"""🎉 Hello {contact_name}!
 
 You're invited to join Sales Tracker Pro!
 
@@ -45,29 +59,72 @@ Create your account: {invitation_url}
 ⏰ Expires in 7 days.
 
 Sales Tracker Pro"""
-        
-        # Essayer chaque service dans l'ordre
-        for service in self.services:
-            try:
-                if service['name'] == 'Textbelt':
-                    success = self._send_via_textbelt(formatted_phone, message_body, service)
-                elif service['name'] == 'SMS77' and service['key']:
-                    success = self._send_via_sms77(formatted_phone, message_body, service)
-                elif service['name'] == 'SMSApi' and service['key']:
-                    success = self._send_via_smsapi(formatted_phone, message_body, service)
-                else:
-                    continue
-                    
-                if success:
-                    logger.info(f"✅ SMS envoyé via {service['name']} à {formatted_phone}")
-                    return True
-                    
-            except Exception as e:
-                logger.warning(f"⚠️ Échec {service['name']}: {str(e)}")
-                continue
-        
-        logger.error(f"❌ Échec envoi SMS à {phone_number} - Tous les services ont échoué")
-        return False
+    
+    def get_service(self, name: str) -> Optional[dict]:
+        if name == 'Twilio':
+            return {'name': 'Twilio', 'key': 'twilio', 'batch': False}
+        return next((service for service in self.services if service['name'] == name), None)
+    
+    def _available_services(self, providers=None, batch=False):
+        """Services configurés (Textbelt n'a pas besoin de clé), dans l'ordre de préférence"""
+        if providers:
+            services = [self.get_service(name) for name in providers]
+        else:
+            services = self.services
+        return [
+            service for service in services
+            if service and (service['name'] == 'Textbelt' or service['key'])
+            and (not batch or service['batch'])
+        ]
+    
+    def _dispatch(self, recipients: str, message: str, services, rate_limiter=None, hedge_after=None) -> dict:
+        """Confie l'envoi au routeur (ordre par santé, disjoncteurs, tentative de secours)"""
+        by_name = {service['name']: service for service in services}
+        
+        return sms_router.dispatch(
+            list(by_name),
+            lambda name: self.senders[name](recipients, message, by_name[name]),
+            acquire=rate_limiter.try_acquire if rate_limiter else None,
+            hedge_after=hedge_after
+        )
+    
+    def send_message(self, phone_number: str, message: str, providers=None, rate_limiter=None) -> dict:
+        """
+        Envoie un SMS via le meilleur fournisseur disponible.
+        Les fournisseurs dont le seau à jetons est vide ou le circuit ouvert sont sautés ;
+        si tous sont saturés, `retry_in` indique dans combien de secondes réessayer.
+        """
+        formatted_phone = self.format_international_phone(phone_number)
+        result = self._dispatch(formatted_phone, message, self._available_services(providers), rate_limiter)
+        
+        if result['sent']:
+            logger.info(f"✅ SMS envoyé via {result['provider']} à {formatted_phone}")
+        elif result['retry_in'] is not None:
+            logger.info(f"⏳ Fournisseurs SMS saturés pour {formatted_phone}, nouvel essai dans {result['retry_in']:.1f}s")
+        else:
+            logger.error(f"❌ Échec envoi SMS à {phone_number} - Tous les services ont échoué")
+        return result
+    
+    def send_batch(self, phone_numbers, message: str, rate_limiter=None) -> dict:
+        """
+        Envoie le même texte à plusieurs numéros en une requête, via un fournisseur
+        qui accepte plusieurs destinataires (SMS77, SMSApi). Un jeton par requête.
+        """
+        recipients = ','.join(self.format_international_phone(phone) for phone in phone_numbers)
+        services = self._available_services(batch=True)
+        
+        # Pas de tentative de secours : un doublon coûterait un lot entier
+        result = self._dispatch(recipients, message, services, rate_limiter, hedge_after=0)
+        result['batch_supported'] = bool(services)
+        
+        if result['sent']:
+            logger.info(f"✅ Lot de {len(phone_numbers)} SMS envoyé via {result['provider']}")
+        return result
+    
+    def send_invitation_sms(self, phone_number: str, invitation_url: str, contact_name: str) -> bool:
+        """Envoie un SMS d'invitation international (synchrone)"""
+        message_body = self.build_invitation_message(contact_name, invitation_url)
+        return self.send_message(phone_number, message_body)['sent']
     
     def _send_via_textbelt(self, phone: str, message: str, service: dict) -> bool:
         """Envoie via Textbelt (gratuit international)"""
@@ -77,34 +134,16 @@ Sales Tracker Pro"""
             'key': service['key']
         }
         
-        response = requests.post(service['url'], data=payload, timeout=30)
+        response = sms_router.session(service['name']).post(service['url'], data=payload, timeout=self.timeout)
         result = response.json()
         
         return result.get('success', False)
     
     def _send_via_sms77(self, phone: str, message: str, service: dict) -> bool:
         """Envoie via SMS77 (500 SMS gratuits à l'inscription)"""
-        # SMS77 utilise parfois la signing key comme API key
-        # Essayons les deux formats
-        
-        # Format 1: Paramètre 'p' (API key standard)
-        params = {
-            'to': phone,
-            'text': message,
-            'p': service['key']
-        }
-        
-        try:
-            response = requests.post(service['url'], params=params, timeout=30)
-            if response.status_code == 100:
-                return True
-        except:
-            pass
-        
-        # Format 2: Header Authorization (si c'est une signing key)
+        # Une seule requête authentifiée par en-tête ; les erreurs réseau remontent au routeur
         headers = {
-            'X-API-Key': service['key'],
-            'Content-Type': 'application/x-www-form-urlencoded'
+            'X-Api-Key': service['key']
         }
         
         data = {
@@ -112,11 +151,9 @@ Sales Tracker Pro"""
             'text': message
         }
         
-        try:
-            response = requests.post(service['url'], data=data, headers=headers, timeout=30)
-            return response.status_code == 100
-        except:
-            return False
+        response = sms_router.session(service['name']).post(service['url'], data=data, headers=headers, timeout=self.timeout)
+        # SMS77 répond « 100 » dans le corps en cas de succès
+        return response.status_code == 100 or response.text.strip() == '100'
     
     def _send_via_smsapi(self, phone: str, message: str, service: dict) -> bool:
         """Envoie via SMSApi (500 SMS gratuits)"""
@@ -130,38 +167,20 @@ Sales Tracker Pro"""
             'format': 'json'
         }
         
-        response = requests.post(service['url'], data=data, headers=headers, timeout=30)
+        response = sms_router.session(service['name']).post(service['url'], data=data, headers=headers, timeout=self.timeout)
         result = response.json()
         
         return result.get('count', 0) > 0
     
-    def format_international_phone(self, phone_number: str) -> str:
-        """Formate un numéro de téléphone pour l'international"""
-        # Nettoyer le numéro (garder seulement chiffres et +)
-        clean_number = ''.join(c for c in phone_number if c.isdigit() or c == '+')
-        
-        # Si commence déjà par +, c'est bon
-        if clean_number.startswith('+'):
-            return clean_number
-        
-        # Si commence par 00, remplacer par +
-        if clean_number.startswith('00'):
-            return f"+{clean_number[2:]}"
+    def _send_via_twilio(self, phone: str, message: str, service: dict) -> bool:
+        """Envoie via Twilio (codes 2FA)"""
+        from .sms_service import sms_service
         
-        # Formats nationaux spécifiques par pays
-        if clean_number.startswith('0'):
-            # Madagascar : 032, 033, 034, 038 -> +261
-            if len(clean_number) == 10 and clean_number.startswith(('032', '033', '034', '038')):
-                return f"+261{clean_number[1:]}"
-            # France : 06, 07 -> +33
-            elif len(clean_number) == 10 and clean_number.startswith(('06', '07')):
-                return f"+33{clean_number[1:]}"
-            else:
-                logger.warning(f"⚠️ Format national non reconnu: {phone_number}. Utilisez le format international (+261, +33, etc.)")
-                return clean_number
-        
-        # Sinon, ajouter + au début
-        return f"+{clean_number}"
+        return sms_service.send_message(phone, message)
+    
+    def format_international_phone(self, phone_number: str) -> str:
+        """Formate un numéro de téléphone pour l'international (E.164)"""
+        return phone_normalizer.format(phone_number)
 
 # Instance globale
 international_sms_service = InternationalSMSService()
@@ -0,0 +1,261 @@
+import smtplib
+import threading
+import time
+import logging
+from collections import defaultdict
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.mail.backends.smtp import EmailBackend as SMTPEmailBackend
+from django.core.mail.message import sanitize_address
+from django.core.mail.utils import DNS_NAME
+from sales.instrumentation import metrics
+
+logger = logging.getLogger(__name__)
+
+class MailMetrics:
+    """Compteurs de livraison des emails (par processus)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = defaultdict(int)
+        self._send_seconds = 0.0
+
+    def incr(self, name, value=1):
+        with self._lock:
+            self._counters[name] += value
+
+    def record_sent(self, duration):
+        with self._lock:
+            self._counters['sent'] += 1
+            self._send_seconds += duration
+
+    def snapshot(self):
+        """Retourne une copie des compteurs et la latence moyenne d'envoi"""
+        with self._lock:
+            data = dict(self._counters)
+            sent = data.get('sent', 0)
+            data['avg_send_seconds'] = round(self._send_seconds / sent, 4) if sent else 0.0
+        return data
+
+class SMTPConnectionPool:
+    """
+    Pool de connexions SMTP persistantes, partagé par toutes les instances du backend
+    d'un même processus. Une connexion inutilisée depuis plus de `keepalive` secondes
+    est vérifiée par un NOOP avant d'être réutilisée.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._idle = defaultdict(list)
+
+    def acquire(self, key, factory, keepalive):
+        """Retourne une connexion vivante du pool, ou en ouvre une nouvelle"""
+        while True:
+            with self._lock:
+                if not self._idle[key]:
+                    break
+                connection, last_used = self._idle[key].pop()
+
+            if time.monotonic() - last_used < keepalive or self._is_alive(connection):
+                mail_metrics.incr('connections_reused')
+                return connection
+
+            self.discard(connection)
+
+        connection = factory()
+        mail_metrics.incr('connections_opened')
+        return connection
+
+    def release(self, key, connection, max_idle):
+        """Remet une connexion dans le pool (ou la ferme si le pool est plein)"""
+        with self._lock:
+            if len(self._idle[key]) < max_idle:
+                self._idle[key].append((connection, time.monotonic()))
+                return
+        self.discard(connection)
+
+    def discard(self, connection):
+        """Ferme définitivement une connexion"""
+        if connection is None:
+            return
+        mail_metrics.incr('connections_closed')
+        try:
+            connection.quit()
+        except Exception:
+            try:
+                connection.close()
+            except Exception:
+                pass
+
+    def close_all(self):
+        """Ferme toutes les connexions inutilisées du pool"""
+        with self._lock:
+            connections = [connection for idle in self._idle.values() for connection, _ in idle]
+            self._idle.clear()
+        for connection in connections:
+            self.discard(connection)
+
+    @staticmethod
+    def _is_alive(connection):
+        try:
+            return connection.noop()[0] == 250
+        except Exception:
+            return False
+
+def is_transient_smtp_error(exc):
+    """Erreurs pour lesquelles un nouvel essai plus tard a un sens (retry Celery)"""
+    if isinstance(exc, (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError)):
+        return True
+    if isinstance(exc, smtplib.SMTPResponseException):
+        return 400 <= exc.smtp_code < 500
+    # Autres erreurs SMTP (destinataires refusés, etc.) : définitives
+    # Erreurs réseau (socket, TLS) : transitoires
+    return isinstance(exc, OSError) and not isinstance(exc, smtplib.SMTPException)
+
+def _is_connection_lost(exc):
+    """Connexion inutilisable (coupée par le serveur, erreur réseau) : elle doit être jetée"""
+    return isinstance(exc, smtplib.SMTPServerDisconnected) or not isinstance(exc, smtplib.SMTPException)
+
+class PooledSMTPEmailBackend(SMTPEmailBackend):
+    """
+    Backend email Django qui réutilise des connexions SMTP persistantes
+    (une poignée de main TCP + TLS + login par connexion du pool au lieu d'une par email).
+    Une connexion du pool coupée entre-temps est jetée et remplacée une fois, sans attente ;
+    les autres erreurs remontent (les nouveaux essais différés sont ceux de la tâche Celery).
+
+    Réglages (optionnels): EMAIL_POOL_SIZE, EMAIL_POOL_KEEPALIVE
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pool_size = getattr(settings, 'EMAIL_POOL_SIZE', 2)
+        self.keepalive = getattr(settings, 'EMAIL_POOL_KEEPALIVE', 30)
+
+    @property
+    def pool_key(self):
+        return (self.host, self.port, self.username, self.use_tls, self.use_ssl)
+
+    def _connect(self):
+        """Ouvre une nouvelle connexion SMTP (TLS + authentification)"""
+        connection_params = {'local_hostname': DNS_NAME.get_fqdn()}
+        if self.timeout is not None:
+            connection_params['timeout'] = self.timeout
+        if self.use_ssl:
+            connection_params['context'] = self.ssl_context
+
+        connection = self.connection_class(self.host, self.port, **connection_params)
+        if not self.use_ssl and self.use_tls:
+            connection.starttls(context=self.ssl_context)
+        if self.username and self.password:
+            connection.login(self.username, self.password)
+        return connection
+
+    def open(self):
+        if self.connection:
+            return False
+        try:
+            self.connection = smtp_pool.acquire(self.pool_key, self._connect, self.keepalive)
+        except OSError:
+            mail_metrics.incr('connection_errors')
+            if not self.fail_silently:
+                raise
+            return None
+        return True
+
+    def close(self):
+        """Rend la connexion au pool au lieu de la fermer"""
+        if self.connection is None:
+            return
+        connection, self.connection = self.connection, None
+        smtp_pool.release(self.pool_key, connection, self.pool_size)
+
+    def _send(self, email_message):
+        if not email_message.recipients():
+            return False
+        encoding = email_message.encoding or settings.DEFAULT_CHARSET
+        from_email = sanitize_address(email_message.from_email, encoding)
+        recipients = [sanitize_address(addr, encoding) for addr in email_message.recipients()]
+        payload = email_message.message().as_bytes(linesep='\r\n')
+
+        for attempt in range(2):
+            started_at = time.monotonic()
+            try:
+                if self.connection is None:
+                    self.connection = smtp_pool.acquire(self.pool_key, self._connect, self.keepalive)
+                self.connection.sendmail(from_email, recipients, payload)
+            except OSError as exc:
+                lost = _is_connection_lost(exc)
+                if lost:
+                    smtp_pool.discard(self.connection)
+                    self.connection = None
+                if lost and attempt == 0:
+                    # Connexion du pool probablement périmée : une seule reprise, immédiate
+                    mail_metrics.incr('reconnects')
+                    logger.warning(f"🔄 Connexion SMTP perdue ({str(exc)}), reprise sur une nouvelle connexion")
+                    continue
+
+                mail_metrics.incr('failed')
+                logger.error(f"❌ Échec envoi email à {', '.join(recipients)}: {str(exc)}")
+                if not self.fail_silently:
+                    raise
+                return False
+
+            mail_metrics.record_sent(time.monotonic() - started_at)
+            return True
+
+        return False
+
+def _build_message(subject, body, to, html_message=None, from_email=None, connection=None):
+    email = EmailMultiAlternatives(
+        subject=subject,
+        body=body,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        to=to,
+        connection=connection
+    )
+    if html_message:
+        email.attach_alternative(html_message, "text/html")
+    return email
+
+def deliver_email(subject, body, to, html_message=None, from_email=None, fail_silently=False):
+    """Envoi synchrone via le backend email configuré (connexions du pool si PooledSMTPEmailBackend)"""
+    connection = get_connection(fail_silently=fail_silently)
+    return connection.send_messages([
+        _build_message(subject, body, to, html_message, from_email, connection)
+    ]) == 1
+
+def send_transactional_email(subject, body, to, html_message=None, from_email=None, fail_silently=False):
+    """
+    Point d'entrée unique des emails transactionnels (réinitialisation, 2FA, invitations).
+    Met l'email en file d'attente Celery pour ne pas bloquer le worker web sur la latence SMTP ;
+    si la file est indisponible (ou TRANSACTIONAL_EMAIL_ASYNC=False), envoie directement.
+    """
+    if getattr(settings, 'TRANSACTIONAL_EMAIL_ASYNC', True):
+        from .tasks import send_email_async
+        
+        try:
+            send_email_async.delay(subject, body, list(to), html_message, from_email)
+            mail_metrics.incr('queued')
+            return True
+        except Exception as e:
+            logger.warning(f"⚠️ File d'attente email indisponible, envoi direct: {str(e)}")
+
+    try:
+        return deliver_email(subject, body, list(to), html_message, from_email, fail_silently)
+    except Exception:
+        if fail_silently:
+            return False
+        raise
+
+def _mail_metrics_collector():
+    """Compteurs mail_metrics exportés sur /metrics (email_events_total{event})"""
+    return [
+        ('email_events_total', {'event': name}, value)
+        for name, value in mail_metrics.snapshot().items()
+        if name != 'avg_send_seconds'
+    ]
+
+# Instances globales (une par processus)
+mail_metrics = MailMetrics()
+smtp_pool = SMTPConnectionPool()
+metrics.register_collector(_mail_metrics_collector)
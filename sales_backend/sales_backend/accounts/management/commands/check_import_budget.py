@@ -0,0 +1,91 @@
+import os
+import re
+import subprocess
+import sys
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Intégrations lourdes qui ne doivent être importées qu'à la première utilisation
+LAZY_MODULES = (
+    'twilio', 'firebase_admin', 'googleapiclient', 'reportlab', 'qrcode',
+    'pyotp', 'dns.resolver', 'pandas', 'sklearn', 'xhtml2pdf',
+)
+
+# Démarrage mesuré : configuration Django + chargement complet des URLs
+BOOT_SNIPPET = (
+    "import django; django.setup(); "
+    "from django.urls import get_resolver; get_resolver().url_patterns"
+)
+
+_IMPORTTIME_RE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+class Command(BaseCommand):
+    help = (
+        'Mesure (python -X importtime) le coût d\'import de django.setup() + URLs '
+        'et échoue si le budget est dépassé ou si une intégration lourde est importée au démarrage'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--budget-ms',
+            type=float,
+            default=getattr(settings, 'IMPORT_TIME_BUDGET_MS', 1000),
+            help='Budget en millisecondes (défaut: IMPORT_TIME_BUDGET_MS ou 1000)'
+        )
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=10,
+            help='Nombre de modules les plus coûteux à afficher (défaut: 10)'
+        )
+
+    def measure(self):
+        """Lance un interpréteur neuf et retourne {module: (cumulé µs, profondeur)}"""
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', BOOT_SNIPPET],
+            cwd=settings.BASE_DIR,
+            env=os.environ.copy(),
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode != 0:
+            raise CommandError(f'Échec du démarrage mesuré:\n{result.stderr[-2000:]}')
+
+        modules = {}
+        for line in result.stderr.splitlines():
+            match = _IMPORTTIME_RE.match(line)
+            if match:
+                cumulative, indent, name = int(match.group(2)), len(match.group(3)), match.group(4)
+                modules[name] = (cumulative, indent // 2)
+        return modules
+
+    def handle(self, *args, **options):
+        modules = self.measure()
+
+        # Somme des imports de premier niveau = temps d'import total du démarrage
+        total_ms = sum(cumulative for cumulative, depth in modules.values() if depth == 0) / 1000
+        eager = sorted(
+            name for name in modules
+            if any(name == lazy or name.startswith(lazy + '.') for lazy in LAZY_MODULES)
+        )
+
+        self.stdout.write(f'⏱️ Imports au démarrage: {total_ms:.0f} ms (budget {options["budget_ms"]:.0f} ms)')
+        project_modules = sorted(
+            ((cumulative, name) for name, (cumulative, depth) in modules.items()
+             if name.split('.')[0] in ('accounts', 'sales', 'sales_tracker')),
+            reverse=True
+        )
+        for cumulative, name in project_modules[:options['top']]:
+            self.stdout.write(f'   {cumulative / 1000:8.1f} ms  {name}')
+
+        errors = []
+        if eager:
+            roots = sorted({name.split('.')[0] if name.split('.')[0] != 'dns' else 'dns.resolver' for name in eager})
+            errors.append(f'Intégrations importées au démarrage: {", ".join(roots)}')
+        if total_ms > options['budget_ms']:
+            errors.append(f'Budget dépassé: {total_ms:.0f} ms > {options["budget_ms"]:.0f} ms')
+
+        if errors:
+            raise CommandError(' ; '.join(errors))
+
+        self.stdout.write(self.style.SUCCESS('✅ Budget d\'import respecté'))
@@ -0,0 +1,128 @@
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test.utils import override_settings
+from rest_framework.test import APIClient
+from accounts.models import UserProfile
+from sales.models import ModelProfile, DailySale, UserSession
+from sales.query_budget import QueryRecorder
+
+# (nom, URL, client 'api' (JWT forcé) ou 'admin' (session), budget de requêtes SQL)
+# Le budget inclut les middlewares (session, UserActivityMiddleware).
+ENDPOINT_BUDGETS = (
+    ('modelprofiles', '/api/modelprofiles/', 'api', 3),
+    ('dailysales', '/api/dailysales/', 'api', 1),
+    ('users', '/api/users/', 'api', 1),
+    ('admin-models', '/api/admin/models/', 'api', 2),
+    ('admin-users', '/api/admin/users/', 'api', 1),
+    ('admin-sales', '/api/admin/sales/', 'api', 1),
+    ('admin-sales-stats', '/api/admin/sales/stats/', 'api', 4),
+    ('admin-users-overall-stats', '/api/admin/users/overall_stats/', 'api', 6),
+    ('changelist-modelprofile', '/admin/sales/modelprofile/', 'admin', 8),
+    ('changelist-dailysale', '/admin/sales/dailysale/', 'admin', 11),
+    ('changelist-user', '/admin/auth/user/', 'admin', 8),
+)
+
+class Command(BaseCommand):
+    help = (
+        'Vérifie le nombre de requêtes SQL des listes API et des pages admin : budget fixe par endpoint '
+        'et nombre identique quel que soit le volume de données (détection des N+1). '
+        'Les données générées sont annulées (rollback) à la fin.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=20, help='Utilisateurs clients au grand volume (défaut: 20)')
+        parser.add_argument('--models', type=int, default=5, help='Modèles par utilisateur (défaut: 5)')
+        parser.add_argument('--days', type=int, default=90, help='Jours de ventes par modèle (défaut: 90)')
+        parser.add_argument('--seed', type=int, default=42, help='Graine aléatoire (défaut: 42)')
+
+    def seed(self, admin, users, models_per_user, days, rng):
+        """Ajoute `users` utilisateurs créés par admin, avec leurs modèles, ventes et sessions"""
+        start = User.objects.filter(username__startswith='qb-client-').count()
+        today = date.today()
+        created_users = []
+
+        for index in range(start, start + users):
+            user = User.objects.create_user(
+                username=f'qb-client-{index}', email=f'qb-client-{index}@example.com', password=None
+            )
+            created_users.append(user)
+        UserProfile.objects.filter(user__in=created_users).update(created_by=admin)
+        UserSession.objects.bulk_create(
+            UserSession(user=user, is_online=rng.random() < 0.5) for user in created_users[::2]
+        )
+
+        profiles = ModelProfile.objects.bulk_create(
+            ModelProfile(owner=owner, created_by=admin, first_name=f'Model{index}', last_name=owner.username)
+            for owner in [admin] + created_users
+            for index in range(models_per_user)
+        )
+        DailySale.objects.bulk_create(
+            (
+                DailySale(
+                    model_profile=profile,
+                    date=today - timedelta(days=day),
+                    amount_usd=Decimal(rng.randint(500, 50000)) / 100
+                )
+                for profile in profiles
+                for day in range(days)
+            ),
+            batch_size=5000
+        )
+
+    def measure(self, clients):
+        counts = {}
+        for name, url, client_name, budget in ENDPOINT_BUDGETS:
+            with QueryRecorder() as recorder:
+                response = clients[client_name].get(url)
+            if response.status_code != 200:
+                raise CommandError(f'{name}: {url} a répondu {response.status_code}')
+            counts[name] = recorder
+        return counts
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        errors = []
+
+        with override_settings(ALLOWED_HOSTS=['*'], QUERY_BUDGET_STRICT=False), transaction.atomic():
+            admin = User.objects.create_superuser(
+                username='qb-admin', email='qb-admin@example.com', password=None
+            )
+            api_client = APIClient()
+            api_client.force_authenticate(admin)
+            admin_client = APIClient()
+            admin_client.force_login(admin)
+            clients = {'api': api_client, 'admin': admin_client}
+
+            # Petit volume puis grand volume : un nombre de requêtes qui grandit trahit un N+1
+            self.seed(admin, 2, 2, 5, rng)
+            small = self.measure(clients)
+            self.seed(admin, options['users'], options['models'], options['days'], rng)
+            large = self.measure(clients)
+
+            self.stdout.write(
+                f'📊 Volume: {User.objects.count()} utilisateurs, {ModelProfile.objects.count()} modèles, '
+                f'{DailySale.objects.count()} ventes'
+            )
+            for name, url, client_name, budget in ENDPOINT_BUDGETS:
+                small_count, recorder = small[name].count, large[name]
+                status = '✅'
+                if recorder.count != small_count:
+                    status = '❌'
+                    errors.append(f'{name}: {small_count} -> {recorder.count} requêtes selon le volume (N+1)')
+                if recorder.count > budget:
+                    status = '❌'
+                    errors.append(f'{name}: {recorder.count} requêtes > budget {budget}')
+                self.stdout.write(f'   {status} {name:<30} {recorder.count:>3} / {budget:<3} {url}')
+                if status == '❌':
+                    self.stdout.write(recorder.report())
+
+            transaction.set_rollback(True)
+
+        if errors:
+            raise CommandError(' ; '.join(errors))
+
+        self.stdout.write(self.style.SUCCESS('✅ Budgets de requêtes respectés'))
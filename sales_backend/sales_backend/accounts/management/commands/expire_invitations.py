@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from accounts.models import ClientInvitation
+from accounts.tasks import expire_stale_invitations, notify_admins_invitations_expired
+
+class Command(BaseCommand):
+    help = 'Passe au statut "expired" les invitations dont la date d\'expiration est dépassée'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Nombre d\'invitations mises à jour par UPDATE (défaut: 1000)'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Affiche le nombre d\'invitations concernées sans les modifier'
+        )
+
+    def handle(self, *args, **options):
+        stale = ClientInvitation.objects.filter(
+            status__in=ClientInvitation.ACTIVE_STATUSES,
+            expires_at__lt=timezone.now()
+        )
+        
+        if options['dry_run']:
+            self.stdout.write(f'📊 {stale.count()} invitations à expirer (dry-run, aucune modification)')
+            return
+        
+        expired_count = expire_stale_invitations(batch_size=options['batch_size'])
+        
+        if expired_count:
+            notify_admins_invitations_expired(expired_count)
+        
+        remaining = ClientInvitation.objects.filter(status__in=ClientInvitation.ACTIVE_STATUSES).count()
+        self.stdout.write(self.style.SUCCESS(f'✅ {expired_count} invitations expirées'))
+        self.stdout.write(f'   📨 Invitations encore actives: {remaining}')
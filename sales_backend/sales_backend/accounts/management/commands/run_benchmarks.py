@@ -0,0 +1,202 @@
+import json
+import logging
+import os
+import random
+import time
+from datetime import date
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import override_settings
+from accounts.management.commands.seed_load_data import Command as SeedCommand, DEFAULT_PASSWORD
+from sales.query_budget import QueryRecorder
+
+# Volumes des jeux de données : (clients de l'admin, modèles par utilisateur, années de ventes)
+SCALES = {
+    'small': (5, 2, 0.5),
+    'medium': (20, 5, 1),
+    'large': (50, 5, 3),
+}
+
+# (nom, méthode, URL, authentification) ; {model_id} est remplacé par un modèle de l'admin
+BENCHMARKS = (
+    ('token', 'post', '/api/token/', None),
+    ('modelprofiles-list', 'get', '/api/modelprofiles/', 'jwt'),
+    ('dailysales-list', 'get', '/api/dailysales/?model_profile={model_id}', 'jwt'),
+    ('dailysales-create', 'post', '/api/dailysales/', 'jwt'),
+    ('stats', 'get', '/api/modelprofiles/{model_id}/stats/', 'jwt'),
+    ('pdf', 'get', '/api/dailysales/stats/pdf/?model_id={model_id}', 'jwt'),
+    ('admin-users-list', 'get', '/api/admin/users/', 'jwt'),
+    ('changelist-modelprofile', 'get', '/admin/sales/modelprofile/', 'session'),
+    ('changelist-dailysale', 'get', '/admin/sales/dailysale/', 'session'),
+    ('changelist-user', 'get', '/admin/auth/user/', 'session'),
+)
+
+DEFAULT_BASELINE_PATH = os.path.join(settings.BASE_DIR, 'benchmark_baseline.json')
+
+def percentile(sorted_values, fraction):
+    """Percentile par interpolation linéaire sur une liste triée"""
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark en processus (client de test Django) des endpoints chauds et des pages admin '
+        'sur des jeux de données de taille croissante : percentiles de latence et nombre de requêtes SQL, '
+        'comparés à une référence enregistrée. Les données générées sont annulées (rollback).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scales', default='small,medium', help=f'Volumes à mesurer parmi {", ".join(SCALES)} (défaut: small,medium)')
+        parser.add_argument('--iterations', type=int, default=20, help='Mesures par endpoint (défaut: 20)')
+        parser.add_argument('--warmup', type=int, default=2, help='Appels de chauffe non mesurés (défaut: 2)')
+        parser.add_argument('--only', default='', help='Endpoints à mesurer, séparés par des virgules (défaut: tous)')
+        parser.add_argument('--baseline', default=DEFAULT_BASELINE_PATH, help='Fichier de référence JSON')
+        parser.add_argument('--save-baseline', action='store_true', help='Enregistre les résultats comme nouvelle référence')
+        parser.add_argument(
+            '--tolerance', type=float, default=0.25,
+            help='Hausse relative du p95 tolérée avant de signaler une régression (défaut: 0.25)'
+        )
+        parser.add_argument(
+            '--min-delta-ms', type=float, default=2.0,
+            help='Hausse absolue du p95 ignorée (bruit de mesure, défaut: 2 ms)'
+        )
+        parser.add_argument('--seed', type=int, default=42, help='Graine des données générées (défaut: 42)')
+
+    def seed(self, scale, seed):
+        """Admin (superuser) avec ses clients, modèles et ventes ; retourne (admin, modèle mesuré, nb utilisateurs, nb modèles)"""
+        users_per_admin, models_per_user, years = SCALES[scale]
+        seeder = SeedCommand()
+        admins, clients = seeder.create_users(f'bench-{scale}', 1, users_per_admin)
+        admin = admins[0]
+        admin.is_superuser = True
+        admin.save(update_fields=['is_superuser'])
+
+        profiles = seeder.create_model_profiles(admins + clients, models_per_user, random.Random(seed))
+        insert = seeder.copy_sales if connection.vendor == 'postgresql' else seeder.bulk_create_sales
+        for batch in seeder.batched(seeder.generate_sales(profiles, max(1, int(years * 365)), seed), 50000):
+            insert(batch)
+
+        return admin, profiles[0], len(clients) + 1, len(profiles)
+
+    def build_clients(self, admin):
+        anonymous = Client()
+        response = anonymous.post('/api/token/', {'username': admin.username, 'password': DEFAULT_PASSWORD})
+        if response.status_code != 200:
+            raise CommandError(f'Connexion impossible pour {admin.username}: {response.status_code}')
+        jwt = Client(HTTP_AUTHORIZATION=f'Bearer {response.json()["access"]}')
+        session = Client()
+        session.force_login(admin)
+        return {None: anonymous, 'jwt': jwt, 'session': session}
+
+    def request(self, clients, name, method, url, auth, admin, model):
+        client = clients[auth]
+        url = url.format(model_id=model.id)
+        if name == 'token':
+            return client.post(url, {'username': admin.username, 'password': DEFAULT_PASSWORD})
+        if name == 'dailysales-create':
+            return client.post(url, {'model_profile': model.id, 'date': date.today().isoformat(), 'amount_usd': '123.45'})
+        return getattr(client, method)(url)
+
+    def run_scale(self, scale, options, selected):
+        results = {}
+        admin, model, users, models = self.seed(scale, options['seed'])
+        clients = self.build_clients(admin)
+        self.stdout.write(f'\n📦 {scale}: {users} utilisateurs, {models} modèles, {model.daily_sales.count():,} ventes par modèle mesuré')
+
+        for name, method, url, auth in BENCHMARKS:
+            if selected and name not in selected:
+                continue
+
+            durations = []
+            recorder = None
+            for iteration in range(options['warmup'] + options['iterations']):
+                with QueryRecorder() as recorder:
+                    started_at = time.perf_counter()
+                    response = self.request(clients, name, method, url, auth, admin, model)
+                    duration = time.perf_counter() - started_at
+                if response.status_code >= 400:
+                    raise CommandError(f'{scale}/{name}: {url} a répondu {response.status_code}')
+                if iteration >= options['warmup']:
+                    durations.append(duration * 1000)
+
+            durations.sort()
+            results[name] = {
+                'p50_ms': round(percentile(durations, 0.5), 2),
+                'p95_ms': round(percentile(durations, 0.95), 2),
+                'p99_ms': round(percentile(durations, 0.99), 2),
+                'queries': recorder.count,
+            }
+        return results
+
+    def compare(self, results, baseline, options):
+        """Régression : p95 au-delà de la tolérance (et du bruit), ou requêtes SQL supplémentaires"""
+        regressions = []
+        for scale, endpoints in results.items():
+            for name, current in endpoints.items():
+                reference = baseline.get(scale, {}).get(name)
+                if not reference:
+                    continue
+                limit = max(reference['p95_ms'] * (1 + options['tolerance']), reference['p95_ms'] + options['min_delta_ms'])
+                if current['p95_ms'] > limit:
+                    regressions.append(f'{scale}/{name}: p95 {reference["p95_ms"]:.1f} -> {current["p95_ms"]:.1f} ms')
+                if current['queries'] > reference['queries']:
+                    regressions.append(f'{scale}/{name}: {reference["queries"]} -> {current["queries"]} requêtes SQL')
+        return regressions
+
+    def handle(self, *args, **options):
+        scales = [scale.strip() for scale in options['scales'].split(',') if scale.strip()]
+        unknown = [scale for scale in scales if scale not in SCALES]
+        if unknown:
+            raise CommandError(f'Volumes inconnus: {", ".join(unknown)}')
+        selected = {name.strip() for name in options['only'].split(',') if name.strip()}
+
+        baseline = {}
+        if os.path.exists(options['baseline']):
+            with open(options['baseline']) as handle:
+                baseline = json.load(handle)
+
+        results = {}
+        # Les logs par requête (performance, activité) fausseraient les mesures
+        logging.disable(logging.WARNING)
+        try:
+            for scale in scales:
+                with override_settings(ALLOWED_HOSTS=['*']), transaction.atomic():
+                    results[scale] = self.run_scale(scale, options, selected)
+                    transaction.set_rollback(True)
+        finally:
+            logging.disable(logging.NOTSET)
+
+        for scale, endpoints in results.items():
+            self.stdout.write(f'\n⏱️ {scale}' + ' ' * 22 + 'p50 ms   p95 ms   p99 ms   SQL   réf. p95')
+            for name, current in endpoints.items():
+                reference = baseline.get(scale, {}).get(name)
+                reference_p95 = f'{reference["p95_ms"]:8.1f}' if reference else '       -'
+                self.stdout.write(
+                    f'   {name:<26}{current["p50_ms"]:8.1f} {current["p95_ms"]:8.1f} {current["p99_ms"]:8.1f} '
+                    f'{current["queries"]:5}  {reference_p95}'
+                )
+
+        if options['save_baseline']:
+            # Fusion : un run partiel (--scales / --only) ne remplace que ses mesures
+            merged = {scale: dict(endpoints) for scale, endpoints in baseline.items()}
+            for scale, endpoints in results.items():
+                merged.setdefault(scale, {}).update(endpoints)
+            with open(options['baseline'], 'w') as handle:
+                json.dump(merged, handle, indent=2, sort_keys=True)
+            self.stdout.write(self.style.SUCCESS(f'\n✅ Référence enregistrée: {options["baseline"]}'))
+            return
+
+        if not baseline:
+            self.stdout.write(f'\nℹ️ Aucune référence ({options["baseline"]}) : lancez avec --save-baseline pour en créer une')
+            return
+
+        regressions = self.compare(results, baseline, options)
+        if regressions:
+            raise CommandError('Régressions de performance:\n' + '\n'.join(regressions))
+        self.stdout.write(self.style.SUCCESS('\n✅ Aucune régression par rapport à la référence'))
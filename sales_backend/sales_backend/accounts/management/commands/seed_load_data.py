@@ -0,0 +1,199 @@
+import io
+import math
+import random
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from accounts.models import UserProfile
+from sales.models import ModelProfile, DailySale
+
+# Activité relative par jour de semaine (lundi -> dimanche)
+WEEKDAY_FACTORS = (0.82, 0.88, 0.93, 1.0, 1.18, 1.32, 1.12)
+
+# Probabilité qu'un jour n'ait aucune vente (lundi -> dimanche)
+WEEKDAY_ZERO_PROBABILITY = (0.12, 0.1, 0.08, 0.07, 0.05, 0.04, 0.09)
+
+# Mot de passe commun des comptes générés (haché une seule fois)
+DEFAULT_PASSWORD = 'loadtest123'
+
+FIRST_NAMES = ('Emma', 'Sophie', 'Clara', 'Léa', 'Chloé', 'Manon', 'Camille', 'Inès', 'Jade', 'Louise', 'Alice', 'Lina')
+LAST_NAMES = ('Martin', 'Bernard', 'Dubois', 'Laurent', 'Moreau', 'Simon', 'Michel', 'Garcia', 'Rakoto', 'Rabe')
+
+class Command(BaseCommand):
+    help = (
+        'Génère un jeu de données de charge (admins, clients, modèles, années de ventes avec '
+        'saisonnalité hebdomadaire et annuelle), déterministe pour une graine donnée. '
+        'Ventes insérées par COPY sur PostgreSQL, par bulk_create sinon.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--admins', type=int, default=5, help='Nombre d\'admins (défaut: 5)')
+        parser.add_argument('--users-per-admin', type=int, default=20, help='Clients créés par admin (défaut: 20)')
+        parser.add_argument('--models-per-user', type=int, default=5, help='Modèles par utilisateur (défaut: 5)')
+        parser.add_argument('--years', type=float, default=2, help='Années de ventes jusqu\'à aujourd\'hui (défaut: 2)')
+        parser.add_argument('--seed', type=int, default=42, help='Graine aléatoire (défaut: 42)')
+        parser.add_argument('--batch-size', type=int, default=50000, help='Lignes de ventes par lot (défaut: 50000)')
+        parser.add_argument(
+            '--method', choices=('auto', 'copy', 'bulk'), default='auto',
+            help='Insertion des ventes : COPY (PostgreSQL), bulk_create, ou auto (défaut)'
+        )
+        parser.add_argument('--prefix', default='load', help='Préfixe des noms d\'utilisateurs générés (défaut: load)')
+        parser.add_argument('--clear', action='store_true', help='Supprime d\'abord les données générées avec ce préfixe')
+
+    def handle(self, *args, **options):
+        prefix = options['prefix']
+        method = options['method']
+        if method == 'auto':
+            method = 'copy' if connection.vendor == 'postgresql' else 'bulk'
+        if method == 'copy' and connection.vendor != 'postgresql':
+            raise CommandError('--method copy nécessite PostgreSQL')
+
+        if options['clear']:
+            self.clear(prefix)
+        elif User.objects.filter(username__startswith=f'{prefix}-').exists():
+            raise CommandError(f'Des utilisateurs "{prefix}-*" existent déjà : utilisez --clear ou un autre --prefix')
+
+        started_at = time.monotonic()
+        rng = random.Random(options['seed'])
+
+        with transaction.atomic():
+            admins, clients = self.create_users(prefix, options['admins'], options['users_per_admin'])
+            profiles = self.create_model_profiles(admins + clients, options['models_per_user'], rng)
+        self.stdout.write(
+            f'👥 {len(admins)} admins, {len(clients)} clients, {len(profiles)} modèles '
+            f'({time.monotonic() - started_at:.1f}s)'
+        )
+
+        days = max(1, int(options['years'] * 365))
+        insert = self.copy_sales if method == 'copy' else self.bulk_create_sales
+        total = 0
+        sales_started_at = time.monotonic()
+
+        for batch in self.batched(self.generate_sales(profiles, days, options['seed']), options['batch_size']):
+            with transaction.atomic():
+                insert(batch)
+            total += len(batch)
+            elapsed = time.monotonic() - sales_started_at
+            self.stdout.write(f'   💰 {total:,} ventes ({total / elapsed:,.0f} lignes/s)')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {total:,} ventes sur {days} jours insérées par {method} en {time.monotonic() - started_at:.1f}s'
+        ))
+
+    def clear(self, prefix):
+        """Supprime ventes, modèles puis comptes générés (DELETE en masse, sans chargement en mémoire)"""
+        owners = User.objects.filter(username__startswith=f'{prefix}-')
+        deleted_sales, _ = DailySale.objects.filter(model_profile__owner__in=owners).delete()
+        ModelProfile.objects.filter(owner__in=owners).delete()
+        deleted_users, _ = owners.delete()
+        self.stdout.write(f'🧹 {deleted_sales:,} ventes et les comptes "{prefix}-*" supprimés')
+
+    def create_users(self, prefix, admin_count, users_per_admin):
+        """Comptes et profils en bulk_create (les signaux post_save ne sont pas déclenchés)"""
+        password = make_password(DEFAULT_PASSWORD)
+        now = timezone.now()
+
+        admins = User.objects.bulk_create(
+            User(
+                username=f'{prefix}-admin-{index}', email=f'{prefix}-admin-{index}@example.com',
+                password=password, is_staff=True, date_joined=now
+            )
+            for index in range(admin_count)
+        )
+        clients = User.objects.bulk_create(
+            User(
+                username=f'{prefix}-client-{admin_index}-{index}',
+                email=f'{prefix}-client-{admin_index}-{index}@example.com',
+                password=password, date_joined=now
+            )
+            for admin_index in range(admin_count)
+            for index in range(users_per_admin)
+        )
+
+        # bulk_create ne renvoie les clés primaires que sur certains SGBD
+        if admins and admins[0].pk is None:
+            admins = list(User.objects.filter(username__startswith=f'{prefix}-admin-').order_by('id'))
+            clients = list(User.objects.filter(username__startswith=f'{prefix}-client-').order_by('id'))
+
+        UserProfile.objects.bulk_create(
+            [UserProfile(user=admin) for admin in admins]
+            + [UserProfile(user=client, created_by=admins[index // users_per_admin]) for index, client in enumerate(clients)],
+            batch_size=5000
+        )
+        return admins, clients
+
+    def create_model_profiles(self, owners, models_per_user, rng):
+        profiles = ModelProfile.objects.bulk_create(
+            (
+                ModelProfile(
+                    owner=owner, created_by=owner,
+                    first_name=rng.choice(FIRST_NAMES), last_name=rng.choice(LAST_NAMES)
+                )
+                for owner in owners
+                for _ in range(models_per_user)
+            ),
+            batch_size=5000
+        )
+        if profiles and profiles[0].pk is None:
+            profiles = list(ModelProfile.objects.filter(owner__in=owners).order_by('id'))
+        return profiles
+
+    def generate_sales(self, profiles, days, seed):
+        """
+        (model_profile_id, date, montant) : niveau propre à chaque modèle, tendance de croissance,
+        saisonnalité hebdomadaire et annuelle (pic de décembre), bruit log-normal.
+        Un générateur par modèle (graine + rang du modèle) : les données ne dépendent ni de la taille
+        des lots ni des clés primaires attribuées.
+        """
+        first_day = date.today() - timedelta(days=days - 1)
+
+        for index, profile in enumerate(profiles):
+            rng = random.Random(f'{seed}-{index}')
+            base = rng.lognormvariate(math.log(120), 0.6)
+            growth = rng.uniform(-0.1, 0.4) / 365
+
+            for offset in range(days):
+                day = first_day + timedelta(days=offset)
+                weekday = day.weekday()
+                if rng.random() < WEEKDAY_ZERO_PROBABILITY[weekday]:
+                    continue
+
+                day_of_year = day.timetuple().tm_yday
+                seasonal = 1 + 0.12 * math.sin(2 * math.pi * (day_of_year - 80) / 365) + (0.25 if day.month == 12 else 0)
+                amount = base * (1 + growth * offset) * WEEKDAY_FACTORS[weekday] * seasonal * rng.lognormvariate(0, 0.3)
+                yield profile.pk, day, round(max(amount, 1.0), 2)
+
+    @staticmethod
+    def batched(rows, size):
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def bulk_create_sales(self, batch):
+        DailySale.objects.bulk_create(
+            DailySale(model_profile_id=model_id, date=day, amount_usd=Decimal(f'{amount:.2f}'))
+            for model_id, day, amount in batch
+        )
+
+    def copy_sales(self, batch):
+        """COPY FROM STDIN (psycopg2) : aucune instanciation de modèle Django"""
+        created_at = timezone.now().isoformat()
+        buffer = io.StringIO()
+        buffer.writelines(f'{model_id}\t{day.isoformat()}\t{amount:.2f}\t{created_at}\n' for model_id, day, amount in batch)
+        buffer.seek(0)
+
+        with connection.cursor() as cursor:
+            cursor.copy_expert(
+                f'COPY {DailySale._meta.db_table} (model_profile_id, date, amount_usd, created_at) FROM STDIN',
+                buffer
+            )
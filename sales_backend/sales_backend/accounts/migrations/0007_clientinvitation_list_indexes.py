@@ -0,0 +1,23 @@
+# Generated by Django 5.1.4 on 2026-10-19 11:11
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_contactmessage'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='clientinvitation',
+            index=models.Index(fields=['owner', 'status', 'expires_at'], name='clientinv_owner_status_exp_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='clientinvitation',
+            index=models.Index(fields=['sent_by', 'status', 'expires_at'], name='clientinv_sent_status_exp_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.4 on 2026-10-19 11:11
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_clientinvitation_list_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='clientinvitation',
+            index=models.Index(fields=['status', 'expires_at'], name='clientinv_status_exp_idx'),
+        ),
+    ]
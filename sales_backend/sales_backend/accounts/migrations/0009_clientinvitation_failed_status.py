@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-19 11:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0008_clientinvitation_status_expiry_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='clientinvitation',
+            name='status',
+            field=models.CharField(choices=[('pending', 'En attente'), ('sent', 'Envoyée'), ('failed', "Échec d'envoi"), ('used', 'Utilisée'), ('expired', 'Expirée'), ('cancelled', 'Annulée')], default='pending', max_length=20),
+        ),
+    ]
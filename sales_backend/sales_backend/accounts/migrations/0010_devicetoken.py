@@ -0,0 +1,47 @@
+# Generated by Django 5.1.4 on 2026-10-19 11:21
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def copy_profile_fcm_tokens(apps, schema_editor):
+    """Reprend les tokens FCM existants (UserProfile.fcm_token) dans le registre d'appareils"""
+    UserProfile = apps.get_model('accounts', 'UserProfile')
+    DeviceToken = apps.get_model('accounts', 'DeviceToken')
+
+    seen = set()
+    devices = []
+    for user_id, token in UserProfile.objects.exclude(fcm_token__isnull=True).exclude(fcm_token='').values_list('user_id', 'fcm_token'):
+        if token not in seen:
+            seen.add(token)
+            devices.append(DeviceToken(user_id=user_id, token=token))
+    DeviceToken.objects.bulk_create(devices, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0009_clientinvitation_failed_status'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeviceToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=255, unique=True)),
+                ('platform', models.CharField(choices=[('web', 'Web'), ('android', 'Android'), ('ios', 'iOS')], default='web', max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_seen_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='device_tokens', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Appareil (push)',
+                'verbose_name_plural': 'Appareils (push)',
+                'ordering': ['-last_seen_at'],
+            },
+        ),
+        migrations.RunPython(copy_profile_fcm_tokens, migrations.RunPython.noop),
+    ]
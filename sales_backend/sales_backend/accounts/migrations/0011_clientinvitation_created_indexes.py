@@ -0,0 +1,27 @@
+# Generated by Django 5.1.4 on 2026-10-19 12:07
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0010_devicetoken'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='clientinvitation',
+            index=models.Index(fields=['owner', '-created_at'], name='clientinv_owner_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='clientinvitation',
+            index=models.Index(fields=['sent_by', '-created_at'], name='clientinv_sent_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='clientinvitation',
+            index=models.Index(fields=['-created_at'], name='clientinv_created_idx'),
+        ),
+    ]
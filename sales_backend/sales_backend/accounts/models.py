@@ -114,6 +114,7 @@ class ClientInvitation(models.Model):
     STATUS_CHOICES = [
         ('pending', 'En attente'),
         ('sent', 'Envoyée'),
+        ('failed', 'Échec d\'envoi'),
         ('used', 'Utilisée'),
         ('expired', 'Expirée'),
         ('cancelled', 'Annulée'),
@@ -124,6 +125,9 @@ class ClientInvitation(models.Model):
         ('sms', 'SMS'),
     ]
     
+    # Statuts d'une invitation encore utilisable (si non expirée)
+    ACTIVE_STATUSES = ['pending', 'sent']
+    
     # Informations du contact original
     contact_name = models.CharField(max_length=100)
     contact_email = models.EmailField(blank=True, null=True)  # Optionnel pour SMS
@@ -158,6 +162,17 @@ class ClientInvitation(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Liste paginée / filtrée des invitations par admin
+            models.Index(fields=['owner', 'status', 'expires_at'], name='clientinv_owner_status_exp_idx'),
+            models.Index(fields=['sent_by', 'status', 'expires_at'], name='clientinv_sent_status_exp_idx'),
+            # Tri par défaut (-created_at) de la liste, globale ou par admin
+            models.Index(fields=['owner', '-created_at'], name='clientinv_owner_created_idx'),
+            models.Index(fields=['sent_by', '-created_at'], name='clientinv_sent_created_idx'),
+            models.Index(fields=['-created_at'], name='clientinv_created_idx'),
+            # Balayage des invitations expirées et comptages par statut
+            models.Index(fields=['status', 'expires_at'], name='clientinv_status_exp_idx'),
+        ]
     
     def __str__(self):
         return f"Invitation pour {self.contact_email} - {self.get_status_display()}"
@@ -168,7 +183,7 @@ class ClientInvitation(models.Model):
     
     def is_valid(self):
         """Vérifie si l'invitation est valide (non utilisée et non expirée)"""
-        return self.status in ['pending', 'sent'] and not self.is_expired()
+        return self.status in self.ACTIVE_STATUSES and not self.is_expired()
     
     def mark_as_used(self, user, ip_address=None, user_agent=None):
         """Marque l'invitation comme utilisée"""
@@ -212,3 +227,26 @@ class ContactMessage(models.Model):
         """Vérifie si le message a moins de 24h"""
         from datetime import timedelta
         return self.created_at > timezone.now() - timedelta(hours=24)
+
+class DeviceToken(models.Model):
+    """Tokens FCM des appareils d'un utilisateur (plusieurs appareils par utilisateur)"""
+    
+    PLATFORM_CHOICES = [
+        ('web', 'Web'),
+        ('android', 'Android'),
+        ('ios', 'iOS'),
+    ]
+    
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='device_tokens')
+    token = models.CharField(max_length=255, unique=True)
+    platform = models.CharField(max_length=10, choices=PLATFORM_CHOICES, default='web')
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_seen_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['-last_seen_at']
+        verbose_name = 'Appareil (push)'
+        verbose_name_plural = 'Appareils (push)'
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.get_platform_display()}"
@@ -2,6 +2,23 @@ import re
 from django.core.exceptions import ValidationError
 from django.utils.translation import gettext as _
 
+# Règles compilées une seule fois au chargement du module.
+# Les classes de caractères sont disjointes : un seul finditer() suffit
+# pour savoir quelles classes sont présentes dans le mot de passe.
+_PASSWORD_CHAR_CLASSES_RE = re.compile(
+    r'(?P<upper>[A-Z])'
+    r'|(?P<lower>[a-z])'
+    r'|(?P<digit>\d)'
+    r'|(?P<special>[!@#$%^&*(),.?":{}|<>])'
+)
+_REPEATED_CHARS_RE = re.compile(r'(.)\1{2,}')
+_COMMON_SEQUENCES_RE = re.compile(r'123|456|789|abc|qwe|asd|zxc')
+
+WEAK_PASSWORDS = frozenset([
+    'password', 'motdepasse', '12345678', 'azerty123',
+    'admin123', 'user123', 'test123', 'password123'
+])
+
 class StrongPasswordValidator:
     """
     Validateur de mot de passe fort avec règles strictes
@@ -10,45 +27,39 @@ class StrongPasswordValidator:
     def validate(self, password, user=None):
         """Valide qu'un mot de passe respecte les règles de sécurité"""
         errors = []
+        password_lower = password.lower()
+        char_classes = {match.lastgroup for match in _PASSWORD_CHAR_CLASSES_RE.finditer(password)}
         
         # Longueur minimale
         if len(password) < 8:
             errors.append(_("Le mot de passe doit contenir au moins 8 caractères."))
         
         # Au moins une majuscule
-        if not re.search(r'[A-Z]', password):
+        if 'upper' not in char_classes:
             errors.append(_("Le mot de passe doit contenir au moins une lettre majuscule."))
         
         # Au moins une minuscule
-        if not re.search(r'[a-z]', password):
+        if 'lower' not in char_classes:
             errors.append(_("Le mot de passe doit contenir au moins une lettre minuscule."))
         
         # Au moins un chiffre
-        if not re.search(r'\d', password):
+        if 'digit' not in char_classes:
             errors.append(_("Le mot de passe doit contenir au moins un chiffre."))
         
         # Au moins un caractère spécial
-        if not re.search(r'[!@#$%^&*(),.?":{}|<>\.]', password):
+        if 'special' not in char_classes:
             errors.append(_("Le mot de passe doit contenir au moins un caractère spécial (!@#$%^&*(),.?\":{}|<>.)."))
         
         # Pas de caractères répétitifs
-        if re.search(r'(.)\1{2,}', password):
+        if _REPEATED_CHARS_RE.search(password):
             errors.append(_("Le mot de passe ne doit pas contenir plus de 2 caractères identiques consécutifs."))
         
         # Pas de séquences communes
-        common_sequences = ['123', '456', '789', 'abc', 'qwe', 'asd', 'zxc']
-        password_lower = password.lower()
-        for seq in common_sequences:
-            if seq in password_lower:
-                errors.append(_("Le mot de passe ne doit pas contenir de séquences communes (123, abc, qwe, etc.)."))
-                break
+        if _COMMON_SEQUENCES_RE.search(password_lower):
+            errors.append(_("Le mot de passe ne doit pas contenir de séquences communes (123, abc, qwe, etc.)."))
         
         # Mots de passe faibles communs
-        weak_passwords = [
-            'password', 'motdepasse', '12345678', 'azerty123',
-            'admin123', 'user123', 'test123', 'password123'
-        ]
-        if password.lower() in weak_passwords:
+        if password_lower in WEAK_PASSWORDS:
             errors.append(_("Ce mot de passe est trop commun et facilement devinable."))
         
         if errors:
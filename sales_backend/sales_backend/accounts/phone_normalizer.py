@@ -0,0 +1,186 @@
+import logging
+from django.core.exceptions import ValidationError
+
+logger = logging.getLogger(__name__)
+
+# Indicatif pays -> (code ISO, longueur min, longueur max du numéro national sans le 0)
+COUNTRY_RULES = {
+    '1': ('US', 10, 10),      # USA / Canada
+    '7': ('RU', 10, 10),
+    '31': ('NL', 9, 9),
+    '32': ('BE', 8, 9),
+    '33': ('FR', 9, 9),
+    '34': ('ES', 9, 9),
+    '39': ('IT', 6, 11),
+    '41': ('CH', 9, 9),
+    '44': ('GB', 9, 10),
+    '49': ('DE', 6, 13),
+    '52': ('MX', 10, 10),
+    '55': ('BR', 10, 11),
+    '61': ('AU', 9, 9),
+    '81': ('JP', 9, 10),
+    '86': ('CN', 11, 11),
+    '91': ('IN', 10, 10),
+    '212': ('MA', 9, 9),
+    '221': ('SN', 9, 9),
+    '225': ('CI', 10, 10),
+    '230': ('MU', 7, 8),
+    '237': ('CM', 9, 9),
+    '261': ('MG', 9, 9),      # Madagascar
+    '262': ('RE', 9, 9),      # La Réunion / Mayotte
+    '269': ('KM', 7, 7),
+    '351': ('PT', 9, 9),
+}
+
+# Préfixes nationaux (avec le 0) reconnus sans indicatif -> indicatif pays
+NATIONAL_PREFIXES = {
+    '032': '261', '033': '261', '034': '261', '038': '261',  # Madagascar mobiles
+    '06': '33', '07': '33',                                  # France mobiles
+}
+
+# Bornes E.164 pour les indicatifs absents de COUNTRY_RULES
+MIN_INTERNATIONAL_DIGITS = 8
+MAX_INTERNATIONAL_DIGITS = 15
+
+INVALID_PHONE_MESSAGE = "Format de numéro de téléphone invalide. Utilisez le format international (+261, +33, +1, etc.)"
+
+class _KeepDigitsAndPlus(dict):
+    """Table pour str.translate : garde les chiffres ASCII et le '+', supprime le reste (mémoïsée)"""
+
+    def __missing__(self, code):
+        char = chr(code)
+        self[code] = char if char in '0123456789+' else None
+        return self[code]
+
+_KEEP_DIGITS_AND_PLUS = _KeepDigitsAndPlus()
+
+def _build_trie(prefixes):
+    """Trie de chiffres : chaque noeud est un dict, la clé None porte la valeur du préfixe"""
+    root = {}
+    for prefix, value in prefixes.items():
+        node = root
+        for digit in prefix:
+            node = node.setdefault(digit, {})
+        node[None] = value
+    return root
+
+def _longest_match(trie, digits):
+    """Retourne (préfixe, valeur) du plus long préfixe connu de digits, ou (None, None)"""
+    node = trie
+    match = (None, None)
+    for index, digit in enumerate(digits):
+        node = node.get(digit)
+        if node is None:
+            break
+        if None in node:
+            match = (digits[:index + 1], node[None])
+    return match
+
+class PhoneNormalizer:
+    """
+    Normalisation / validation des numéros de téléphone au format E.164 (+XXXXXXXX).
+    Les indicatifs pays et préfixes nationaux sont compilés une fois en tries de chiffres :
+    un seul parcours du numéro au lieu de chaînes de startswith.
+    """
+
+    def __init__(self, country_rules=None, national_prefixes=None):
+        self.country_rules = country_rules or COUNTRY_RULES
+        self._country_trie = _build_trie(self.country_rules)
+        self._national_trie = _build_trie(national_prefixes or NATIONAL_PREFIXES)
+
+    def _clean(self, phone_number):
+        cleaned = str(phone_number).strip().translate(_KEEP_DIGITS_AND_PLUS)
+        # Le '+' n'est significatif qu'en tête
+        if cleaned.startswith('+'):
+            return '+' + cleaned[1:].replace('+', '')
+        return cleaned.replace('+', '')
+
+    def _fits_national(self, country_code, digits):
+        rule = self.country_rules.get(country_code)
+        return rule is not None and rule[1] <= len(digits) <= rule[2]
+
+    def parse(self, phone_number, default_country_code=None):
+        """
+        Retourne (numéro E.164, code ISO ou None).
+        default_country_code (ex: '33') : pays supposé d'un numéro national sans indicatif
+        (0 initial non reconnu, ou chiffres de la longueur nationale de ce pays).
+        Lève ValidationError si le numéro n'est pas reconnu.
+        """
+        if not phone_number:
+            raise ValidationError("Numéro de téléphone requis")
+
+        cleaned = self._clean(phone_number)
+
+        if cleaned.startswith('+'):
+            digits = cleaned[1:]
+        elif cleaned.startswith('00'):
+            digits = cleaned[2:]
+        elif cleaned.startswith('0'):
+            prefix, country_code = _longest_match(self._national_trie, cleaned)
+            if prefix is None:
+                if default_country_code is None:
+                    raise ValidationError(INVALID_PHONE_MESSAGE)
+                country_code = default_country_code
+            digits = country_code + cleaned[1:]
+        elif default_country_code and self._fits_national(default_country_code, cleaned):
+            digits = default_country_code + cleaned
+        else:
+            digits = cleaned
+
+        country_code, rule = _longest_match(self._country_trie, digits)
+        if rule is not None:
+            iso, min_length, max_length = rule
+            national_number = digits[len(country_code):]
+            # Tolère le 0 national saisi après l'indicatif (+33 06...)
+            if national_number.startswith('0') and len(national_number) == max_length + 1:
+                national_number = national_number[1:]
+            if not min_length <= len(national_number) <= max_length:
+                raise ValidationError(INVALID_PHONE_MESSAGE)
+            return f"+{country_code}{national_number}", iso
+
+        if MIN_INTERNATIONAL_DIGITS <= len(digits) <= MAX_INTERNATIONAL_DIGITS and not digits.startswith('0'):
+            return f"+{digits}", None
+
+        raise ValidationError(INVALID_PHONE_MESSAGE)
+
+    def normalize(self, phone_number, default_country_code=None):
+        """Numéro au format E.164 (lève ValidationError si invalide)"""
+        return self.parse(phone_number, default_country_code)[0]
+
+    def format(self, phone_number, default_country_code=None):
+        """
+        Variante tolérante pour les chemins d'envoi SMS : ne lève jamais d'exception,
+        un numéro non reconnu est renvoyé nettoyé (préfixé par '+' s'il n'est pas au format national).
+        """
+        try:
+            return self.normalize(phone_number, default_country_code)
+        except ValidationError:
+            logger.warning(f"⚠️ Format de numéro non reconnu: {phone_number}. Utilisez le format international (+261, +33, etc.)")
+            cleaned = self._clean(phone_number or '')
+            return cleaned if cleaned.startswith(('+', '0')) else f"+{cleaned}"
+
+    def normalize_many(self, phone_numbers):
+        """
+        Normalise une colonne entière (import CSV) en un passage :
+        chaque valeur distincte n'est analysée qu'une fois.
+        Retourne une liste de {'value', 'valid', 'normalized', 'country', 'error'}.
+        """
+        cache = {}
+        results = []
+
+        for value in phone_numbers:
+            key = str(value).strip() if value is not None else ''
+
+            if key not in cache:
+                try:
+                    normalized, country = self.parse(key)
+                    cache[key] = {'valid': True, 'normalized': normalized, 'country': country, 'error': None}
+                except ValidationError as e:
+                    cache[key] = {'valid': False, 'normalized': None, 'country': None, 'error': ' '.join(e.messages)}
+
+            results.append({'value': value, **cache[key]})
+
+        return results
+
+# Instance globale
+phone_normalizer = PhoneNormalizer()
@@ -0,0 +1,143 @@
+import logging
+import threading
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Nombre maximal de tokens par requête multicast FCM
+FCM_MULTICAST_LIMIT = 500
+
+# Codes d'erreur FCM signifiant que le token ne sera plus jamais valide
+INVALID_TOKEN_ERROR_CODES = {'UNREGISTERED', 'SENDER_ID_MISMATCH'}
+
+class FirebaseMessagingClient:
+    """Client FCM réel (firebase_admin.messaging.send_each_for_multicast)"""
+
+    def send_multicast(self, tokens, title, body, data):
+        """Retourne une liste alignée sur tokens : None si envoyé, sinon le code d'erreur"""
+        from firebase_admin import messaging
+        from .firebase_config import FirebaseConfig
+
+        if not FirebaseConfig.initialize_firebase():
+            raise RuntimeError("Firebase non configuré")
+
+        message = messaging.MulticastMessage(
+            notification=messaging.Notification(title=title, body=body),
+            data=data,
+            tokens=tokens,
+        )
+        batch = messaging.send_each_for_multicast(message)
+
+        errors = []
+        for response in batch.responses:
+            if response.success:
+                errors.append(None)
+            elif isinstance(response.exception, (messaging.UnregisteredError, messaging.SenderIdMismatchError)):
+                errors.append('UNREGISTERED')
+            else:
+                errors.append(getattr(response.exception, 'code', None) or 'UNKNOWN')
+        return errors
+
+class LocalFCMClient:
+    """
+    Bouchon local de FCM (tests hors ligne, PUSH_FCM_STUB=True) :
+    enregistre les lots reçus, les tokens commençant par 'invalid' sont refusés
+    comme désinscrits.
+    """
+
+    def __init__(self):
+        self.batches = []
+        self._lock = threading.Lock()
+
+    def send_multicast(self, tokens, title, body, data):
+        with self._lock:
+            self.batches.append({'tokens': list(tokens), 'title': title, 'body': body, 'data': data})
+        return ['UNREGISTERED' if token.startswith('invalid') else None for token in tokens]
+
+class PushService:
+    """
+    Diffusion de notifications push vers les appareils enregistrés (DeviceToken) :
+    lots multicast de FCM_MULTICAST_LIMIT tokens, suppression automatique des tokens invalides.
+    """
+
+    def __init__(self, client=None):
+        self._client = client
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = LocalFCMClient() if getattr(settings, 'PUSH_FCM_STUB', False) else FirebaseMessagingClient()
+        return self._client
+
+    def register_token(self, user, token, platform='web'):
+        """Enregistre (ou rattache à user) le token d'un appareil"""
+        from .models import DeviceToken
+
+        device, created = DeviceToken.objects.update_or_create(
+            token=token,
+            defaults={'user': user, 'platform': platform}
+        )
+        return device
+
+    def send_to_tokens(self, tokens, title, body, data=None):
+        """Envoie par lots multicast et purge les tokens refusés par FCM"""
+        from .models import DeviceToken
+
+        # FCM n'accepte que des valeurs texte dans data
+        data = {str(key): str(value) for key, value in (data or {}).items()}
+        tokens = list(dict.fromkeys(tokens))
+        stats = {'tokens': len(tokens), 'sent': 0, 'failed': 0, 'pruned': 0, 'batches': 0}
+        invalid_tokens = []
+
+        for start in range(0, len(tokens), FCM_MULTICAST_LIMIT):
+            batch = tokens[start:start + FCM_MULTICAST_LIMIT]
+            stats['batches'] += 1
+
+            try:
+                errors = self.client.send_multicast(batch, title, body, data)
+            except Exception as e:
+                logger.error(f"❌ Erreur envoi lot push ({len(batch)} tokens): {str(e)}")
+                stats['failed'] += len(batch)
+                continue
+
+            for token, error in zip(batch, errors):
+                if error is None:
+                    stats['sent'] += 1
+                else:
+                    stats['failed'] += 1
+                    if error in INVALID_TOKEN_ERROR_CODES:
+                        invalid_tokens.append(token)
+
+        if invalid_tokens:
+            stats['pruned'], _ = DeviceToken.objects.filter(token__in=invalid_tokens).delete()
+            logger.info(f"🧹 {stats['pruned']} tokens FCM invalides supprimés")
+
+        return stats
+
+    def send_to_users(self, user_ids, title, body, data=None):
+        """Envoie une notification à tous les appareils des utilisateurs donnés"""
+        from .models import DeviceToken
+
+        tokens = DeviceToken.objects.filter(user_id__in=user_ids).values_list('token', flat=True)
+        stats = self.send_to_tokens(tokens, title, body, data)
+        logger.info(f"📲 Push '{title}': {stats['sent']}/{stats['tokens']} appareils, {stats['batches']} lots")
+        return stats
+
+def queue_push_to_users(user_ids, title, body, data=None):
+    """
+    Met la diffusion en file d'attente Celery.
+    Si la file est indisponible, envoie directement.
+    """
+    from .tasks import send_push_to_users_async
+
+    user_ids = list(user_ids)
+    try:
+        send_push_to_users_async.delay(user_ids, title, body, data)
+        return True
+    except Exception as e:
+        logger.warning(f"⚠️ File d'attente push indisponible, envoi direct: {str(e)}")
+
+    return push_service.send_to_users(user_ids, title, body, data)['sent'] > 0
+
+# Instance globale
+push_service = PushService()
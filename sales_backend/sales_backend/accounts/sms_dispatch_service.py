@@ -0,0 +1,189 @@
+import threading
+import time
+import logging
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Débit par défaut par fournisseur : (jetons par seconde, capacité du seau)
+DEFAULT_SMS_RATE_LIMITS = {
+    'Twilio': (1.0, 5),
+    'Textbelt': (0.2, 1),
+    'SMS77': (5.0, 10),
+    'SMSApi': (5.0, 10),
+}
+
+class TokenBucket:
+    """Seau à jetons : `rate` jetons/seconde, au plus `capacity` jetons en réserve"""
+
+    def __init__(self, rate, capacity):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = float(capacity)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self, tokens=1):
+        """
+        Prend `tokens` jetons si possible.
+        Retourne 0 en cas de succès, sinon le nombre de secondes à attendre.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0
+
+            if self.rate <= 0:
+                return float('inf')
+            return (tokens - self._tokens) / self.rate
+
+# Seau à jetons dans Redis : lecture, remplissage et prélèvement atomiques (horloge du serveur Redis,
+# commune à tous les workers). Retourne l'attente en secondes (0 = jetons pris, -1 = débit nul).
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(state[1]) or capacity
+local updated_at = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated_at) * rate)
+local wait = 0
+if tokens >= requested then
+    tokens = tokens - requested
+elseif rate <= 0 then
+    wait = -1
+else
+    wait = (requested - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated_at', now)
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+return tostring(wait)
+"""
+
+class RedisTokenBucket:
+    """Seau à jetons partagé par tous les processus workers (état dans Redis)"""
+
+    def __init__(self, script, key, rate, capacity):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.key = key
+        self._script = script
+        # Un seau inutilisé plus longtemps que son remplissage complet est plein : la clé peut expirer
+        self._ttl = int(self.capacity / self.rate) + 60 if self.rate > 0 else 3600
+
+    def try_acquire(self, tokens=1):
+        wait = float(self._script(keys=[self.key], args=[self.rate, self.capacity, tokens, self._ttl]))
+        return float('inf') if wait < 0 else wait
+
+class SMSRateLimiter:
+    """
+    Un seau à jetons par fournisseur SMS, partagé par tous les workers via Redis
+    (SMS_RATE_LIMIT_REDIS_URL, par défaut le broker Celery) : le débit configuré est global.
+    Sans Redis (URL vide ou serveur injoignable), seaux en mémoire du processus : le débit
+    effectif est alors multiplié par le nombre de processus workers.
+    Réglage optionnel : SMS_RATE_LIMITS = {'SMS77': {'rate': 5, 'capacity': 10}, ...}
+    """
+
+    KEY_PREFIX = 'sms:rate:'
+
+    # Après une erreur Redis, seaux locaux pendant ce délai (pas d'attente de connexion à chaque SMS)
+    REDIS_RETRY_AFTER = 30.0
+
+    def __init__(self):
+        self._buckets = {}
+        self._shared_buckets = {}
+        self._script = None
+        self._redis_down_until = 0.0
+        self._lock = threading.Lock()
+
+    def _redis_script(self):
+        url = getattr(settings, 'SMS_RATE_LIMIT_REDIS_URL', '')
+        if not url.startswith(('redis://', 'rediss://', 'unix://')) or time.monotonic() < self._redis_down_until:
+            return None
+        if self._script is None:
+            import redis
+
+            client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+            self._script = client.register_script(TOKEN_BUCKET_SCRIPT)
+        return self._script
+
+    def get_limits(self, provider):
+        rate, capacity = DEFAULT_SMS_RATE_LIMITS.get(provider, (1.0, 1))
+        custom = getattr(settings, 'SMS_RATE_LIMITS', {}).get(provider, {})
+        return custom.get('rate', rate), custom.get('capacity', capacity)
+
+    def bucket(self, provider):
+        with self._lock:
+            if provider not in self._buckets:
+                self._buckets[provider] = TokenBucket(*self.get_limits(provider))
+            return self._buckets[provider]
+
+    def shared_bucket(self, provider):
+        script = self._redis_script()
+        if script is None:
+            return None
+        with self._lock:
+            if provider not in self._shared_buckets:
+                self._shared_buckets[provider] = RedisTokenBucket(script, self.KEY_PREFIX + provider, *self.get_limits(provider))
+            return self._shared_buckets[provider]
+
+    def try_acquire(self, provider, tokens=1):
+        try:
+            shared = self.shared_bucket(provider)
+            if shared is not None:
+                return shared.try_acquire(tokens)
+        except Exception as e:
+            self._redis_down_until = time.monotonic() + self.REDIS_RETRY_AFTER
+            logger.warning(f"⚠️ Limiteur SMS Redis indisponible, seau local au processus: {str(e)}")
+        return self.bucket(provider).try_acquire(tokens)
+
+    def reset(self):
+        with self._lock:
+            self._buckets.clear()
+            self._shared_buckets.clear()
+
+def update_invitation_sms_status(invitation_id, sent):
+    """Répercute le résultat de l'envoi SMS sur ClientInvitation.status"""
+    if not invitation_id:
+        return
+    from .models import ClientInvitation
+
+    new_status = 'sent' if sent else 'failed'
+    updated = ClientInvitation.objects.filter(
+        pk=invitation_id,
+        status__in=ClientInvitation.ACTIVE_STATUSES
+    ).update(status=new_status)
+
+    if updated:
+        logger.info(f"📱 Invitation {invitation_id} → {new_status}")
+
+def queue_sms(phone_number, message, invitation_id=None, providers=None):
+    """
+    Met un SMS en file d'attente Celery (le worker web n'attend plus les fournisseurs).
+    Si la file est indisponible (ou SMS_ASYNC=False), envoie directement.
+    """
+    if getattr(settings, 'SMS_ASYNC', True):
+        from .tasks import send_sms_async
+
+        try:
+            send_sms_async.delay(phone_number, message, invitation_id, providers)
+            return True
+        except Exception as e:
+            logger.warning(f"⚠️ File d'attente SMS indisponible, envoi direct: {str(e)}")
+
+    from .international_sms_service import international_sms_service
+
+    result = international_sms_service.send_message(
+        phone_number, message, providers=providers, rate_limiter=sms_rate_limiter
+    )
+    update_invitation_sms_status(invitation_id, result['sent'])
+    return result['sent']
+
+# Instance globale (une par processus)
+sms_rate_limiter = SMSRateLimiter()
@@ -0,0 +1,215 @@
+import threading
+import time
+import logging
+import requests
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# Latence supposée d'un fournisseur jamais appelé (secondes)
+DEFAULT_PROVIDER_LATENCY = 1.0
+
+# Poids des nouvelles mesures dans les moyennes mobiles exponentielles
+EWMA_ALPHA = 0.2
+
+class ProviderHealth:
+    """
+    Santé d'un fournisseur SMS : latence et taux d'erreur (moyennes mobiles exponentielles)
+    et disjoncteur (closed -> open après N échecs consécutifs -> half_open après le délai
+    de réarmement : une seule requête d'essai, qui referme ou rouvre le circuit).
+    """
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=60):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self.consecutive_failures = 0
+        self.latency = None
+        self.error_rate = 0.0
+        self.calls = 0
+        self.failures = 0
+        self.opened_at = None
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow_request(self):
+        with self._lock:
+            if self.state == 'closed':
+                return True
+            if self.state == 'open' and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = 'half_open'
+                self._probe_in_flight = False
+            if self.state == 'half_open' and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def cancel_probe(self):
+        """Libère la requête d'essai réservée mais finalement non envoyée (limite de débit)"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def _record(self, duration, failed):
+        self.calls += 1
+        self.latency = duration if self.latency is None else (
+            EWMA_ALPHA * duration + (1 - EWMA_ALPHA) * self.latency
+        )
+        self.error_rate = EWMA_ALPHA * (1.0 if failed else 0.0) + (1 - EWMA_ALPHA) * self.error_rate
+
+    def record_success(self, duration):
+        with self._lock:
+            self._record(duration, failed=False)
+            self.consecutive_failures = 0
+            if self.state != 'closed':
+                logger.info(f"🟢 Circuit SMS {self.name} refermé")
+            self.state = 'closed'
+            self._probe_in_flight = False
+
+    def record_failure(self, duration):
+        with self._lock:
+            self._record(duration, failed=True)
+            self.failures += 1
+            self.consecutive_failures += 1
+            if self.state == 'half_open' or self.consecutive_failures >= self.failure_threshold:
+                if self.state != 'open':
+                    logger.warning(f"🔴 Circuit SMS {self.name} ouvert ({self.consecutive_failures} échecs consécutifs)")
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+                self._probe_in_flight = False
+
+    def score(self):
+        """Plus petit = meilleur : latence pénalisée par le taux d'erreur"""
+        latency = DEFAULT_PROVIDER_LATENCY if self.latency is None else self.latency
+        return latency * (1 + 4 * self.error_rate)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'state': self.state,
+                'calls': self.calls,
+                'failures': self.failures,
+                'consecutive_failures': self.consecutive_failures,
+                'latency_seconds': round(self.latency, 4) if self.latency is not None else None,
+                'error_rate': round(self.error_rate, 4),
+            }
+
+class SMSProviderRouter:
+    """
+    Routeur des fournisseurs SMS :
+    - une session HTTP keep-alive par fournisseur
+    - fournisseurs sains et rapides essayés en premier, circuits ouverts sautés
+    - tentative de secours (hedging) sur le fournisseur suivant si le premier
+      n'a pas répondu après SMS_HEDGE_AFTER secondes ; la première réponse positive l'emporte
+      (si les deux aboutissent, le destinataire reçoit deux SMS : garder un délai confortable)
+
+    Réglages (optionnels): SMS_HEDGE_AFTER, SMS_CIRCUIT_FAILURE_THRESHOLD, SMS_CIRCUIT_RESET_TIMEOUT
+    """
+
+    def __init__(self):
+        self._health = {}
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='sms-router')
+
+    def health(self, name):
+        with self._lock:
+            if name not in self._health:
+                self._health[name] = ProviderHealth(
+                    name,
+                    failure_threshold=getattr(settings, 'SMS_CIRCUIT_FAILURE_THRESHOLD', 5),
+                    reset_timeout=getattr(settings, 'SMS_CIRCUIT_RESET_TIMEOUT', 60)
+                )
+            return self._health[name]
+
+    def session(self, name):
+        """Session HTTP dédiée au fournisseur (pool de connexions réutilisées)"""
+        with self._lock:
+            if name not in self._sessions:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=10)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                self._sessions[name] = session
+            return self._sessions[name]
+
+    def rank(self, names):
+        """Fournisseurs par score croissant (l'ordre de préférence départage les égalités)"""
+        position = {name: index for index, name in enumerate(names)}
+        return sorted(names, key=lambda name: (self.health(name).score(), position[name]))
+
+    def _timed_call(self, name, send):
+        health = self.health(name)
+        started_at = time.monotonic()
+        try:
+            success = bool(send(name))
+        except Exception as e:
+            logger.warning(f"⚠️ Échec {name}: {str(e)}")
+            success = False
+
+        duration = time.monotonic() - started_at
+        if success:
+            health.record_success(duration)
+        else:
+            health.record_failure(duration)
+        return success
+
+    def dispatch(self, names, send, acquire=None, hedge_after=None):
+        """
+        Appelle send(name) sur les fournisseurs jusqu'au premier succès.
+        acquire(name) retourne 0 si l'envoi est autorisé, sinon l'attente en secondes (limite de débit).
+        Au plus deux tentatives en vol simultanément (principale + secours).
+        """
+        if hedge_after is None:
+            hedge_after = getattr(settings, 'SMS_HEDGE_AFTER', None)
+
+        queue = [name for name in self.rank(names)]
+        throttled = []
+        in_flight = {}
+
+        def launch_next():
+            while queue:
+                name = queue.pop(0)
+                if not self.health(name).allow_request():
+                    continue
+                if acquire:
+                    wait_seconds = acquire(name)
+                    if wait_seconds:
+                        self.health(name).cancel_probe()
+                        throttled.append(wait_seconds)
+                        continue
+                in_flight[self._executor.submit(self._timed_call, name, send)] = name
+                return True
+            return False
+
+        launch_next()
+        while in_flight:
+            can_hedge = hedge_after and queue and len(in_flight) < 2
+            done, _ = wait(list(in_flight), timeout=hedge_after if can_hedge else None, return_when=FIRST_COMPLETED)
+
+            if not done:
+                logger.info(f"⏱️ Pas de réponse de {', '.join(in_flight.values())} après {hedge_after}s, tentative de secours")
+                launch_next()
+                continue
+
+            for future in done:
+                name = in_flight.pop(future)
+                if future.result():
+                    return {'sent': True, 'provider': name, 'retry_in': None}
+                launch_next()
+
+        return {'sent': False, 'provider': None, 'retry_in': min(throttled) if throttled else None}
+
+    def snapshot(self):
+        with self._lock:
+            names = list(self._health)
+        return {name: self.health(name).snapshot() for name in names}
+
+    def reset(self):
+        with self._lock:
+            self._health.clear()
+
+# Instance globale (une par processus)
+sms_router = SMSProviderRouter()
@@ -1,10 +1,13 @@
 import os
 from django.conf import settings
-from twilio.rest import Client
+from .phone_normalizer import phone_normalizer
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Pays supposé des numéros nationaux saisis sans indicatif (France, comportement historique Twilio)
+DEFAULT_COUNTRY_CODE = '33'
+
 class SMSService:
     """Service d'envoi de SMS via Twilio"""
     
@@ -13,16 +16,25 @@ class SMSService:
         self.auth_token = os.getenv('TWILIO_AUTH_TOKEN')
         self.from_number = os.getenv('TWILIO_PHONE_NUMBER')
         self.dev_mode = os.getenv('SMS_DEV_MODE', 'true').lower() == 'true'
+        self._client = None
         
         if self.dev_mode:
             logger.info("🔧 Mode développement SMS activé - Les SMS ne seront pas envoyés réellement")
-            self.client = None
-        elif self.account_sid and self.auth_token:
-            self.client = Client(self.account_sid, self.auth_token)
-        else:
-            self.client = None
+        elif not (self.account_sid and self.auth_token):
             logger.warning("Twilio non configuré - Mode développement activé par défaut")
     
+    @property
+    def client(self):
+        """Client Twilio créé (et twilio importé) au premier envoi"""
+        if self._client is None and not self.dev_mode and self.account_sid and self.auth_token:
+            from twilio.rest import Client
+            from twilio.http.http_client import TwilioHttpClient
+            
+            # Connexions réutilisées et délai borné (le client par défaut n'en a pas)
+            http_client = TwilioHttpClient(pool_connections=True, timeout=getattr(settings, 'SMS_HTTP_TIMEOUT', (3.05, 10))[1])
+            self._client = Client(self.account_sid, self.auth_token, http_client=http_client)
+        return self._client
+    
     def send_invitation_sms(self, phone_number, invitation_url, contact_name):
         """Envoie un SMS d'invitation"""
         if not self.client:
@@ -61,29 +73,35 @@ Sales Tracker Pro
             return False
     
     def format_phone_number(self, phone_number):
-        """Formate le numéro de téléphone pour Twilio"""
-        # Supprimer tous les espaces et caractères spéciaux
-        phone = ''.join(filter(str.isdigit, phone_number))
+        """Formate le numéro de téléphone pour Twilio (E.164, France par défaut sans indicatif)"""
+        return phone_normalizer.format(phone_number, DEFAULT_COUNTRY_CODE)
+    
+    def send_message(self, formatted_phone, message_body):
+        """Envoi synchrone d'un SMS déjà formaté (appelé depuis le worker Celery)"""
+        if not self.client:
+            logger.error("Twilio non configuré - impossible d'envoyer le SMS")
+            return False
         
-        # Si le numéro commence par 0, remplacer par +33
-        if phone.startswith('0'):
-            phone = '+33' + phone[1:]
-        # Si le numéro ne commence pas par +, ajouter +33
-        elif not phone.startswith('+'):
-            phone = '+33' + phone
+        message = self.client.messages.create(
+            body=message_body,
+            from_=self.from_number,
+            to=formatted_phone
+        )
         
-        return phone
+        logger.info(f"SMS envoyé à {formatted_phone} - SID: {message.sid}")
+        return True
     
     def send_2fa_sms(self, phone_number, code):
-        """Envoie un code 2FA par SMS"""
+        """Met en file d'attente un code 2FA par SMS (envoi Twilio par le worker)"""
         if not self.client:
             logger.error("Twilio non configuré - impossible d'envoyer le SMS 2FA")
             return False
         
-        try:
-            formatted_phone = self.format_phone_number(phone_number)
-            
-            message_body = f"""
+        from .sms_dispatch_service import queue_sms
+        
+        formatted_phone = self.format_phone_number(phone_number)
+        
+        message_body = f"""
 🔐 Code de vérification Sales Tracker Pro
 
 Votre code de sécurité : {code}
@@ -92,20 +110,9 @@ Ce code expire dans 5 minutes.
 Ne le partagez avec personne.
 
 Sales Tracker Pro
-            """.strip()
-            
-            message = self.client.messages.create(
-                body=message_body,
-                from_=self.from_number,
-                to=formatted_phone
-            )
-            
-            logger.info(f"SMS 2FA envoyé à {formatted_phone} - SID: {message.sid}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Erreur envoi SMS 2FA à {phone_number}: {str(e)}")
-            return False
+        """.strip()
+        
+        return queue_sms(formatted_phone, message_body, providers=['Twilio'])
 
 # Instance globale du service SMS
 sms_service = SMSService()
@@ -1,12 +1,27 @@
-from celery import shared_task
-from django.core.mail import EmailMultiAlternatives
+from celery import group, shared_task
+from django.core.mail import EmailMultiAlternatives, get_connection
 from django.conf import settings
-from django.template.loader import render_to_string
+from django.template.loader import get_template, render_to_string
+from django.utils.html import strip_tags
 from django.utils import timezone
+from channels.layers import get_channel_layer
+from asgiref.sync import async_to_sync
+from .mail_service import deliver_email, is_transient_smtp_error
 import logging
+import smtplib
+import time
 
 logger = logging.getLogger(__name__)
 
+# Nombre d'invitations envoyées par connexion SMTP dans les envois en lot
+INVITATION_EMAIL_BATCH_SIZE = 100
+
+# Erreurs propres à un message (destinataire ou contenu refusé) : la connexion SMTP reste utilisable
+SMTP_MESSAGE_ERRORS = (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError)
+
+# Nombre de destinataires par requête SMS groupée
+SMS_BATCH_SIZE = 50
+
 @shared_task(bind=True, max_retries=3)
 def send_invitation_email_async(self, invitation_id, invitation_url, custom_message=''):
     """
@@ -103,31 +118,328 @@ L'équipe Sales Tracker Pro
             'retries_exhausted': True
         }
 
+@shared_task(bind=True, max_retries=5, ignore_result=True)
+def send_email_async(self, subject, body, to, html_message=None, from_email=None):
+    """
+    Tâche Celery d'envoi d'un email transactionnel : seules les erreurs transitoires
+    (connexion, réponses 4xx) sont retentées, avec un délai exponentiel (10s, 30s, 90s...)
+    """
+    try:
+        deliver_email(subject, body, to, html_message, from_email)
+    except Exception as exc:
+        if not is_transient_smtp_error(exc):
+            logger.error(f"💥 [ASYNC] Email à {', '.join(to)} refusé définitivement: {str(exc)}")
+            return
+        if self.request.retries < self.max_retries:
+            countdown = 10 * (3 ** self.request.retries)
+            logger.info(f"🔄 [ASYNC] Nouvel essai d'envoi à {', '.join(to)} dans {countdown}s")
+            raise self.retry(countdown=countdown, exc=exc)
+        logger.error(f"💥 [ASYNC] Email à {', '.join(to)} abandonné après {self.max_retries} tentatives: {str(exc)}")
+
+def chunked(items, size):
+    """Découpe une liste en sous-listes de taille size"""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+@shared_task(bind=True, max_retries=3)
+def send_invitation_batch_async(self, invitation_ids, custom_message='', batch_index=0, batch_count=1):
+    """
+    Envoie un lot d'invitations par email :
+    - une seule requête pour charger les invitations du lot
+    - template HTML compilé une seule fois
+    - une seule connexion SMTP réutilisée pour tout le lot
+    - un seul UPDATE pour marquer les invitations envoyées
+    """
+    from .models import ClientInvitation
+    
+    started_at = time.monotonic()
+    invitations = list(
+        ClientInvitation.objects.select_related('sent_by').filter(
+            id__in=invitation_ids,
+            status__in=ClientInvitation.ACTIVE_STATUSES
+        )
+    )
+    template = get_template('emails/client_invitation.html')
+    frontend_url = settings.FRONTEND_URL or 'http://localhost:3000'
+    
+    sent_ids = []
+    failed = []
+    skipped_count = len(invitation_ids) - len(invitations)
+    
+    try:
+        # Une seule connexion SMTP (handshake + TLS + login) pour tout le lot
+        with get_connection() as connection:
+            for invitation in invitations:
+                if not invitation.contact_email:
+                    skipped_count += 1
+                    continue
+                
+                invitation_url = f"{frontend_url}/signup/{invitation.invitation_token}"
+                html_message = template.render({
+                    'invitation': invitation,
+                    'invitation_url': invitation_url,
+                    'custom_message': custom_message,
+                    'admin_name': invitation.sent_by.get_full_name() or invitation.sent_by.username,
+                })
+                
+                email = EmailMultiAlternatives(
+                    subject=f"Invitation à rejoindre Sales Tracker Pro - {invitation.contact_subject}",
+                    body=strip_tags(html_message),
+                    from_email=settings.DEFAULT_FROM_EMAIL,
+                    to=[invitation.contact_email],
+                    connection=connection
+                )
+                email.attach_alternative(html_message, "text/html")
+                
+                try:
+                    connection.send_messages([email])
+                    sent_ids.append(invitation.id)
+                except SMTP_MESSAGE_ERRORS as exc:
+                    logger.error(f"❌ [BATCH {batch_index + 1}/{batch_count}] Destinataire refusé {invitation.contact_email}: {str(exc)}")
+                    failed.append({'invitation_id': invitation.id, 'error': str(exc)})
+                except OSError:
+                    # Connexion perdue (SMTPServerDisconnected, socket...) : relance du reste du lot
+                    raise
+                except Exception as exc:
+                    logger.error(f"❌ [BATCH {batch_index + 1}/{batch_count}] Échec envoi à {invitation.contact_email}: {str(exc)}")
+                    failed.append({'invitation_id': invitation.id, 'error': str(exc)})
+                
+                processed = len(sent_ids) + len(failed)
+                if processed % 25 == 0:
+                    self.update_state(state='PROGRESS', meta={
+                        'batch_index': batch_index,
+                        'processed': processed,
+                        'total': len(invitations),
+                    })
+    
+    except Exception as exc:
+        # Connexion SMTP impossible ou perdue : on relance le lot sans les invitations déjà traitées
+        if sent_ids:
+            ClientInvitation.objects.filter(id__in=sent_ids).update(status='sent')
+        already_done = set(sent_ids) | {failure['invitation_id'] for failure in failed}
+        remaining_ids = [invitation_id for invitation_id in invitation_ids if invitation_id not in already_done]
+        logger.error(f"❌ [BATCH {batch_index + 1}/{batch_count}] Erreur connexion SMTP (tentative {self.request.retries + 1}): {str(exc)}")
+        
+        if self.request.retries < self.max_retries:
+            countdown = 10 * (3 ** self.request.retries)
+            raise self.retry(
+                countdown=countdown,
+                exc=exc,
+                args=[remaining_ids, custom_message, batch_index, batch_count]
+            )
+        
+        return {
+            'success': False,
+            'batch_index': batch_index,
+            'sent': len(sent_ids),
+            'error': str(exc),
+            'retries_exhausted': True
+        }
+    
+    # Un seul UPDATE pour tout le lot
+    if sent_ids:
+        ClientInvitation.objects.filter(id__in=sent_ids).update(status='sent')
+    
+    duration = time.monotonic() - started_at
+    throughput = len(sent_ids) / duration if duration > 0 else 0.0
+    
+    logger.info(
+        f"✅ [BATCH {batch_index + 1}/{batch_count}] {len(sent_ids)} envoyés, {len(failed)} échecs, "
+        f"{skipped_count} ignorés en {duration:.2f}s ({throughput:.1f} emails/s)"
+    )
+    
+    return {
+        'success': not failed,
+        'batch_index': batch_index,
+        'batch_count': batch_count,
+        'sent': len(sent_ids),
+        'failed': failed,
+        'skipped': skipped_count,
+        'duration_seconds': round(duration, 3),
+        'emails_per_second': round(throughput, 2)
+    }
+
 @shared_task
-def send_bulk_invitations_async(invitation_ids):
+def send_bulk_invitations_async(invitation_ids, custom_message='', batch_size=INVITATION_EMAIL_BATCH_SIZE):
     """
     Envoi en lot d'invitations pour optimiser les performances
+    Les invitations sont regroupées en lots de batch_size, chaque lot étant
+    envoyé par une tâche sur une seule connexion SMTP.
+    La progression se suit via le GroupResult (group_id) et le résultat de chaque lot.
+    """
+    batches = list(chunked(list(invitation_ids), batch_size))
+    
+    if not batches:
+        return {'group_id': None, 'batch_count': 0, 'invitation_count': 0, 'batches': []}
+    
+    group_result = group(
+        send_invitation_batch_async.s(batch_ids, custom_message, batch_index, len(batches))
+        for batch_index, batch_ids in enumerate(batches)
+    ).apply_async()
+    group_result.save()
+    
+    logger.info(f"🚀 [ASYNC] {len(invitation_ids)} invitations réparties en {len(batches)} lots")
+    
+    return {
+        'group_id': group_result.id,
+        'batch_count': len(batches),
+        'invitation_count': len(invitation_ids),
+        'batches': [
+            {'batch_index': batch_index, 'task_id': child.id, 'size': len(batches[batch_index])}
+            for batch_index, child in enumerate(group_result.children)
+        ]
+    }
+
+# Tentatives après échec de tous les fournisseurs (les attentes de débit ne comptent pas)
+SMS_MAX_ATTEMPTS = 4
+
+@shared_task(bind=True, max_retries=None, ignore_result=True)
+def send_sms_async(self, phone_number, message, invitation_id=None, providers=None, attempt=0):
+    """
+    Tâche Celery d'envoi d'un SMS :
+    - fournisseur sauté si son seau à jetons est vide (SMS_RATE_LIMITS)
+    - tous saturés : ré-planification sans compter d'échec
+    - échec de tous les fournisseurs : retry exponentiel (10s, 30s, 90s...)
+    - résultat final répercuté sur ClientInvitation.status ('sent' / 'failed')
+    """
+    from .international_sms_service import international_sms_service
+    from .sms_dispatch_service import sms_rate_limiter, update_invitation_sms_status
+    
+    result = international_sms_service.send_message(
+        phone_number, message, providers=providers, rate_limiter=sms_rate_limiter
+    )
+    
+    if result['sent']:
+        update_invitation_sms_status(invitation_id, True)
+        return
+    
+    if result['retry_in'] is not None:
+        # Limite de débit atteinte : on rend le worker et on revient plus tard
+        raise self.retry(countdown=result['retry_in'])
+    
+    if attempt < SMS_MAX_ATTEMPTS:
+        countdown = 10 * (3 ** attempt)
+        logger.info(f"🔄 [ASYNC] Nouvel essai SMS à {phone_number} dans {countdown}s")
+        raise self.retry(
+            args=[phone_number, message, invitation_id, providers, attempt + 1],
+            countdown=countdown
+        )
+    
+    logger.error(f"💥 [ASYNC] SMS à {phone_number} abandonné après {SMS_MAX_ATTEMPTS} nouvelles tentatives")
+    update_invitation_sms_status(invitation_id, False)
+
+@shared_task(bind=True, max_retries=None)
+def send_bulk_sms_async(self, phone_numbers, message, batch_size=SMS_BATCH_SIZE, attempt=0):
+    """
+    Envoie le même texte à une liste de numéros, par requêtes groupées
+    chez les fournisseurs qui l'acceptent (SMS77, SMSApi).
+    Sans fournisseur compatible, chaque numéro part dans sa propre tâche send_sms_async.
     """
-    results = []
-    
-    for invitation_id in invitation_ids:
-        try:
-            from .models import ClientInvitation
-            invitation = ClientInvitation.objects.get(id=invitation_id)
-            invitation_url = invitation.get_invitation_url()
-            
-            # Lancer l'envoi asynchrone
-            task_result = send_invitation_email_async.delay(invitation_id, invitation_url)
-            results.append({
-                'invitation_id': invitation_id,
-                'task_id': task_result.id,
-                'email': invitation.contact_email
-            })
-            
-        except Exception as e:
-            results.append({
-                'invitation_id': invitation_id,
-                'error': str(e)
-            })
-    
-    return results
+    from .international_sms_service import international_sms_service
+    from .sms_dispatch_service import sms_rate_limiter
+    
+    phone_numbers = list(phone_numbers)
+    sent = 0
+    
+    for batch_start in range(0, len(phone_numbers), batch_size):
+        batch = phone_numbers[batch_start:batch_start + batch_size]
+        result = international_sms_service.send_batch(batch, message, rate_limiter=sms_rate_limiter)
+        
+        if result['sent']:
+            sent += len(batch)
+            continue
+        
+        remaining = phone_numbers[batch_start:]
+        if result['retry_in'] is not None:
+            # Limite de débit : les numéros restants sont re-planifiés
+            raise self.retry(args=[remaining, message, batch_size, attempt], countdown=result['retry_in'])
+        
+        if not result['batch_supported']:
+            for phone_number in remaining:
+                send_sms_async.delay(phone_number, message)
+            return {'sent': sent, 'queued_individually': len(remaining)}
+        
+        if attempt < SMS_MAX_ATTEMPTS:
+            raise self.retry(args=[remaining, message, batch_size, attempt + 1], countdown=10 * (3 ** attempt))
+        
+        logger.error(f"💥 [ASYNC] {len(remaining)} SMS groupés abandonnés")
+        return {'sent': sent, 'failed': len(remaining)}
+    
+    return {'sent': sent, 'queued_individually': 0}
+
+@shared_task(bind=True, max_retries=3)
+def send_push_to_users_async(self, user_ids, title, body, data=None):
+    """Diffuse une notification push à tous les appareils des utilisateurs (lots multicast FCM)"""
+    from .push_service import push_service
+    
+    try:
+        return push_service.send_to_users(user_ids, title, body, data)
+    except Exception as exc:
+        if self.request.retries < self.max_retries:
+            raise self.retry(countdown=10 * (3 ** self.request.retries), exc=exc)
+        logger.error(f"💥 [ASYNC] Diffusion push '{title}' abandonnée: {str(exc)}")
+        return {'sent': 0, 'error': str(exc)}
+
+def expire_stale_invitations(batch_size=1000):
+    """
+    Passe au statut 'expired' toutes les invitations actives dont la date
+    d'expiration est dépassée, par lots (un seul UPDATE ensembliste par lot).
+    Retourne le nombre total d'invitations expirées.
+    """
+    from .models import ClientInvitation
+    
+    now = timezone.now()
+    stale = ClientInvitation.objects.filter(
+        status__in=ClientInvitation.ACTIVE_STATUSES,
+        expires_at__lt=now
+    )
+    
+    total_expired = 0
+    while True:
+        batch_ids = list(stale.order_by().values_list('id', flat=True)[:batch_size])
+        if not batch_ids:
+            break
+        
+        # Le filtre de statut est répété pour ne pas écraser une invitation utilisée entre-temps
+        total_expired += stale.filter(id__in=batch_ids).update(status='expired')
+        
+        if len(batch_ids) < batch_size:
+            break
+    
+    return total_expired
+
+def notify_admins_invitations_expired(count):
+    """Notifie les admins connectés (WebSocket) du nombre d'invitations expirées"""
+    try:
+        channel_layer = get_channel_layer()
+        if channel_layer:
+            async_to_sync(channel_layer.group_send)(
+                'admin_notifications',
+                {
+                    'type': 'send_notification',
+                    'message': {
+                        'type': 'invitations_expired',
+                        'count': count,
+                        'timestamp': timezone.now().isoformat()
+                    }
+                }
+            )
+    except Exception as e:
+        logger.error(f"Erreur notification expiration des invitations: {str(e)}")
+
+@shared_task
+def expire_invitations_async(batch_size=1000):
+    """
+    Tâche périodique (Celery beat) d'expiration des invitations
+    Garde l'ensemble des invitations 'pending'/'sent' réduit aux invitations réellement valides
+    """
+    expired_count = expire_stale_invitations(batch_size=batch_size)
+    
+    if expired_count:
+        logger.info(f"⏰ [ASYNC] {expired_count} invitations expirées")
+        notify_admins_invitations_expired(expired_count)
+    
+    return {
+        'success': True,
+        'expired': expired_count
+    }
@@ -1,6 +1,7 @@
 import os
 import requests
 import logging
+from .phone_normalizer import phone_normalizer
 from typing import Optional
 
 logger = logging.getLogger(__name__)
@@ -51,23 +52,8 @@ Sales Tracker Pro"""
             return False
     
     def format_phone_number(self, phone_number: str) -> str:
-        """Formate un numéro de téléphone international"""
-        # Nettoyer le numéro
-        clean_number = ''.join(filter(str.isdigit, phone_number))
-        
-        # Si le numéro commence déjà par +, le garder tel quel
-        if phone_number.startswith('+'):
-            return phone_number
-        # Si le numéro est déjà au format international (commence par un code pays)
-        elif len(clean_number) > 10:
-            return f"+{clean_number}"
-        # Si le numéro commence par 0 (format national), essayer de deviner le pays
-        elif clean_number.startswith('0'):
-            # Retirer le 0 initial et laisser l'utilisateur spécifier le code pays
-            return f"+{clean_number[1:]}"
-        else:
-            # Format international direct
-            return f"+{clean_number}"
+        """Formate un numéro de téléphone international (E.164)"""
+        return phone_normalizer.format(phone_number)
 
 # Instance globale
 textbelt_service = TextbeltSMSService()
@@ -1,9 +1,7 @@
-import pyotp
-import qrcode
 from io import BytesIO
 import base64
 from django.contrib.auth.models import User
-from django.core.mail import send_mail
+from .mail_service import send_transactional_email
 from django.conf import settings
 from django.utils import timezone
 from datetime import timedelta
@@ -16,6 +14,8 @@ class TwoFactorAuth:
     @staticmethod
     def generate_secret_key(user):
         """Génère une clé secrète pour l'utilisateur"""
+        import pyotp
+        
         secret = pyotp.random_base32()
         
         # Stocker la clé dans le profil utilisateur (à créer un modèle UserProfile)
@@ -29,6 +29,10 @@ class TwoFactorAuth:
     @staticmethod
     def generate_qr_code(user, secret):
         """Génère un QR code pour l'authentification 2FA"""
+        # Chargés à la première utilisation (qrcode tire PIL)
+        import pyotp
+        import qrcode
+        
         # Nom de l'application
         app_name = "Sales Tracker"
         
@@ -57,6 +61,8 @@ class TwoFactorAuth:
     @staticmethod
     def verify_totp_code(secret, code):
         """Vérifie un code TOTP (Google Authenticator, etc.)"""
+        import pyotp
+        
         totp = pyotp.TOTP(secret)
         return totp.verify(code, valid_window=1)  # Fenêtre de 30 secondes
     
@@ -82,13 +88,7 @@ Si vous n'avez pas demandé ce code, ignorez cet email.
 L'équipe Sales Tracker
             """
             
-            send_mail(
-                subject,
-                message,
-                settings.DEFAULT_FROM_EMAIL,
-                [user.email],
-                fail_silently=False,
-            )
+            send_transactional_email(subject, message, [user.email])
             return True
         except Exception as e:
             print(f"❌ Erreur envoi email: {e}")
@@ -4,6 +4,7 @@ from . import views_invitation
 from . import views_contact_messages
 from . import views_contact_invitations
 from . import views_client_signup
+from . import views_firebase
 
 urlpatterns = [
     # Authentification
@@ -27,11 +28,19 @@ urlpatterns = [
     path('contact-messages/unread-count/', views_contact_messages.unread_messages_count, name='unread-messages-count'),
     
     # Invitations clients (simplified)
+    path('invitations/', views_invitation.list_invitations, name='invitation-list'),
     path('invitations/send/', views_invitation.send_client_invitation, name='send-client-invitation'),
     
     # Création d'invitations depuis contact
     path('create-contact-invitation/', views_contact_invitations.create_contact_invitation, name='create-contact-invitation'),
     
+    # Validation en lot (imports CSV d'invitations)
+    path('validate/bulk/', views_contact_invitations.validate_contacts_bulk, name='validate-contacts-bulk'),
+    
+    # Notifications push (appareils FCM)
+    path('push/devices/', views_firebase.save_fcm_token, name='push-register-device'),
+    path('push/send/', views_firebase.send_push_notification, name='push-send'),
+    
     # Inscription client avec token
     path('signup/<str:token>/', views_client_signup.client_signup_with_token, name='client-signup-with-token'),
 ]
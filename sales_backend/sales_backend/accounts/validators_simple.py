@@ -1,10 +1,10 @@
 import re
 import socket
 import smtplib
-import dns.resolver
 import requests
 from django.core.exceptions import ValidationError
 from django.core.validators import validate_email as django_validate_email
+from .phone_normalizer import phone_normalizer
 import logging
 
 logger = logging.getLogger(__name__)
@@ -41,86 +41,66 @@ def validate_real_email(email):
 
 def check_domain_exists(domain):
     """Vérifie si le domaine a des enregistrements MX"""
+    import dns.resolver
+    
     try:
         mx_records = dns.resolver.resolve(domain, 'MX')
         return len(mx_records) > 0
     except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer, Exception):
         return False
 
+# Patterns d'emails Gmail INTERDITS (liste étendue)
+GMAIL_FORBIDDEN_PATTERNS = (
+    'test', 'fake', 'invalid', 'example', 'dummy', 'sample',
+    'nonexistent', 'notreal', 'fictif', 'bidon', 'inexistant',
+    'faux', 'temporaire', 'temp', 'throwaway', 'spam', 'trash',
+    'delete', 'remove', 'admin', 'root', 'user', 'guest',
+    'anonymous', 'nobody', 'null', 'void', 'empty', 'blank',
+    'random', 'generic', 'default', 'placeholder', 'mock',
+    'trial', 'demo', 'prototype', 'beta', 'alpha', 'dev',
+    'debug', 'error', 'fail', 'broken', 'bad', 'wrong',
+    'noreply', 'donotreply', 'no-reply', 'bounce', 'mailer'
+)
+
+# Toutes les règles "suspectes" compilées une seule fois en une regex combinée :
+# un seul search() par adresse au lieu d'une boucle de ~50 sous-chaînes + 6 regex.
+# - patterns interdits (couvre aussi test123, admin42, etc.)
+# - caractères répétitifs suspects (3+ identiques consécutifs, couvre aaaa)
+# - lettre unique suivie de chiffres (a1, b123, mais pas ab123)
+# - aucune lettre (123456, ---, etc.)
+_GMAIL_SUSPICIOUS_RE = re.compile(
+    r'(?:' + '|'.join(re.escape(p) for p in GMAIL_FORBIDDEN_PATTERNS) + r')'
+    r'|(.)\1{2,}'
+    r'|^[a-z]\d+$'
+    r'|^[^a-z]*$'
+)
+
 def validate_gmail_email_strict(email):
     """Validation TRÈS STRICTE pour Gmail - détecte tous les emails suspects"""
     local_part = email.split('@')[0].lower()
     
-    # Patterns d'emails Gmail INTERDITS (liste étendue)
-    forbidden_patterns = [
-        'test', 'fake', 'invalid', 'example', 'dummy', 'sample',
-        'nonexistent', 'notreal', 'fictif', 'bidon', 'inexistant',
-        'faux', 'temporaire', 'temp', 'throwaway', 'spam', 'trash',
-        'delete', 'remove', 'admin', 'root', 'user', 'guest',
-        'anonymous', 'nobody', 'null', 'void', 'empty', 'blank',
-        'random', 'generic', 'default', 'placeholder', 'mock',
-        'trial', 'demo', 'prototype', 'beta', 'alpha', 'dev',
-        'debug', 'error', 'fail', 'broken', 'bad', 'wrong',
-        'noreply', 'donotreply', 'no-reply', 'bounce', 'mailer'
-    ]
-    
-    # Vérifie si l'email contient des patterns interdits
-    for pattern in forbidden_patterns:
-        if pattern in local_part:
-            return False
-    
-    # Patterns avec nombres suspects
-    if re.match(r'^(test|fake|invalid|example|dummy|user|admin|temp)\d*$', local_part):
-        return False
-    
-    # Emails trop courts (moins de 4 caractères)
-    if len(local_part) < 4:
-        return False
-    
-    # Emails trop longs (plus de 30 caractères) - assoupli
-    if len(local_part) > 30:
-        return False
-    
-    # Caractères répétitifs suspects (3+ identiques consécutifs)
-    if re.search(r'(.)\1{2,}', local_part):
-        return False
-    
-    # Patterns de lettres/chiffres suspects - assoupli pour noms réels
-    if re.match(r'^[a-z]{1}\d+$', local_part):  # a1, b123, etc. (mais pas ab123)
-        return False
-    
-    # Patterns de chiffres uniquement
-    if re.match(r'^\d+$', local_part):  # 123456, etc.
-        return False
-    
-    # Patterns avec uniquement des caractères répétés
-    if re.match(r'^(.)\1+$', local_part):  # aaaa, bbbb, etc.
-        return False
-    
-    # Doit contenir au moins une lettre
-    if not re.search(r'[a-zA-Z]', local_part):
+    # Longueur entre 4 et 30 caractères
+    if not 4 <= len(local_part) <= 30:
         return False
     
-    return True
+    return _GMAIL_SUSPICIOUS_RE.search(local_part) is None
+
+_POPULAR_FAKE_RE = re.compile(r'test|fake|invalid|example|dummy|nonexistent')
 
 def validate_popular_email(email):
     """Validation pour les domaines populaires (Outlook, Yahoo, etc.)"""
     local_part = email.split('@')[0].lower()
     
     # Même logique que Gmail mais moins stricte
-    fake_patterns = ['test', 'fake', 'invalid', 'example', 'dummy', 'nonexistent']
-    
-    for pattern in fake_patterns:
-        if pattern in local_part:
-            return False
-    
     if len(local_part) < 2:
         return False
     
-    return True
+    return _POPULAR_FAKE_RE.search(local_part) is None
 
 def check_email_exists_smtp(email):
     """Vérifie l'existence de l'email via SMTP (pour domaines moins connus)"""
+    import dns.resolver
+    
     domain = email.split('@')[1]
     
     try:
@@ -162,3 +142,43 @@ def validate_email_simple(email):
     Validation simple d'email - alias pour validate_real_email
     """
     return validate_real_email(email)
+
+def validate_phone_simple(phone_number):
+    """
+    Validation d'un numéro de téléphone international pour les invitations SMS
+    Formats acceptés : France (+33), Madagascar (+261), USA (+1), UK (+44), etc.
+    Retourne le numéro normalisé au format E.164
+    """
+    return phone_normalizer.normalize(phone_number)
+
+def _validate_bulk(values, validator):
+    """Applique un validateur à une liste de valeurs, chaque valeur distincte n'est validée qu'une fois"""
+    cache = {}
+    results = []
+    
+    for value in values:
+        key = str(value).strip() if value is not None else ''
+        
+        if key not in cache:
+            try:
+                cache[key] = {'valid': True, 'normalized': validator(key), 'error': None}
+            except ValidationError as e:
+                cache[key] = {'valid': False, 'normalized': None, 'error': ' '.join(e.messages)}
+        
+        results.append({'value': value, **cache[key]})
+    
+    return results
+
+def validate_emails_bulk(emails):
+    """
+    Validation en lot d'emails (imports CSV d'invitations)
+    Retourne un résultat par email sans lever d'exception
+    """
+    return _validate_bulk(emails, validate_real_email)
+
+def validate_phones_bulk(phone_numbers):
+    """
+    Validation en lot de numéros de téléphone (imports CSV d'invitations)
+    Retourne un résultat par numéro sans lever d'exception
+    """
+    return phone_normalizer.normalize_many(phone_numbers)
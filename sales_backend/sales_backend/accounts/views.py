@@ -4,12 +4,12 @@ from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny
 from rest_framework import status
 from django.contrib.auth.models import User
 from .serializers import UserSerializer, CreateUserSerializer
+from .mail_service import send_transactional_email
 from django.contrib.auth import authenticate
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.http import JsonResponse
 from django.core.exceptions import ValidationError
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
 from django.conf import settings
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from django.utils.encoding import force_bytes, force_str
@@ -315,17 +315,8 @@ support@salestrackerpro.com | +33 1 23 45 67 89
 © 2025 Sales Tracker Pro. Tous droits réservés.
             """
             
-            from django.core.mail import EmailMultiAlternatives
-            
-            # Créer l'email avec version HTML et texte
-            email = EmailMultiAlternatives(
-                subject=subject,
-                body=text_message,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                to=[user.email]
-            )
-            email.attach_alternative(html_message, "text/html")
-            email.send(fail_silently=False)
+            # Mise en file d'attente (connexion SMTP persistante côté worker)
+            send_transactional_email(subject, text_message, [user.email], html_message=html_message)
             
             logger.info(f"Email de réinitialisation envoyé à {user.email}")
             
@@ -24,7 +24,7 @@ def client_signup_with_token(request, token):
         # Récupérer l'invitation par token
         invitation = ClientInvitation.objects.get(
             invitation_token=token,
-            status='pending'
+            status__in=ClientInvitation.ACTIVE_STATUSES
         )
         
         # Vérifier si l'invitation n'a pas expiré
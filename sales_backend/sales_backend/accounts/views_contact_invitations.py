@@ -4,7 +4,7 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from django.utils import timezone
 from django.contrib.auth.models import User
-from django.core.mail import send_mail
+from django.core.exceptions import ValidationError
 from django.conf import settings
 from django.urls import reverse
 import secrets
@@ -16,10 +16,18 @@ from .sms_service import sms_service
 from .textbelt_service import textbelt_service
 from .free_mobile_service import free_mobile_service
 from .international_sms_service import international_sms_service
-from .validators_simple import validate_email_simple
+from .sms_dispatch_service import queue_sms
+from .mail_service import send_transactional_email
+from .validators_simple import (
+    validate_email_simple, validate_phone_simple,
+    validate_emails_bulk, validate_phones_bulk
+)
 
 logger = logging.getLogger(__name__)
 
+# Nombre maximum de valeurs par appel de validation en lot (imports CSV)
+BULK_VALIDATION_MAX_ITEMS = 10000
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def create_contact_invitation(request):
@@ -68,28 +76,11 @@ def create_contact_invitation(request):
                 }, status=status.HTTP_400_BAD_REQUEST)
             
             # Valider le numéro de téléphone international
-            phone_clean = ''.join(filter(str.isdigit, contact_phone.replace('+', '')))
-            
-            # Formats acceptés : France (+33), Madagascar (+261), USA (+1), UK (+44), etc.
-            valid_formats = [
-                # France
-                phone_clean.startswith('33') and len(phone_clean) >= 11,
-                phone_clean.startswith('06') or phone_clean.startswith('07'),
-                # Madagascar
-                phone_clean.startswith('261') and len(phone_clean) >= 12,
-                phone_clean.startswith('032') or phone_clean.startswith('033') or 
-                phone_clean.startswith('034') or phone_clean.startswith('038'),
-                # USA/Canada
-                phone_clean.startswith('1') and len(phone_clean) >= 11,
-                # UK
-                phone_clean.startswith('44') and len(phone_clean) >= 12,
-                # Autres formats internationaux (minimum 8 chiffres)
-                len(phone_clean) >= 8 and contact_phone.startswith('+')
-            ]
-            
-            if not any(valid_formats):
+            try:
+                contact_phone = validate_phone_simple(contact_phone)
+            except ValidationError as e:
                 return Response({
-                    'error': 'Format de numéro de téléphone invalide. Utilisez le format international (+261, +33, +1, etc.)'
+                    'error': ' '.join(e.messages)
                 }, status=status.HTTP_400_BAD_REQUEST)
             
             contact_email = None
@@ -135,6 +126,57 @@ def create_contact_invitation(request):
             'error': 'Erreur interne du serveur'
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def validate_contacts_bulk(request):
+    """
+    Valide en un seul appel des milliers d'emails et/ou de numéros de téléphone
+    (import CSV d'invitations). Body: {"emails": [...], "phones": [...]}
+    """
+    emails = request.data.get('emails') or []
+    phones = request.data.get('phones') or []
+    
+    if not isinstance(emails, list) or not isinstance(phones, list):
+        return Response({
+            'error': 'Les champs emails et phones doivent être des listes'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    if not emails and not phones:
+        return Response({
+            'error': 'Au moins une liste (emails ou phones) est requise'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    if len(emails) + len(phones) > BULK_VALIDATION_MAX_ITEMS:
+        return Response({
+            'error': f'Maximum {BULK_VALIDATION_MAX_ITEMS} valeurs par appel'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        response_data = {'success': True}
+        
+        for key, values, bulk_validator in (
+            ('emails', emails, validate_emails_bulk),
+            ('phones', phones, validate_phones_bulk),
+        ):
+            if not values:
+                continue
+            results = bulk_validator(values)
+            valid_count = sum(1 for result in results if result['valid'])
+            response_data[key] = {
+                'results': results,
+                'valid_count': valid_count,
+                'invalid_count': len(results) - valid_count,
+            }
+        
+        logger.info(f"Validation en lot par {request.user.username}: {len(emails)} emails, {len(phones)} téléphones")
+        return Response(response_data)
+        
+    except Exception as e:
+        logger.error(f"Erreur validation en lot: {str(e)}")
+        return Response({
+            'error': 'Erreur interne du serveur'
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
 def send_invitation_email(invitation, invitation_url):
     """Envoie l'invitation par email"""
     try:
@@ -214,38 +256,26 @@ L'équipe Sales Tracker Pro
 https://sales-tracker-pro-v3.vercel.app
         """.strip()
         
-        from django.core.mail import EmailMultiAlternatives
-        
-        # Créer l'email avec version HTML et texte
-        email = EmailMultiAlternatives(
-            subject=subject,
-            body=text_message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            to=[invitation.contact_email]
+        # Mise en file d'attente (connexion SMTP persistante côté worker)
+        return send_transactional_email(
+            subject, text_message, [invitation.contact_email],
+            html_message=html_message, fail_silently=True
         )
-        email.attach_alternative(html_message, "text/html")
-        email.send(fail_silently=True)
-        
-        return True
         
     except Exception as e:
         logger.error(f"Erreur envoi email invitation: {str(e)}")
         return False
 
 def send_invitation_sms(invitation, invitation_url):
-    """Envoie l'invitation par SMS"""
+    """Met l'invitation SMS en file d'attente (envoi limité en débit par fournisseur)"""
     try:
-        contact_phone = invitation.contact_phone
-        contact_name = invitation.contact_name
-        
-        # Envoyer le SMS d'invitation via le service international
-        sms_sent = international_sms_service.send_invitation_sms(
-            phone_number=contact_phone,
-            invitation_url=invitation_url,
-            contact_name=contact_name
-        )      
+        message_body = international_sms_service.build_invitation_message(
+            contact_name=invitation.contact_name,
+            invitation_url=invitation_url
+        )
         
-        return sms_sent
+        # Mise en file d'attente : le statut de l'invitation est mis à jour par le worker
+        return queue_sms(invitation.contact_phone, message_body, invitation_id=invitation.id)
         
     except Exception as e:
         logger.error(f"Erreur envoi SMS invitation: {str(e)}")
@@ -258,7 +288,7 @@ def validate_invitation_token(request, token):
     try:
         invitation = ClientInvitation.objects.get(
             invitation_token=token,
-            status='pending'
+            status__in=ClientInvitation.ACTIVE_STATUSES
         )
         
         if invitation.is_expired():
@@ -3,11 +3,28 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 from django.contrib.auth.models import User
-from .models import UserProfile
+from .models import UserProfile, DeviceToken
 from .firebase_config import FirebaseConfig
+from .push_service import push_service, queue_push_to_users
 from .two_factor_auth import TwoFactorAuth, EmailVerificationCode
 import json
 
+# Destinataires maximum d'une notification push envoyée par l'API
+MAX_PUSH_RECIPIENTS = 500
+
+def _push_targets_allowed(user, user_ids):
+    """
+    Cibles autorisées : soi-même, plus les utilisateurs créés par l'appelant (même périmètre
+    qu'AdminModelProfileViewSet) ; un superuser peut cibler tout le monde
+    """
+    if user.is_superuser:
+        return True
+    others = set(user_ids) - {user.id}
+    if not others:
+        return True
+    created = UserProfile.objects.filter(created_by=user, user_id__in=others).values_list('user_id', flat=True)
+    return others == set(created)
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def save_fcm_token(request):
@@ -17,11 +34,18 @@ def save_fcm_token(request):
         if not fcm_token:
             return Response({'error': 'Token FCM requis'}, status=status.HTTP_400_BAD_REQUEST)
         
-        # Sauvegarder le token dans le profil utilisateur
+        platform = request.data.get('platform', 'web')
+        if platform not in dict(DeviceToken.PLATFORM_CHOICES):
+            return Response({'error': 'Plateforme invalide'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Enregistrer l'appareil (un utilisateur peut en avoir plusieurs)
         user = request.user
+        push_service.register_token(user, fcm_token, platform)
+        
+        # Dernier token aussi conservé dans le profil (compatibilité)
         profile, created = UserProfile.objects.get_or_create(user=user)
         profile.fcm_token = fcm_token
-        profile.save()
+        profile.save(update_fields=['fcm_token'])
         
         return Response({'message': 'Token FCM sauvegardé avec succès'})
     
@@ -108,44 +132,54 @@ def link_firebase_account(request):
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def send_push_notification(request):
-    """Envoie une notification push à un utilisateur"""
+    """
+    Envoie une notification push à un ou plusieurs utilisateurs (tous leurs appareils)
+    Body: {"user_id": 1} ou {"user_ids": [1, 2, ...]}, "title", "body", "data"
+    """
     try:
+        user_ids = request.data.get('user_ids')
         user_id = request.data.get('user_id')
         title = request.data.get('title', 'Notification')
         body = request.data.get('body', 'Vous avez une nouvelle notification')
         data = request.data.get('data', {})
         
-        # Récupérer l'utilisateur cible
-        if user_id:
-            try:
-                target_user = User.objects.get(id=user_id)
-            except User.DoesNotExist:
-                return Response({'error': 'Utilisateur non trouvé'}, status=status.HTTP_404_NOT_FOUND)
+        # Récupérer les utilisateurs cibles
+        if user_ids is not None:
+            if not isinstance(user_ids, list):
+                return Response({'error': 'user_ids doit être une liste'}, status=status.HTTP_400_BAD_REQUEST)
+            if len(user_ids) > MAX_PUSH_RECIPIENTS:
+                return Response({'error': f'{MAX_PUSH_RECIPIENTS} destinataires maximum'}, status=status.HTTP_400_BAD_REQUEST)
+        elif user_id:
+            user_ids = [user_id]
         else:
-            target_user = request.user
+            user_ids = [request.user.id]
         
-        # Vérifier que l'utilisateur a un token FCM via son profil
         try:
-            profile = target_user.profile
-            if not profile.fcm_token:
-                return Response({'error': 'Utilisateur sans token FCM'}, status=status.HTTP_400_BAD_REQUEST)
-            fcm_token = profile.fcm_token
-        except UserProfile.DoesNotExist:
-            return Response({'error': 'Profil utilisateur non trouvé'}, status=status.HTTP_400_BAD_REQUEST)
+            user_ids = [int(target) for target in user_ids]
+        except (TypeError, ValueError):
+            return Response({'error': 'Identifiants utilisateur invalides'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Uniquement soi-même et les utilisateurs qu'on a créés
+        if not _push_targets_allowed(request.user, user_ids):
+            return Response({'error': 'Destinataire non autorisé'}, status=status.HTTP_403_FORBIDDEN)
+        
+        if user_id and not User.objects.filter(id=user_ids[0]).exists():
+            return Response({'error': 'Utilisateur non trouvé'}, status=status.HTTP_404_NOT_FOUND)
         
-        # Envoyer la notification
-        response = FirebaseConfig.send_push_notification(
-            token=fcm_token,
-            title=title,
-            body=body,
-            data=data
-        )
+        # Vérifier qu'au moins un appareil est enregistré
+        device_count = DeviceToken.objects.filter(user_id__in=user_ids).count()
+        if not device_count:
+            return Response({'error': 'Utilisateur sans token FCM'}, status=status.HTTP_400_BAD_REQUEST)
         
-        if response:
+        # Diffusion en arrière-plan (lots multicast)
+        queued = queue_push_to_users(user_ids, title, body, data)
+        
+        if queued:
             return Response({
-                'message': 'Notification envoyée avec succès',
-                'message_id': response
-            })
+                'message': 'Notification en cours d\'envoi',
+                'user_count': len(user_ids),
+                'device_count': device_count
+            }, status=status.HTTP_202_ACCEPTED)
         else:
             return Response({'error': 'Échec envoi notification'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     
@@ -12,7 +12,6 @@ from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 from django.views import View
-from django.core.mail import send_mail
 from django.conf import settings
 from django.template.loader import render_to_string
 from django.utils.html import strip_tags
@@ -20,14 +19,18 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from django.db.models import BooleanField, Case, Q, Value, When
+from django.utils.dateparse import parse_date
 import json
 
 from .models import ClientInvitation, UserProfile
 from .utils import generate_invitation_token, get_invitation_expiry, get_client_ip, get_user_agent
 from .validators_simple import validate_real_email
 from .password_validators import validate_strong_password
-from .firebase_config import FirebaseConfig
 from .admin_permissions import assign_client_admin_permissions
+from .mail_service import send_transactional_email
 # Firebase auth désactivé - utilisateurs gérés uniquement dans Django
 # from firebase_admin import auth as firebase_auth
 
@@ -502,14 +505,12 @@ def send_invitation_email(request):
         html_message = render_to_string('emails/client_invitation.html', context)
         plain_message = strip_tags(html_message)
         
-        # Envoyer l'email
-        send_mail(
-            subject=f'Invitation à rejoindre Sales Tracker Pro - Re: {invitation.contact_subject}',
-            message=plain_message,
-            from_email=settings.EMAIL_HOST_USER,
-            recipient_list=[invitation.contact_email],
-            html_message=html_message,
-            fail_silently=False,
+        # Envoyer l'email (mise en file d'attente)
+        send_transactional_email(
+            f'Invitation à rejoindre Sales Tracker Pro - Re: {invitation.contact_subject}',
+            plain_message,
+            [invitation.contact_email],
+            html_message=html_message
         )
         
         return Response({
@@ -522,12 +523,76 @@ def send_invitation_email(request):
             'error': f'Erreur lors de l\'envoi de l\'invitation: {str(e)}'
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+class InvitationPagination(PageNumberPagination):
+    """
+    Pagination de la liste des invitations (?page=N&page_size=M)
+    Activée uniquement si l'un de ces paramètres est fourni, pour que les
+    clients existants continuent de recevoir la liste complète.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+def get_invitations_queryset(user):
+    """
+    Invitations visibles par l'utilisateur, avec les indicateurs de validité
+    et d'expiration calculés par la base de données.
+    """
+    now = timezone.now()
+    queryset = ClientInvitation.objects.select_related('sent_by', 'created_user').annotate(
+        expired=Case(
+            When(expires_at__lt=now, then=Value(True)),
+            default=Value(False),
+            output_field=BooleanField()
+        ),
+        valid=Case(
+            When(status__in=ClientInvitation.ACTIVE_STATUSES, expires_at__gte=now, then=Value(True)),
+            default=Value(False),
+            output_field=BooleanField()
+        ),
+    )
+    
+    # Isolation des données : chaque admin ne voit que ses invitations
+    if not user.is_superuser:
+        queryset = queryset.filter(Q(owner=user) | Q(sent_by=user))
+    
+    return queryset
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsAdminUser])
 def list_invitations(request):
-    """Liste toutes les invitations"""
+    """
+    Liste des invitations de l'admin connecté, paginée si ?page ou
+    ?page_size est fourni (count/next/previous ajoutés à la réponse)
+    Filtres: status (liste séparée par des virgules), invitation_type,
+    created_from / created_to (AAAA-MM-JJ), valid (true/false)
+    """
     try:
-        invitations = ClientInvitation.objects.all()
+        invitations = get_invitations_queryset(request.user)
+        params = request.query_params
+        
+        if params.get('status'):
+            invitations = invitations.filter(status__in=params['status'].split(','))
+        
+        if params.get('invitation_type'):
+            invitations = invitations.filter(invitation_type=params['invitation_type'])
+        
+        for param, lookup in (('created_from', 'created_at__date__gte'), ('created_to', 'created_at__date__lte')):
+            if params.get(param):
+                date_value = parse_date(params[param])
+                if date_value is None:
+                    return Response({
+                        'error': f'Date invalide pour {param} (format attendu: AAAA-MM-JJ)'
+                    }, status=status.HTTP_400_BAD_REQUEST)
+                invitations = invitations.filter(**{lookup: date_value})
+        
+        if params.get('valid') in ('true', 'false'):
+            invitations = invitations.filter(valid=params['valid'] == 'true')
+        
+        paginator = None
+        if 'page' in params or 'page_size' in params:
+            paginator = InvitationPagination()
+            invitations = paginator.paginate_queryset(invitations, request)
         
         data = []
         for invitation in invitations:
@@ -535,21 +600,35 @@ def list_invitations(request):
                 'id': invitation.id,
                 'contact_name': invitation.contact_name,
                 'contact_email': invitation.contact_email,
+                'contact_phone': invitation.contact_phone,
                 'contact_subject': invitation.contact_subject,
+                'invitation_type': invitation.invitation_type,
                 'status': invitation.status,
                 'created_at': invitation.created_at,
                 'expires_at': invitation.expires_at,
                 'used_at': invitation.used_at,
                 'sent_by': invitation.sent_by.get_full_name() or invitation.sent_by.username,
                 'created_user': invitation.created_user.get_full_name() if invitation.created_user else None,
-                'is_valid': invitation.is_valid(),
-                'is_expired': invitation.is_expired(),
+                'is_valid': invitation.valid,
+                'is_expired': invitation.expired,
+            })
+        
+        if paginator is None:
+            return Response({
+                'invitations': data
             })
         
         return Response({
+            'count': paginator.page.paginator.count,
+            'next': paginator.get_next_link(),
+            'previous': paginator.get_previous_link(),
             'invitations': data
         })
         
+    except NotFound:
+        return Response({
+            'error': 'Page invalide'
+        }, status=status.HTTP_404_NOT_FOUND)
     except Exception as e:
         return Response({
             'error': f'Erreur lors de la récupération des invitations: {str(e)}'
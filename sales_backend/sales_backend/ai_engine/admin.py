@@ -0,0 +1,34 @@
+from django.contrib import admin
+from .models import AIInsight, ModelForecast, ModelSegment, SalesAnomaly
+
+@admin.register(AIInsight)
+class AIInsightAdmin(admin.ModelAdmin):
+    list_display = ['title', 'user', 'insight_type', 'priority', 'confidence_score', 'is_read', 'created_at']
+    list_filter = ['insight_type', 'priority', 'is_read', 'created_at']
+    search_fields = ['title', 'description', 'user__username', 'user__email']
+    list_select_related = ['user']
+    readonly_fields = ['created_at']
+
+@admin.register(ModelForecast)
+class ModelForecastAdmin(admin.ModelAdmin):
+    list_display = ['model_profile', 'method', 'total_predicted', 'horizon', 'observations', 'history_end', 'generated_at']
+    list_filter = ['method', 'history_end']
+    search_fields = ['model_profile__first_name', 'model_profile__last_name', 'model_profile__owner__username']
+    list_select_related = ['model_profile']
+    readonly_fields = ['generated_at']
+
+@admin.register(SalesAnomaly)
+class SalesAnomalyAdmin(admin.ModelAdmin):
+    list_display = ['model_profile', 'date', 'kind', 'amount', 'expected', 'score', 'detected_at']
+    list_filter = ['kind', 'date']
+    search_fields = ['model_profile__first_name', 'model_profile__last_name', 'model_profile__owner__username']
+    list_select_related = ['model_profile']
+    date_hierarchy = 'date'
+
+@admin.register(ModelSegment)
+class ModelSegmentAdmin(admin.ModelAdmin):
+    list_display = ['model_profile', 'segment', 'label', 'distance', 'computed_at']
+    list_filter = ['segment']
+    search_fields = ['model_profile__first_name', 'model_profile__last_name', 'model_profile__owner__username']
+    list_select_related = ['model_profile']
+    readonly_fields = ['computed_at']
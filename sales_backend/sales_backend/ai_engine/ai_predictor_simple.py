@@ -0,0 +1,164 @@
+import logging
+from datetime import timedelta
+import numpy as np
+from django.utils import timezone
+from .forecasting import TrendWeekdayFit, MIN_OBSERVATIONS
+from .models import AIInsight
+from .series import DEFAULT_HISTORY_DAYS, load_daily_matrix, tenant_models
+
+logger = logging.getLogger(__name__)
+
+WEEKDAY_NAMES = ('lundi', 'mardi', 'mercredi', 'jeudi', 'vendredi', 'samedi', 'dimanche')
+
+# Horizon maximal des prévisions (jours)
+MAX_HORIZON = 90
+
+def forecast_rows(model_ids, history_end, fit, horizon, rows=None):
+    """Prévisions sérialisables (une entrée par modèle ajusté) à partir du lendemain de history_end"""
+    rows = range(len(model_ids)) if rows is None else rows
+    mean, lower, upper = (bound.round(2) for bound in fit.predict(horizon))
+    dates = [(history_end + timedelta(days=offset)).isoformat() for offset in range(1, horizon + 1)]
+    trend = fit.trend_per_day().round(4)
+
+    return [
+        {
+            'model_id': int(model_ids[row]),
+            'method': 'mean' if fit.fallback[row] else 'trend_weekday',
+            'observations': int(fit.observations[row]),
+            'trend_per_day': float(trend[row]),
+            'total_predicted': round(float(mean[row].sum()), 2),
+            'forecast': [
+                {'date': day, 'predicted': predicted, 'lower': low, 'upper': high}
+                for day, predicted, low, high in zip(dates, mean[row].tolist(), lower[row].tolist(), upper[row].tolist())
+            ],
+        }
+        for row in rows
+    ]
+
+class SalesPredictor:
+    """
+    Prévisions et analyses des ventes d'un utilisateur (ses modèles + ceux des utilisateurs
+    qu'il a créés) : une requête charge toutes les séries, un seul ajustement matriciel
+    (tendance + jour de semaine) couvre tous les modèles.
+    """
+
+    def __init__(self, user, history_days=DEFAULT_HISTORY_DAYS):
+        self.user = user
+        self.history_days = history_days
+        self._models = None
+        self._matrix = None
+        self._fit = None
+
+    @property
+    def models(self):
+        if self._models is None:
+            self._models = {
+                model_id: f"{first_name} {last_name}".strip()
+                for model_id, first_name, last_name in tenant_models(self.user).values_list('id', 'first_name', 'last_name')
+            }
+        return self._models
+
+    @property
+    def matrix(self):
+        if self._matrix is None:
+            self._matrix = load_daily_matrix(self.models.keys(), days=self.history_days)
+        return self._matrix
+
+    @property
+    def fit(self):
+        if self._fit is None:
+            self._fit = TrendWeekdayFit.fit(self.matrix.values, self.matrix.observed, self.matrix.first_weekday)
+        return self._fit
+
+    def predict(self, horizon=30, model_ids=None):
+        """Prévisions journalières avec intervalle à 95 % pour chaque modèle (ou ceux de model_ids)"""
+        horizon = max(1, min(int(horizon), MAX_HORIZON))
+        matrix, fit = self.matrix, self.fit
+        rows = range(len(matrix.model_ids))
+        if model_ids is not None:
+            rows = [row for row in (matrix.row(model_id) for model_id in model_ids) if row is not None]
+
+        predictions = forecast_rows(matrix.model_ids, matrix.end, fit, horizon, rows)
+        for prediction in predictions:
+            prediction['model_name'] = self.models.get(prediction['model_id'], '')
+
+        return {
+            'generated_at': timezone.now().isoformat(),
+            'history_start': matrix.start.isoformat(),
+            'history_end': matrix.end.isoformat(),
+            'horizon': horizon,
+            'predictions': predictions,
+        }
+
+    def analyze_sales_trends(self):
+        """
+        Génère et enregistre les analyses du moment : résumé et tendance (7 derniers jours contre
+        les 7 précédents), prévision à 7 jours et meilleur jour de la semaine.
+        """
+        matrix = self.matrix
+        if not matrix.values.any():
+            return []
+
+        totals = matrix.values.sum(axis=0)
+        last_week, previous_week = totals[-7:].sum(), totals[-14:-7].sum()
+        insights = [
+            AIInsight(
+                user=self.user,
+                insight_type='summary',
+                title="Résumé des 7 derniers jours",
+                description=f"{last_week:.2f} $ de ventes sur 7 jours pour {len(self.models)} modèles.",
+                priority='low',
+                confidence_score=1.0,
+                data_payload={'last_7_days': round(float(last_week), 2), 'models': len(self.models)},
+            )
+        ]
+
+        if previous_week > 0:
+            growth = (last_week - previous_week) / previous_week * 100
+            insights.append(AIInsight(
+                user=self.user,
+                insight_type='trend',
+                title="Ventes en hausse" if growth >= 0 else "Ventes en baisse",
+                description=f"{growth:+.1f} % par rapport à la semaine précédente ({previous_week:.2f} $).",
+                priority='high' if abs(growth) >= 20 else 'medium',
+                confidence_score=0.8,
+                data_payload={
+                    'last_7_days': round(float(last_week), 2),
+                    'previous_7_days': round(float(previous_week), 2),
+                    'growth_percent': round(float(growth), 2),
+                },
+            ))
+
+        fit = self.fit
+        fitted = ~fit.fallback
+        mean, lower, upper = fit.predict(7)
+        predicted, low, high = mean.sum(), lower.sum(), upper.sum()
+        if predicted > 0:
+            insights.append(AIInsight(
+                user=self.user,
+                insight_type='forecast',
+                title="Prévision des 7 prochains jours",
+                description=f"Environ {predicted:.2f} $ attendus (entre {low:.2f} $ et {high:.2f} $).",
+                priority='medium',
+                confidence_score=round(float(max(0.0, 1 - (high - low) / (2 * predicted))), 2),
+                data_payload={'predicted': round(float(predicted), 2), 'lower': round(float(low), 2), 'upper': round(float(high), 2)},
+            ))
+
+        if fitted.any():
+            # Effet de chaque jour, pondéré par le volume de chaque modèle ajusté
+            weights = matrix.values[fitted].sum(axis=1)
+            effects = (fit.weekday_effects()[fitted] * weights[:, None]).sum(axis=0) / max(weights.sum(), 1e-9)
+            best = int(np.argmax(effects))
+            insights.append(AIInsight(
+                user=self.user,
+                insight_type='weekday',
+                title=f"Meilleur jour : {WEEKDAY_NAMES[best]}",
+                description=f"Le {WEEKDAY_NAMES[best]} rapporte en moyenne le plus sur les {self.history_days} derniers jours.",
+                priority='low',
+                confidence_score=round(float(min(1.0, fit.observations[fitted].mean() / (MIN_OBSERVATIONS * 4))), 2),
+                data_payload={'weekday_effects': dict(zip(WEEKDAY_NAMES, effects.round(2).tolist()))},
+            ))
+
+        AIInsight.objects.bulk_create(insights)
+        logger.info(f"🤖 {len(insights)} analyses générées pour {self.user.username}")
+        return insights
@@ -0,0 +1,126 @@
+import logging
+from datetime import timedelta
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from accounts.models import UserProfile
+from sales.models import ModelProfile
+from .insights import WEEKDAY_NAMES
+from .models import TenantAnalytics
+from .series import load_daily_matrix, tenant_models
+
+logger = logging.getLogger(__name__)
+
+# Fenêtres glissantes (jours) ; l'historique couvre aussi la période précédente de la plus longue
+WINDOWS = (7, 30, 90)
+HISTORY_DAYS = 2 * max(WINDOWS)
+
+TOP_MODELS = 5
+
+def rebuild_tenant(user, today=None):
+    """Reconstruction complète : une lecture des modèles, une agrégation par modèle et par jour"""
+    today = today or timezone.localdate()
+    names = {
+        model_id: f"{first_name} {last_name}".strip()
+        for model_id, first_name, last_name in tenant_models(user).values_list('id', 'first_name', 'last_name')
+    }
+    matrix = load_daily_matrix(names.keys(), end=today, days=HISTORY_DAYS)
+    sums = [matrix.values[:, -window:].sum(axis=1).round(2) for window in WINDOWS]
+
+    features = TenantAnalytics(
+        user=user,
+        as_of=today,
+        daily_totals=matrix.values.sum(axis=0).round(2).tolist(),
+        model_totals={
+            str(model_id): {'name': names[model_id], 'sums': [float(window_sums[row]) for window_sums in sums]}
+            for row, model_id in enumerate(matrix.model_ids.tolist())
+        },
+    )
+    features.summary = summarize(features)
+    features.save()
+    return features
+
+def rebuild_all(today=None):
+    """Reconstruction quotidienne : les fenêtres glissent avec la date"""
+    today = today or timezone.localdate()
+    owners = ModelProfile.objects.values('owner_id')
+    creators = UserProfile.objects.filter(user__in=owners, created_by__is_staff=True).values('created_by_id')
+    count = 0
+    for user in User.objects.filter(Q(id__in=owners) | Q(id__in=creators)).iterator():
+        rebuild_tenant(user, today)
+        count += 1
+    logger.info(f"📊 Indicateurs reconstruits pour {count} utilisateurs")
+    return count
+
+def tenants_of_models(model_ids):
+    """Utilisateurs dont les indicateurs incluent ces modèles : les propriétaires et les admins qui les ont créés"""
+    user_ids = set()
+    rows = ModelProfile.objects.filter(id__in=model_ids).values_list(
+        'owner_id', 'owner__profile__created_by_id', 'owner__profile__created_by__is_staff'
+    )
+    for owner_id, creator_id, creator_is_staff in rows:
+        user_ids.add(owner_id)
+        if creator_id and creator_is_staff:
+            user_ids.add(creator_id)
+    return user_ids
+
+def refresh_models(model_ids):
+    """
+    Reconstruit les indicateurs des utilisateurs concernés par des ventes modifiées. Idempotent :
+    une reconstruction lit les ventes validées, qu'une autre l'ait déjà prise en compte ou non
+    (appliquer une variation compterait deux fois une vente vue par une reconstruction antérieure).
+    """
+    today = timezone.localdate()
+    count = 0
+    for user in User.objects.filter(id__in=tenants_of_models(model_ids)).iterator():
+        with transaction.atomic():
+            # Verrou sur la ligne existante : des reconstructions concurrentes s'enchaînent
+            # et la dernière lit les ventes les plus récentes
+            TenantAnalytics.objects.select_for_update().filter(user=user).first()
+            rebuild_tenant(user, today)
+        count += 1
+    return count
+
+def summarize(features):
+    """Résumé du tableau de bord, calculé à chaque écriture depuis les indicateurs (aucune requête)"""
+    daily = features.daily_totals
+    periods = {}
+    for window in WINDOWS:
+        total = sum(daily[-window:])
+        previous = sum(daily[-2 * window:-window])
+        periods[f'{window}d'] = {
+            'total': round(total, 2),
+            'previous': round(previous, 2),
+            'growth_percent': round((total - previous) / previous * 100, 2) if previous else None,
+            'daily_average': round(total / window, 2),
+        }
+
+    # Moyenne par jour de semaine sur la plus longue fenêtre
+    window = max(WINDOWS)
+    first_day = features.as_of - timedelta(days=window - 1)
+    weekday_totals, weekday_days = [0.0] * 7, [0] * 7
+    for offset, amount in enumerate(daily[-window:]):
+        weekday = (first_day + timedelta(days=offset)).weekday()
+        weekday_totals[weekday] += amount
+        weekday_days[weekday] += 1
+    averages = [round(total / days, 2) if days else 0.0 for total, days in zip(weekday_totals, weekday_days)]
+    best = max(range(7), key=averages.__getitem__)
+
+    models = sorted(features.model_totals.items(), key=lambda item: item[1]['sums'][1], reverse=True)
+    return {
+        'as_of': features.as_of.isoformat(),
+        'updated_at': timezone.now().isoformat(),
+        'periods': periods,
+        'best_weekday': {'weekday': best, 'name': WEEKDAY_NAMES[best], 'average': averages[best]} if any(averages) else None,
+        'weekday_averages': dict(zip(WEEKDAY_NAMES, averages)),
+        'models_count': len(features.model_totals),
+        'top_models': [
+            {
+                'model_id': int(model_id),
+                'name': model['name'],
+                **{f'total_{window}d': total for window, total in zip(WINDOWS, model['sums'])},
+            }
+            for model_id, model in models[:TOP_MODELS]
+        ],
+    }
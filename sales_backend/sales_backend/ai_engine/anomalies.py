@@ -0,0 +1,170 @@
+import logging
+from datetime import timedelta
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db.models import Q
+from django.utils import timezone
+from sales.models import ModelProfile
+from .batch_forecast import shard_model_ids
+from .models import SalesAnomaly
+from .series import load_daily_matrix, stream_daily_matrix
+
+logger = logging.getLogger(__name__)
+
+# Fenêtre de référence (jours précédant le jour examiné) : médiane et MAD glissantes
+WINDOW_DAYS = 28
+
+# Seuil du z-score robuste 0.6745 * (x - médiane) / MAD (Iglewicz et Hoaglin)
+Z_THRESHOLD = 3.5
+
+# MAD plancher (échelle log, ~5 %) : une série très régulière ne rend pas tout écart « anormal »
+MAD_FLOOR = 0.05
+
+# Jour sans vente signalé comme saisie manquante si le modèle a vendu au moins cette part
+# des jours de la fenêtre (1.0 : chaque jour, un jour vide est alors très probablement un oubli)
+MISSING_MIN_ACTIVITY = 1.0
+
+# Jours clos réexaminés par le passage nocturne (rattrape les saisies tardives)
+DEFAULT_LOOKBACK_DAYS = 7
+
+# Anomalies détaillées par notification WebSocket
+NOTIFICATION_LIMIT = 50
+
+KIND_CODES = ('', 'spike', 'drop', 'missing')
+
+def detect(values, lookback, window=WINDOW_DAYS, threshold=Z_THRESHOLD, spikes_only=False):
+    """
+    Examine les `lookback` dernières colonnes de chaque série, chacune contre les `window` jours
+    qui la précèdent, en un seul passage vectorisé. Les écarts sont mesurés en échelle log
+    (ventes multiplicatives : une division par 3 est aussi inhabituelle qu'un triplement).
+    Retourne (codes, z, médianes en $), de forme (modèles, lookback) ; code 0 = normal,
+    sinon index dans KIND_CODES.
+    """
+    history = values[:, -(lookback + window):]
+    windows = sliding_window_view(history, window, axis=1)[:, :lookback]
+    targets = history[:, window:]
+
+    log_windows = np.log1p(np.maximum(windows, 0))
+    log_median = np.median(log_windows, axis=2)
+    mad = np.maximum(np.median(np.abs(log_windows - log_median[..., None]), axis=2), MAD_FLOOR)
+    z = 0.6745 * (np.log1p(np.maximum(targets, 0)) - log_median) / mad
+    median = np.median(windows, axis=2)
+
+    # Médiane non nulle : le modèle a vendu au moins un jour sur deux dans la fenêtre
+    eligible = median > 0
+    codes = np.zeros(targets.shape, dtype=np.int8)
+    codes[eligible & (z > threshold)] = 1
+    if not spikes_only:
+        active = (windows > 0).mean(axis=2) >= MISSING_MIN_ACTIVITY
+        codes[eligible & (z < -threshold) & (targets > 0)] = 2
+        codes[eligible & (targets == 0) & active] = 3
+    return codes, z, median
+
+def _anomalies(matrix, codes, z, median, lookback):
+    """SalesAnomaly (non enregistrées) pour chaque cellule signalée"""
+    rows, cols = np.nonzero(codes)
+    first_day = matrix.end - timedelta(days=lookback - 1)
+    return [
+        SalesAnomaly(
+            model_profile_id=int(matrix.model_ids[row]),
+            date=first_day + timedelta(days=int(col)),
+            kind=KIND_CODES[codes[row, col]],
+            amount=round(float(matrix.values[row, matrix.days - lookback + col]), 2),
+            expected=round(float(median[row, col]), 2),
+            score=round(float(z[row, col]), 2),
+        )
+        for row, col in zip(rows.tolist(), cols.tolist())
+    ]
+
+def _store(candidates, model_ids, start, end):
+    """
+    Enregistre les anomalies absentes, retire celles qui ne sont plus signalées sur la période
+    (saisie tardive, correction) et retourne les nouvelles.
+    """
+    existing = set(
+        SalesAnomaly.objects
+        .filter(model_profile_id__in=model_ids, date__range=(start, end))
+        .values_list('model_profile_id', 'date')
+    )
+    flagged = {(anomaly.model_profile_id, anomaly.date) for anomaly in candidates}
+    new = [anomaly for anomaly in candidates if (anomaly.model_profile_id, anomaly.date) not in existing]
+
+    resolved = existing - flagged
+    if resolved:
+        condition = Q()
+        for model_id, day in resolved:
+            condition |= Q(model_profile_id=model_id, date=day)
+        SalesAnomaly.objects.filter(condition).delete()
+    SalesAnomaly.objects.bulk_create(new, ignore_conflicts=True)
+    return new
+
+def notify_admins_anomalies(anomalies):
+    """Pousse les nouvelles anomalies aux admins connectés (WebSocket)"""
+    if not anomalies:
+        return
+    try:
+        channel_layer = get_channel_layer()
+        if channel_layer:
+            names = dict(
+                (model_id, f"{first_name} {last_name}".strip())
+                for model_id, first_name, last_name in ModelProfile.objects
+                .filter(id__in={anomaly.model_profile_id for anomaly in anomalies[:NOTIFICATION_LIMIT]})
+                .values_list('id', 'first_name', 'last_name')
+            )
+            async_to_sync(channel_layer.group_send)(
+                'admin_notifications',
+                {
+                    'type': 'send_notification',
+                    'message': {
+                        'type': 'sales_anomalies',
+                        'count': len(anomalies),
+                        'anomalies': [
+                            {
+                                'model_id': anomaly.model_profile_id,
+                                'model_name': names.get(anomaly.model_profile_id, ''),
+                                'date': anomaly.date.isoformat(),
+                                'kind': anomaly.kind,
+                                'amount': float(anomaly.amount),
+                                'expected': float(anomaly.expected),
+                                'score': anomaly.score,
+                            }
+                            for anomaly in anomalies[:NOTIFICATION_LIMIT]
+                        ],
+                        'timestamp': timezone.now().isoformat()
+                    }
+                }
+            )
+    except Exception as e:
+        logger.error(f"Erreur notification des anomalies de ventes: {str(e)}")
+
+def detect_all(lookback=DEFAULT_LOOKBACK_DAYS, end=None, shard_size=2000):
+    """
+    Passage nocturne : les `lookback` derniers jours clos de tous les modèles, par lots
+    (lecture en flux, détection vectorisée, un insert), puis une notification.
+    """
+    end = end or timezone.localdate() - timedelta(days=1)
+    start = end - timedelta(days=lookback - 1)
+    model_ids = list(ModelProfile.objects.order_by('id').values_list('id', flat=True))
+
+    new = []
+    for shard in shard_model_ids(model_ids, shard_size):
+        matrix = stream_daily_matrix(shard, end=end, days=lookback + WINDOW_DAYS)
+        codes, z, median = detect(matrix.values, lookback)
+        new += _store(_anomalies(matrix, codes, z, median, lookback), shard, start, end)
+
+    notify_admins_anomalies(new)
+    logger.info(f"🚨 Anomalies de ventes: {len(new)} nouvelles sur {len(model_ids)} modèles ({start} -> {end})")
+    return {'models': len(model_ids), 'new': len(new)}
+
+def check_sale_day(model_id, day):
+    """
+    Réexamen d'un jour après une saisie : pics uniquement tant que le jour est en cours
+    (le total peut encore augmenter), tous les types pour un jour clos.
+    """
+    matrix = load_daily_matrix([model_id], end=day, days=WINDOW_DAYS + 1)
+    codes, z, median = detect(matrix.values, 1, spikes_only=day >= timezone.localdate())
+    new = _store(_anomalies(matrix, codes, z, median, 1), [model_id], day, day)
+    notify_admins_anomalies(new)
+    return new
@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class AiEngineConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'ai_engine'
+    verbose_name = 'Moteur IA'
+
+    def ready(self):
+        import ai_engine.signals
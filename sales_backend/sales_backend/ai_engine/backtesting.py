@@ -0,0 +1,137 @@
+import logging
+import time
+from datetime import timedelta
+import numpy as np
+from django.utils import timezone
+from sales.models import ModelProfile
+from .batch_forecast import DEFAULT_SHARD_SIZE, shard_model_ids
+from .forecasting import TrendWeekdayFit
+from .series import DEFAULT_HISTORY_DAYS, stream_daily_matrix
+
+logger = logging.getLogger(__name__)
+
+class NaiveForecaster:
+    """Dernier jour observé répété sur tout l'horizon"""
+
+    def __init__(self, values, observed, first_weekday):
+        self.last = values[:, -1]
+
+    def predict(self, horizon):
+        return np.repeat(self.last[:, None], horizon, axis=1)
+
+class SeasonalNaiveForecaster:
+    """Dernière semaine observée répétée (même jour de la semaine précédente)"""
+
+    def __init__(self, values, observed, first_weekday):
+        self.week = values[:, -7:]
+
+    def predict(self, horizon):
+        return np.tile(self.week, (1, horizon // 7 + 1))[:, :horizon]
+
+class TrendWeekdayForecaster:
+    """Tendance linéaire + jour de semaine (modèle des prévisions en production)"""
+
+    def __init__(self, values, observed, first_weekday):
+        self.fit = TrendWeekdayFit.fit(values, observed, first_weekday)
+
+    def predict(self, horizon):
+        return self.fit.predict(horizon)[0]
+
+FORECASTERS = {
+    'naive': NaiveForecaster,
+    'seasonal_naive': SeasonalNaiveForecaster,
+    'trend_weekday': TrendWeekdayForecaster,
+}
+
+class _Score:
+    """Erreurs et durées cumulées d'une méthode sur tous les lots et toutes les origines"""
+
+    def __init__(self):
+        self.absolute_error = 0.0
+        self.points = 0
+        self.percentage_error = 0.0
+        self.percentage_points = 0
+        self.fits = 0
+        self.fit_seconds = 0.0
+        self.predict_seconds = 0.0
+
+    def add(self, predicted, actual, fit_seconds, predict_seconds):
+        errors = np.abs(predicted - actual)
+        selling = actual > 0
+        self.absolute_error += errors.sum()
+        self.points += errors.size
+        self.percentage_error += (errors[selling] / actual[selling]).sum()
+        self.percentage_points += int(selling.sum())
+        self.fits += len(actual)
+        self.fit_seconds += fit_seconds
+        self.predict_seconds += predict_seconds
+
+    def summary(self):
+        fits = max(self.fits, 1)
+        total = self.fit_seconds + self.predict_seconds
+        return {
+            'mae': round(self.absolute_error / max(self.points, 1), 2),
+            # MAPE sur les seuls jours avec ventes (indéfini quand le réel est nul)
+            'mape': round(self.percentage_error / max(self.percentage_points, 1) * 100, 2),
+            'fit_us_per_model': round(self.fit_seconds / fits * 1e6, 2),
+            'predict_us_per_model': round(self.predict_seconds / fits * 1e6, 2),
+            'models_per_second': round(self.fits / total) if total else None,
+        }
+
+def backtest(methods=None, horizon=14, origins=4, step=7, train_days=DEFAULT_HISTORY_DAYS,
+             end=None, shard_size=DEFAULT_SHARD_SIZE, progress=None):
+    """
+    Évaluation à origine glissante : pour chaque lot de modèles (ventes lues en flux une seule fois),
+    chaque origine ajuste chaque méthode sur les `train_days` jours précédents et compare ses
+    prévisions aux `horizon` jours réels suivants. La dernière fenêtre de test se termine à `end`.
+    Seuls les modèles ayant vendu pendant la fenêtre d'apprentissage sont évalués.
+    """
+    methods = methods or list(FORECASTERS)
+    end = end or timezone.localdate() - timedelta(days=1)
+    span = train_days + (origins - 1) * step + horizon
+    model_ids = list(ModelProfile.objects.order_by('id').values_list('id', flat=True))
+    scores = {method: _Score() for method in methods}
+
+    started_at = time.perf_counter()
+    load_seconds = 0.0
+    evaluated = done = 0
+    for shard in shard_model_ids(model_ids, shard_size):
+        load_started_at = time.perf_counter()
+        matrix = stream_daily_matrix(shard, end=end, days=span)
+        load_seconds += time.perf_counter() - load_started_at
+
+        for origin in range(train_days, span - horizon + 1, step):
+            window = slice(origin - train_days, origin)
+            train, observed = matrix.values[:, window], matrix.observed[:, window]
+            active = observed.any(axis=1)
+            if not active.any():
+                continue
+            train, observed = train[active], observed[active]
+            actual = matrix.values[active, origin:origin + horizon]
+            first_weekday = (matrix.first_weekday + origin - train_days) % 7
+            evaluated += int(active.sum())
+
+            for method in methods:
+                fit_started_at = time.perf_counter()
+                forecaster = FORECASTERS[method](train, observed, first_weekday)
+                predict_started_at = time.perf_counter()
+                predicted = forecaster.predict(horizon)
+                finished_at = time.perf_counter()
+                scores[method].add(predicted, actual, predict_started_at - fit_started_at, finished_at - predict_started_at)
+
+        done += len(shard)
+        if progress:
+            progress(done, len(model_ids))
+
+    seconds = time.perf_counter() - started_at
+    logger.info(f"📏 Backtest: {len(model_ids)} modèles, {origins} origines, {len(methods)} méthodes ({seconds:.1f}s)")
+    return {
+        'models': len(model_ids),
+        'evaluations': evaluated,
+        'origins': origins,
+        'horizon': horizon,
+        'test_end': end.isoformat(),
+        'seconds': round(seconds, 2),
+        'load_seconds': round(load_seconds, 2),
+        'methods': {method: score.summary() for method, score in scores.items()},
+    }
@@ -0,0 +1,86 @@
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date
+from django.db import connections
+from django.utils import timezone
+from sales.models import ModelProfile
+from .forecast_state import DEFAULT_HORIZON, refit_models
+from .series import DEFAULT_HISTORY_DAYS
+
+logger = logging.getLogger(__name__)
+
+# Modèles par lot : une lecture en flux, un ajustement matriciel et un upsert par lot
+DEFAULT_SHARD_SIZE = 500
+
+def shard_model_ids(model_ids, shard_size=DEFAULT_SHARD_SIZE):
+    """Découpe des identifiants triés en lots contigus (plages d'index favorables aux lectures)"""
+    return [model_ids[index:index + shard_size] for index in range(0, len(model_ids), shard_size)]
+
+def forecast_shard(model_ids, end_ordinal, days, horizon):
+    """
+    Traite un lot complet dans le processus courant : ventes lues en flux, ajustement,
+    puis un seul INSERT ... ON CONFLICT UPDATE. Retourne (modèles traités, durée en secondes).
+    """
+    started_at = time.perf_counter()
+    refit_models(model_ids, end=date.fromordinal(end_ordinal), days=days, horizon=horizon)
+    return len(model_ids), time.perf_counter() - started_at
+
+def _init_worker():
+    """Processus fils (fork ou spawn) : Django prêt, connexions ouvertes à la demande"""
+    import django
+    django.setup()
+
+def run_batch_forecast(horizon=DEFAULT_HORIZON, days=DEFAULT_HISTORY_DAYS, workers=None, shard_size=DEFAULT_SHARD_SIZE, end=None, progress=None):
+    """
+    Prévisions de tous les modèles, lots répartis sur un pool de processus (un par cœur par défaut).
+    Dans un processus démon (worker Celery prefork), qui ne peut pas créer de fils, les lots sont
+    traités en séquence. `progress(done, total)` est appelé après chaque lot.
+    """
+    started_at = time.perf_counter()
+    end = end or timezone.localdate()
+    model_ids = list(ModelProfile.objects.order_by('id').values_list('id', flat=True))
+    shards = shard_model_ids(model_ids, shard_size)
+
+    workers = min(workers or os.cpu_count() or 1, max(len(shards), 1))
+    if multiprocessing.current_process().daemon:
+        workers = 1
+
+    done = 0
+    shard_seconds = 0.0
+    if workers == 1:
+        for shard in shards:
+            count, elapsed = forecast_shard(shard, end.toordinal(), days, horizon)
+            done += count
+            shard_seconds += elapsed
+            if progress:
+                progress(done, len(model_ids))
+    else:
+        # Les fils ne doivent pas hériter des connexions ouvertes du parent
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            futures = [pool.submit(forecast_shard, shard, end.toordinal(), days, horizon) for shard in shards]
+            for future in as_completed(futures):
+                count, elapsed = future.result()
+                done += count
+                shard_seconds += elapsed
+                if progress:
+                    progress(done, len(model_ids))
+
+    elapsed = time.perf_counter() - started_at
+    stats = {
+        'models': len(model_ids),
+        'shards': len(shards),
+        'workers': workers,
+        'seconds': round(elapsed, 3),
+        'models_per_second': round(len(model_ids) / elapsed, 1) if elapsed else 0.0,
+        # Débit d'un seul processus : le rapport des deux mesure l'efficacité du parallélisme
+        'models_per_worker_second': round(len(model_ids) / shard_seconds, 1) if shard_seconds else 0.0,
+    }
+    logger.info(
+        f"🤖 Prévisions en lot: {stats['models']} modèles, {stats['shards']} lots, {workers} processus, "
+        f"{stats['seconds']}s ({stats['models_per_second']} modèles/s)"
+    )
+    return stats
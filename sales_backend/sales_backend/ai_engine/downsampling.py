@@ -0,0 +1,65 @@
+import numpy as np
+
+def lttb(x, y, n):
+    """
+    Largest-Triangle-Three-Buckets : indices (triés) des `n` points qui conservent au mieux
+    la forme de la courbe. Premier et dernier points toujours gardés ; moyennes des seaux
+    calculées d'un bloc, puis un choix vectorisé par seau.
+    """
+    size = len(x)
+    if n >= size:
+        return np.arange(size)
+    if n < 3:
+        return np.array([0, size - 1])[:max(n, 1)]
+
+    # n - 2 seaux entre le premier et le dernier point, puis le dernier point seul
+    starts = np.linspace(1, size - 1, n - 1).astype(np.int64)
+    counts = np.diff(np.append(starts, size))
+    mean_x = np.add.reduceat(x, starts) / counts
+    mean_y = np.add.reduceat(y, starts) / counts
+
+    selected = np.empty(n, dtype=np.int64)
+    selected[0], selected[-1] = 0, size - 1
+    previous = 0
+    for bucket in range(n - 2):
+        start, end = starts[bucket], starts[bucket + 1]
+        # Aire du triangle (point retenu précédent, candidat, moyenne du seau suivant)
+        area = np.abs(
+            (x[previous] - mean_x[bucket + 1]) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (mean_y[bucket + 1] - y[previous])
+        )
+        previous = start + int(np.argmax(area))
+        selected[bucket + 1] = previous
+    return selected
+
+def minmax(x, y, n):
+    """
+    Minimum et maximum de chaque seau (au plus `n` points, premier et dernier inclus) :
+    préserve les pics et les creux, entièrement vectorisé.
+    """
+    size = len(y)
+    if n >= size:
+        return np.arange(size)
+    if n < 4:
+        # Pas de place pour un seau (min, max) en plus des extrémités
+        return lttb(x, y, n)
+
+    buckets = max((n - 2) // 2, 1)
+    width = -(-size // buckets)
+    buckets = -(-size // width)
+    padded = np.full(buckets * width, np.nan)
+    padded[:size] = y
+    padded = padded.reshape(buckets, width)
+
+    offsets = np.arange(buckets) * width
+    selected = np.concatenate((
+        [0, size - 1],
+        offsets + np.nanargmin(padded, axis=1),
+        offsets + np.nanargmax(padded, axis=1),
+    ))
+    return np.unique(selected)
+
+DOWNSAMPLERS = {
+    'lttb': lttb,
+    'minmax': minmax,
+}
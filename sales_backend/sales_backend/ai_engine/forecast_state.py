@@ -0,0 +1,187 @@
+import logging
+from datetime import timedelta
+import numpy as np
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+from sales.models import DailySale
+from .ai_predictor_simple import forecast_rows
+from .forecasting import MIN_OBSERVATIONS, TrendWeekdayFit, design_matrix
+from .models import ModelForecast
+from .series import DEFAULT_HISTORY_DAYS, stream_daily_matrix
+
+logger = logging.getLogger(__name__)
+
+# Horizon des prévisions enregistrées (jours)
+DEFAULT_HORIZON = 30
+
+# Dérive : moyenne mobile exponentielle des résidus standardisés des jours clos ;
+# au-delà du seuil (biais persistant d'environ 1 écart-type), réajustement complet
+DRIFT_ALPHA = 0.1
+DRIFT_THRESHOLD = 1.0
+
+# La fenêtre s'allonge avec les mises à jour : réajustement quand elle dépasse ce multiple de l'historique
+MAX_WINDOW_FACTOR = 2
+
+STATE_FIELDS = [
+    'method', 'history_end', 'horizon', 'observations', 'trend_per_day', 'total_predicted', 'forecast',
+    'generated_at', 'origin', 'gram', 'moments', 'sum_squares', 'last_day_total', 'coefficients', 'sigma',
+    'drift_score', 'refitted_at',
+]
+
+def _rendered(entry, fit, row):
+    """Champs de prévision (sérialisés) d'un modèle à partir d'un ajustement"""
+    return {
+        'method': entry['method'],
+        'observations': entry['observations'],
+        'trend_per_day': entry['trend_per_day'],
+        'total_predicted': entry['total_predicted'],
+        'forecast': entry['forecast'],
+        'coefficients': fit.coefficients[row].round(6).tolist(),
+        'sigma': float(fit.sigma[row]),
+    }
+
+def refit_models(model_ids, end=None, days=DEFAULT_HISTORY_DAYS, horizon=DEFAULT_HORIZON):
+    """Réajustement complet (ventes lues en flux) et un seul upsert pour tous les modèles donnés"""
+    matrix = stream_daily_matrix(model_ids, end=end, days=days)
+    gram, moments, sum_squares = TrendWeekdayFit.statistics(matrix.values, matrix.observed, matrix.first_weekday)
+    fit = TrendWeekdayFit.from_statistics(gram, moments, sum_squares, matrix.days, matrix.first_weekday)
+    now = timezone.now()
+
+    states = [
+        ModelForecast(
+            model_profile_id=entry['model_id'],
+            history_end=matrix.end,
+            horizon=horizon,
+            generated_at=now,
+            origin=matrix.start,
+            gram=gram[row].tolist(),
+            moments=moments[row].tolist(),
+            sum_squares=float(sum_squares[row]),
+            last_day_total=float(matrix.values[row, -1]),
+            drift_score=0.0,
+            refitted_at=now,
+            **_rendered(entry, fit, row),
+        )
+        for row, entry in enumerate(forecast_rows(matrix.model_ids, matrix.end, fit, horizon))
+    ]
+    ModelForecast.objects.bulk_create(
+        states, update_conflicts=True, unique_fields=['model_profile'], update_fields=STATE_FIELDS
+    )
+    return len(states)
+
+def fit_state(state):
+    """Ajustement reconstruit depuis les statistiques enregistrées (système 8x8, sans lire les ventes)"""
+    return TrendWeekdayFit.from_statistics(
+        np.array([state.gram], dtype=np.float64),
+        np.array([state.moments], dtype=np.float64),
+        np.array([state.sum_squares]),
+        (state.history_end - state.origin).days + 1,
+        state.origin.weekday(),
+    )
+
+def _day_total(model_id, day):
+    total = DailySale.objects.filter(model_profile_id=model_id, date=day).aggregate(total=Sum('amount_usd'))['total']
+    return float(total or 0)
+
+def _update_statistics(state, day, delta):
+    """
+    Ajoute une variation `delta` des ventes du jour `day` aux statistiques suffisantes.
+    Retourne la raison d'un réajustement complet nécessaire, ou None.
+    """
+    if day < state.origin:
+        return 'vente antérieure à la fenêtre'
+
+    first_weekday = state.origin.weekday()
+    gram = np.array(state.gram, dtype=np.float64)
+    moments = np.array(state.moments, dtype=np.float64)
+    observations = int(round(gram[0, 0]))
+    end_offset = (state.history_end - state.origin).days
+    day_offset = (day - state.origin).days
+
+    if day > state.history_end:
+        if observations:
+            # Jours clos : history_end (total désormais définitif) puis les jours sans vente jusqu'à la veille
+            fit = fit_state(state)
+            if observations >= MIN_OBSERVATIONS and fit.sigma[0] > 0:
+                closed = design_matrix(np.arange(end_offset, day_offset), first_weekday)
+                actual = np.zeros(len(closed))
+                actual[0] = state.last_day_total
+                residuals = (actual - closed @ fit.coefficients[0]) / fit.sigma[0]
+                for residual in residuals:
+                    state.drift_score = (1 - DRIFT_ALPHA) * state.drift_score + DRIFT_ALPHA * float(residual)
+            new_days = design_matrix(np.arange(end_offset + 1, day_offset + 1), first_weekday)
+        else:
+            # Premier jour observé du modèle
+            new_days = design_matrix([day_offset], first_weekday)
+        gram += new_days.T @ new_days
+        state.history_end = day
+        state.last_day_total = 0.0
+        before = 0.0
+    elif not observations or day < state.history_end - timedelta(days=observations - 1):
+        return 'vente antérieure au premier jour observé'
+    elif day == state.history_end:
+        before = state.last_day_total
+    else:
+        # Appelé après validation de la transaction : le total en base inclut déjà la variation
+        before = _day_total(state.model_profile_id, day) - delta
+
+    moments += design_matrix([day_offset], first_weekday)[0] * delta
+    state.sum_squares += (before + delta) ** 2 - before ** 2
+    if day == state.history_end:
+        state.last_day_total = before + delta
+    state.gram, state.moments = gram.tolist(), moments.tolist()
+
+    if abs(state.drift_score) > DRIFT_THRESHOLD:
+        return f'dérive détectée ({state.drift_score:+.2f})'
+    if (state.history_end - state.origin).days + 1 > MAX_WINDOW_FACTOR * DEFAULT_HISTORY_DAYS:
+        return 'fenêtre trop longue'
+    return None
+
+def apply_sale_change(model_id, day, delta):
+    """
+    Met à jour en ligne l'état de prévision d'un modèle après l'ajout, la modification ou la
+    suppression d'une vente. Retourne 'updated', ou 'refit' si un réajustement complet a été fait.
+    """
+    with transaction.atomic():
+        state = ModelForecast.objects.select_for_update().filter(model_profile_id=model_id).first()
+        reason = 'aucun état enregistré' if state is None or state.origin is None else _update_statistics(state, day, delta)
+
+        if reason:
+            horizon = state.horizon if state else DEFAULT_HORIZON
+            refit_models([model_id], end=max(day, timezone.localdate()), horizon=horizon)
+            logger.info(f"🔮 Prévision du modèle #{model_id} réajustée: {reason}")
+            return 'refit'
+
+        fit = fit_state(state)
+        entry = forecast_rows([model_id], state.history_end, fit, state.horizon)[0]
+        for field, value in _rendered(entry, fit, 0).items():
+            setattr(state, field, value)
+        state.generated_at = timezone.now()
+        state.save(update_fields=STATE_FIELDS)
+        return 'updated'
+
+def stored_predictions(states, horizon):
+    """
+    Prévisions servies depuis les états enregistrés : tranche de la prévision rendue si l'horizon
+    est couvert, sinon prolongée depuis les statistiques (aucune lecture des ventes).
+    """
+    predictions = []
+    for state in states:
+        forecast = state.forecast[:horizon]
+        total = float(state.total_predicted) if horizon == state.horizon else round(sum(day['predicted'] for day in forecast), 2)
+        if horizon > len(state.forecast) and state.origin:
+            entry = forecast_rows([state.model_profile_id], state.history_end, fit_state(state), horizon)[0]
+            forecast, total = entry['forecast'], entry['total_predicted']
+        predictions.append({
+            'model_id': state.model_profile_id,
+            'model_name': f"{state.model_profile.first_name} {state.model_profile.last_name}".strip(),
+            'method': state.method,
+            'observations': state.observations,
+            'trend_per_day': state.trend_per_day,
+            'total_predicted': total,
+            'history_end': state.history_end.isoformat(),
+            'generated_at': state.generated_at.isoformat(),
+            'forecast': forecast,
+        })
+    return predictions
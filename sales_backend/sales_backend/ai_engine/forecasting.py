@@ -0,0 +1,112 @@
+import numpy as np
+
+# Colonnes du modèle : constante, tendance (en années), 6 indicatrices de jour de semaine (lundi = référence)
+N_FEATURES = 8
+
+# En dessous de ce nombre de jours observés, la prévision retombe sur la moyenne
+MIN_OBSERVATIONS = 14
+
+# Quantile normal des intervalles de prévision (95 %)
+DEFAULT_Z = 1.96
+
+# Régularisation minimale : garde les systèmes résolubles (ex: un jour de semaine jamais observé)
+RIDGE = 1e-6
+
+def design_matrix(offsets, first_weekday):
+    """Lignes [1, t, lun..dim sans lundi] pour des jours exprimés en décalage depuis le début de la série"""
+    offsets = np.asarray(offsets)
+    X = np.zeros((len(offsets), N_FEATURES))
+    X[:, 0] = 1.0
+    X[:, 1] = offsets / 365.0
+    weekdays = (first_weekday + offsets) % 7
+    has_dummy = weekdays > 0
+    X[np.flatnonzero(has_dummy), 1 + weekdays[has_dummy]] = 1.0
+    return X
+
+class TrendWeekdayFit:
+    """
+    Tendance linéaire + saisonnalité hebdomadaire ajustées pour toutes les lignes d'une matrice
+    d'un seul coup : moindres carrés pondérés (jours observés) résolus par lots de systèmes 8x8.
+    """
+
+    def __init__(self, coefficients, sigma, covariance, observations, n_days, first_weekday):
+        self.coefficients = coefficients    # (modèles, N_FEATURES)
+        self.sigma = sigma                  # écart-type résiduel par modèle
+        self.covariance = covariance        # (X'WX)^-1 par modèle, pour les intervalles
+        self.observations = observations    # jours observés par modèle
+        self.n_days = n_days
+        self.first_weekday = first_weekday
+
+    @property
+    def fallback(self):
+        """Modèles à trop peu d'historique : prévision par la moyenne"""
+        return self.observations < MIN_OBSERVATIONS
+
+    @staticmethod
+    def statistics(values, observed, first_weekday):
+        """
+        Statistiques suffisantes par modèle : X'WX (N_FEATURES x N_FEATURES), X'Wy et somme des wy².
+        Elles s'additionnent jour par jour, ce qui permet les mises à jour incrémentales.
+        """
+        X = design_matrix(np.arange(values.shape[1]), first_weekday)
+        W = observed.astype(np.float64)
+        gram = np.einsum('nd,dk,dj->nkj', W, X, X)
+        moments = np.einsum('nd,dk->nk', W * values, X)
+        sum_squares = (W * values ** 2).sum(axis=1)
+        return gram, moments, sum_squares
+
+    @classmethod
+    def fit(cls, values, observed, first_weekday):
+        gram, moments, sum_squares = cls.statistics(values, observed, first_weekday)
+        return cls.from_statistics(gram, moments, sum_squares, values.shape[1], first_weekday)
+
+    @classmethod
+    def from_statistics(cls, gram, moments, sum_squares, n_days, first_weekday):
+        """Ajustement (lot de systèmes 8x8) à partir des seules statistiques suffisantes"""
+        covariance = np.linalg.inv(gram + RIDGE * np.eye(N_FEATURES))
+        coefficients = np.einsum('nkj,nj->nk', covariance, moments)
+
+        # Somme des carrés des résidus : y'Wy - 2 b'X'Wy + b'X'WXb
+        observations = gram[:, 0, 0].copy()
+        residual_squares = (
+            sum_squares
+            - 2 * (coefficients * moments).sum(axis=1)
+            + np.einsum('nk,nkj,nj->n', coefficients, gram, coefficients)
+        )
+        dof = np.maximum(observations - N_FEATURES, 1)
+        sigma = np.sqrt(np.maximum(residual_squares, 0.0) / dof)
+
+        fitted = cls(coefficients, sigma, covariance, observations, n_days, first_weekday)
+        fitted._apply_fallback(moments, sum_squares)
+        return fitted
+
+    def _apply_fallback(self, moments, sum_squares):
+        low = self.fallback
+        if not low.any():
+            return
+        count = np.maximum(self.observations[low], 1)
+        mean = moments[low, 0] / count
+        variance = np.maximum(sum_squares[low] - count * mean ** 2, 0.0) / np.maximum(count - 1, 1)
+
+        self.coefficients[low] = 0.0
+        self.coefficients[low, 0] = mean
+        self.sigma[low] = np.sqrt(variance)
+        self.covariance[low] = 0.0
+        self.covariance[low, 0, 0] = 1.0 / count
+
+    def predict(self, horizon, z=DEFAULT_Z):
+        """(moyenne, borne basse, borne haute), chacune de forme (modèles, horizon), ventes >= 0"""
+        Xf = design_matrix(np.arange(self.n_days, self.n_days + horizon), self.first_weekday)
+        mean = self.coefficients @ Xf.T
+        leverage = np.einsum('hk,nkj,hj->nh', Xf, self.covariance, Xf)
+        spread = z * self.sigma[:, None] * np.sqrt(1.0 + leverage)
+        return np.maximum(mean, 0.0), np.maximum(mean - spread, 0.0), mean + spread
+
+    def weekday_effects(self):
+        """Écart moyen de chaque jour (lundi -> dimanche) par rapport au lundi, par modèle"""
+        effects = np.zeros((len(self.coefficients), 7))
+        effects[:, 1:] = self.coefficients[:, 2:]
+        return effects
+
+    def trend_per_day(self):
+        return self.coefficients[:, 1] / 365.0
@@ -0,0 +1,172 @@
+import logging
+from datetime import timedelta
+from django.db import transaction
+from django.db.models import Q, Sum
+from django.utils import timezone
+from sales.models import DailySale, ModelProfile
+from .models import AIInsight, ModelForecast, PendingInsightUpdate
+
+logger = logging.getLogger(__name__)
+
+WEEKDAY_NAMES = ('lundi', 'mardi', 'mercredi', 'jeudi', 'vendredi', 'samedi', 'dimanche')
+
+# Modèles recalculés par lot (une requête groupée par lot)
+DEFAULT_BATCH_SIZE = 1000
+
+# Variation (en %) sur 7 jours à partir de laquelle une tendance est prioritaire
+TREND_ALERT_PERCENT = 20
+
+# Types d'analyses produits par modèle
+MODEL_INSIGHT_TYPES = ('trend', 'forecast', 'weekday')
+
+INSIGHT_UPDATE_FIELDS = ['user', 'title', 'description', 'priority', 'confidence_score', 'data_payload', 'is_read', 'created_at']
+
+def mark_models_dirty(model_ids):
+    """Ajoute des modèles à l'ensemble à recalculer (un seul upsert)"""
+    now = timezone.now()
+    PendingInsightUpdate.objects.bulk_create(
+        [PendingInsightUpdate(model_profile_id=model_id, changed_at=now) for model_id in set(model_ids)],
+        update_conflicts=True, unique_fields=['model_profile'], update_fields=['changed_at'], batch_size=5000
+    )
+
+def mark_recent_activity_dirty(days=14):
+    """
+    Changement de jour : les fenêtres « 7 derniers jours / 7 précédents » glissent même sans
+    nouvelle vente, seuls les modèles vendus sur la période sont concernés.
+    """
+    since = timezone.localdate() - timedelta(days=days)
+    model_ids = list(DailySale.objects.filter(date__gte=since).order_by().values_list('model_profile_id', flat=True).distinct())
+    mark_models_dirty(model_ids)
+    return len(model_ids)
+
+def _trend_insight(model, owner_id, last_7, previous_7):
+    if not last_7 and not previous_7:
+        return None
+    growth = (last_7 - previous_7) / previous_7 * 100 if previous_7 else None
+    if growth is None:
+        title, description, priority = "Reprise des ventes", f"{last_7:.2f} $ sur 7 jours après une semaine sans vente.", 'medium'
+    else:
+        title = "Ventes en hausse" if growth >= 0 else "Ventes en baisse"
+        description = f"{growth:+.1f} % par rapport à la semaine précédente ({last_7:.2f} $ contre {previous_7:.2f} $)."
+        priority = 'high' if abs(growth) >= TREND_ALERT_PERCENT else 'medium'
+    return AIInsight(
+        user_id=owner_id, model_profile_id=model, insight_type='trend',
+        title=title, description=description, priority=priority, confidence_score=0.8,
+        data_payload={
+            'last_7_days': round(last_7, 2),
+            'previous_7_days': round(previous_7, 2),
+            'growth_percent': round(growth, 2) if growth is not None else None,
+        },
+    )
+
+def _forecast_insight(model, owner_id, state):
+    upcoming = state.forecast[:7]
+    predicted = sum(day['predicted'] for day in upcoming)
+    if predicted <= 0:
+        return None
+    low, high = sum(day['lower'] for day in upcoming), sum(day['upper'] for day in upcoming)
+    return AIInsight(
+        user_id=owner_id, model_profile_id=model, insight_type='forecast',
+        title="Prévision des 7 prochains jours",
+        description=f"Environ {predicted:.2f} $ attendus (entre {low:.2f} $ et {high:.2f} $).",
+        priority='medium',
+        confidence_score=round(max(0.0, 1 - (high - low) / (2 * predicted)), 2),
+        data_payload={'predicted': round(predicted, 2), 'lower': round(low, 2), 'upper': round(high, 2), 'method': state.method},
+    )
+
+def _weekday_insight(model, owner_id, state):
+    if state.method != 'trend_weekday' or len(state.coefficients) < 8:
+        return None
+    # Coefficients : constante, tendance, puis écart de mardi..dimanche par rapport au lundi
+    effects = [0.0] + list(state.coefficients[2:8])
+    best = max(range(7), key=effects.__getitem__)
+    return AIInsight(
+        user_id=owner_id, model_profile_id=model, insight_type='weekday',
+        title=f"Meilleur jour : {WEEKDAY_NAMES[best]}",
+        description=f"Le {WEEKDAY_NAMES[best]} rapporte en moyenne {effects[best]:.2f} $ de plus que le lundi.",
+        priority='low',
+        confidence_score=round(min(1.0, state.observations / 56), 2),
+        data_payload={'weekday_effects': dict(zip(WEEKDAY_NAMES, [round(effect, 2) for effect in effects]))},
+    )
+
+def _refresh_batch(model_ids, today):
+    """Recalcule les analyses d'un lot : trois lectures (dont une agrégation groupée), un upsert"""
+    owners = dict(ModelProfile.objects.filter(id__in=model_ids).values_list('id', 'owner_id'))
+    windows = {
+        row['model_profile_id']: row
+        for row in DailySale.objects
+        .filter(model_profile_id__in=owners, date__gt=today - timedelta(days=14), date__lte=today)
+        .values('model_profile_id')
+        .annotate(
+            last_7=Sum('amount_usd', filter=Q(date__gt=today - timedelta(days=7))),
+            previous_7=Sum('amount_usd', filter=Q(date__lte=today - timedelta(days=7))),
+        )
+        .order_by()
+    }
+    states = {
+        state.model_profile_id: state
+        for state in ModelForecast.objects.filter(model_profile_id__in=owners).only(
+            'model_profile_id', 'method', 'observations', 'forecast', 'coefficients'
+        )
+    }
+
+    insights = []
+    for model, owner_id in owners.items():
+        window = windows.get(model, {})
+        insights.append(_trend_insight(model, owner_id, float(window.get('last_7') or 0), float(window.get('previous_7') or 0)))
+        state = states.get(model)
+        if state:
+            insights.append(_forecast_insight(model, owner_id, state))
+            insights.append(_weekday_insight(model, owner_id, state))
+    insights = [insight for insight in insights if insight]
+
+    now = timezone.now()
+    produced = {(insight.model_profile_id, insight.insight_type) for insight in insights}
+
+    with transaction.atomic():
+        # Une analyse déjà lue le reste tant que son titre et sa description ne changent pas
+        read = set(
+            AIInsight.objects.filter(model_profile_id__in=owners, is_read=True)
+            .values_list('model_profile_id', 'insight_type', 'title', 'description')
+        )
+        for insight in insights:
+            insight.created_at = now
+            insight.is_read = (insight.model_profile_id, insight.insight_type, insight.title, insight.description) in read
+
+        AIInsight.objects.bulk_create(
+            insights, update_conflicts=True,
+            unique_fields=['model_profile', 'insight_type'], update_fields=INSIGHT_UPDATE_FIELDS
+        )
+        # Analyses devenues sans objet (plus de ventes récentes, plus de prévision...)
+        for insight_type in MODEL_INSIGHT_TYPES:
+            obsolete = [model for model in owners if (model, insight_type) not in produced]
+            if obsolete:
+                AIInsight.objects.filter(model_profile_id__in=obsolete, insight_type=insight_type).delete()
+    return len(owners), len(insights)
+
+def refresh_insights(model_ids=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Recalcule les analyses des seuls modèles modifiés depuis le dernier passage (éventuellement
+    restreints à model_ids). Une modification arrivée pendant le calcul reste en attente.
+    """
+    snapshot = timezone.now()
+    today = timezone.localdate()
+    pending = PendingInsightUpdate.objects.filter(changed_at__lte=snapshot).order_by('model_profile_id')
+    if model_ids is not None:
+        pending = pending.filter(model_profile_id__in=list(model_ids))
+
+    models = insights = 0
+    last_id = 0
+    while True:
+        batch = list(pending.filter(model_profile_id__gt=last_id).values_list('model_profile_id', flat=True)[:batch_size])
+        if not batch:
+            break
+        refreshed, created = _refresh_batch(batch, today)
+        PendingInsightUpdate.objects.filter(model_profile_id__in=batch, changed_at__lte=snapshot).delete()
+        models += refreshed
+        insights += created
+        last_id = batch[-1]
+
+    if models:
+        logger.info(f"🤖 Analyses recalculées pour {models} modèles ({insights} analyses)")
+    return {'models': models, 'insights': insights}
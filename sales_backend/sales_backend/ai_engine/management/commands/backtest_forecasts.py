@@ -0,0 +1,71 @@
+import json
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from ai_engine.backtesting import FORECASTERS, backtest
+from ai_engine.batch_forecast import DEFAULT_SHARD_SIZE
+from ai_engine.series import DEFAULT_HISTORY_DAYS
+
+class Command(BaseCommand):
+    help = (
+        'Backtest à origine glissante des méthodes de prévision (naïve, naïve saisonnière, '
+        'tendance + jour de semaine) sur tous les modèles : MAE, MAPE, temps d\'ajustement et de '
+        'prévision par modèle et débit global. Aucune donnée n\'est écrite.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--methods', default=','.join(FORECASTERS), help=f'Méthodes parmi {", ".join(FORECASTERS)} (défaut: toutes)')
+        parser.add_argument('--horizon', type=int, default=14, help='Jours prévus à chaque origine (défaut: 14)')
+        parser.add_argument('--origins', type=int, default=4, help='Nombre d\'origines (défaut: 4)')
+        parser.add_argument('--step', type=int, default=7, help='Jours entre deux origines (défaut: 7)')
+        parser.add_argument('--train-days', type=int, default=DEFAULT_HISTORY_DAYS, help=f'Historique d\'apprentissage (défaut: {DEFAULT_HISTORY_DAYS})')
+        parser.add_argument('--end', help='Dernier jour de la dernière fenêtre de test, AAAA-MM-JJ (défaut: hier)')
+        parser.add_argument('--shard-size', type=int, default=DEFAULT_SHARD_SIZE, help=f'Modèles par lot (défaut: {DEFAULT_SHARD_SIZE})')
+        parser.add_argument('--json', dest='json_path', help='Enregistre aussi les résultats dans ce fichier JSON')
+
+    def handle(self, *args, **options):
+        methods = [method.strip() for method in options['methods'].split(',') if method.strip()]
+        unknown = [method for method in methods if method not in FORECASTERS]
+        if unknown or not methods:
+            raise CommandError(f'Méthodes inconnues: {", ".join(unknown) or "(aucune)"}')
+        for name in ('horizon', 'origins', 'step', 'shard_size'):
+            if options[name] < 1:
+                raise CommandError(f'--{name.replace("_", "-")} doit être positif')
+        if options['train_days'] < 14:
+            raise CommandError('--train-days doit être au moins 14')
+        try:
+            end = date.fromisoformat(options['end']) if options['end'] else None
+        except ValueError:
+            raise CommandError('--end doit être au format AAAA-MM-JJ')
+
+        def progress(done, total):
+            self.stdout.write(f'   📏 {done:,}/{total:,} modèles')
+
+        results = backtest(
+            methods=methods,
+            horizon=options['horizon'],
+            origins=options['origins'],
+            step=options['step'],
+            train_days=options['train_days'],
+            end=end,
+            shard_size=options['shard_size'],
+            progress=progress,
+        )
+
+        self.stdout.write(
+            f"\n📊 {results['evaluations']:,} évaluations ({results['models']:,} modèles x {results['origins']} origines, "
+            f"horizon {results['horizon']} j, fin {results['test_end']})"
+        )
+        self.stdout.write(f"   {'méthode':<18}{'MAE $':>10}{'MAPE %':>10}{'fit µs':>10}{'predict µs':>12}{'modèles/s':>12}")
+        for method, score in results['methods'].items():
+            throughput = f"{score['models_per_second']:,}" if score['models_per_second'] else '-'
+            self.stdout.write(
+                f"   {method:<18}{score['mae']:>10.2f}{score['mape']:>10.2f}"
+                f"{score['fit_us_per_model']:>10.2f}{score['predict_us_per_model']:>12.2f}{throughput:>12}"
+            )
+
+        if options['json_path']:
+            with open(options['json_path'], 'w') as handle:
+                json.dump(results, handle, indent=2)
+        self.stdout.write(self.style.SUCCESS(
+            f"\n✅ Backtest terminé en {results['seconds']}s (dont {results['load_seconds']}s de lecture des ventes)"
+        ))
@@ -0,0 +1,24 @@
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from ai_engine.anomalies import DEFAULT_LOOKBACK_DAYS, detect_all
+
+class Command(BaseCommand):
+    help = (
+        'Détecte les journées inhabituelles (pics, chutes, saisies manquantes) de tous les modèles : '
+        'z-score robuste sur médiane et MAD glissantes, enregistrement et notification WebSocket des nouvelles.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lookback', type=int, default=DEFAULT_LOOKBACK_DAYS, help=f'Jours clos examinés (défaut: {DEFAULT_LOOKBACK_DAYS})')
+        parser.add_argument('--end', help='Dernier jour examiné, AAAA-MM-JJ (défaut: hier)')
+
+    def handle(self, *args, **options):
+        if options['lookback'] < 1:
+            raise CommandError('--lookback doit être positif')
+        try:
+            end = date.fromisoformat(options['end']) if options['end'] else None
+        except ValueError:
+            raise CommandError('--end doit être au format AAAA-MM-JJ')
+
+        stats = detect_all(lookback=options['lookback'], end=end)
+        self.stdout.write(self.style.SUCCESS(f"✅ {stats['new']} nouvelles anomalies sur {stats['models']:,} modèles"))
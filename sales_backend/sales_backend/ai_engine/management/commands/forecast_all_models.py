@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+from ai_engine.batch_forecast import DEFAULT_SHARD_SIZE, run_batch_forecast
+from ai_engine.series import DEFAULT_HISTORY_DAYS
+
+class Command(BaseCommand):
+    help = (
+        'Calcule et enregistre les prévisions de tous les modèles : lots de modèles lus en flux, '
+        'ajustés en parallèle (un processus par cœur) et écrits par upsert groupé.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--horizon', type=int, default=30, help='Jours prévus (défaut: 30)')
+        parser.add_argument('--history-days', type=int, default=DEFAULT_HISTORY_DAYS, help=f'Historique utilisé (défaut: {DEFAULT_HISTORY_DAYS})')
+        parser.add_argument('--workers', type=int, default=0, help='Processus (défaut: nombre de cœurs, 1 = sans pool)')
+        parser.add_argument('--shard-size', type=int, default=DEFAULT_SHARD_SIZE, help=f'Modèles par lot (défaut: {DEFAULT_SHARD_SIZE})')
+
+    def handle(self, *args, **options):
+        if not 1 <= options['horizon'] <= 366:
+            raise CommandError('--horizon doit être compris entre 1 et 366')
+        if options['shard_size'] < 1:
+            raise CommandError('--shard-size doit être positif')
+
+        def progress(done, total):
+            self.stdout.write(f'   🔮 {done:,}/{total:,} modèles')
+
+        stats = run_batch_forecast(
+            horizon=options['horizon'],
+            days=options['history_days'],
+            workers=options['workers'] or None,
+            shard_size=options['shard_size'],
+            progress=progress,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {stats['models']:,} modèles en {stats['seconds']}s avec {stats['workers']} processus "
+            f"({stats['models_per_second']:,} modèles/s, {stats['models_per_worker_second']:,} modèles/s par processus)"
+        ))
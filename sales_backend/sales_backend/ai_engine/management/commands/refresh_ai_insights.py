@@ -0,0 +1,28 @@
+import time
+from django.core.management.base import BaseCommand
+from ai_engine.insights import DEFAULT_BATCH_SIZE, mark_models_dirty, mark_recent_activity_dirty, refresh_insights
+from sales.models import ModelProfile
+
+class Command(BaseCommand):
+    help = (
+        'Recalcule les analyses IA des modèles dont les ventes ont changé depuis le dernier passage '
+        '(une agrégation groupée et un upsert par lot).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rollover', action='store_true', help='Ajoute les modèles vendus sur les 14 derniers jours (changement de jour)')
+        parser.add_argument('--all', action='store_true', help='Recalcule tous les modèles')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help=f'Modèles par lot (défaut: {DEFAULT_BATCH_SIZE})')
+
+    def handle(self, *args, **options):
+        started_at = time.monotonic()
+        if options['all']:
+            mark_models_dirty(ModelProfile.objects.values_list('id', flat=True))
+        elif options['rollover']:
+            count = mark_recent_activity_dirty()
+            self.stdout.write(f'📅 {count:,} modèles actifs sur 14 jours ajoutés')
+
+        stats = refresh_insights(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {stats['insights']:,} analyses pour {stats['models']:,} modèles en {time.monotonic() - started_at:.2f}s"
+        ))
@@ -0,0 +1,31 @@
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from ai_engine.segmentation import segment_all_models
+from ai_engine.series import DEFAULT_HISTORY_DAYS
+
+class Command(BaseCommand):
+    help = (
+        'Segmente tous les modèles (volume, volatilité, profil hebdomadaire, croissance) par '
+        'MiniBatchKMeans et enregistre leur segment, filtrable dans l\'API admin des modèles.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clusters', type=int, help='Nombre de segments (défaut: AI_SEGMENT_CLUSTERS)')
+        parser.add_argument('--days', type=int, default=DEFAULT_HISTORY_DAYS, help=f'Jours d\'historique (défaut: {DEFAULT_HISTORY_DAYS})')
+        parser.add_argument('--end', help='Dernier jour pris en compte, AAAA-MM-JJ (défaut: hier)')
+        parser.add_argument('--seed', type=int, default=0, help='Graine du clustering (défaut: 0)')
+
+    def handle(self, *args, **options):
+        if options['clusters'] is not None and options['clusters'] < 1:
+            raise CommandError('--clusters doit être positif')
+        if options['days'] < 14:
+            raise CommandError('--days doit être au moins 14')
+        try:
+            end = date.fromisoformat(options['end']) if options['end'] else None
+        except ValueError:
+            raise CommandError('--end doit être au format AAAA-MM-JJ')
+
+        stats = segment_all_models(n_clusters=options['clusters'], days=options['days'], end=end, seed=options['seed'])
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {stats['models']:,} modèles segmentés ({stats['active']:,} actifs, {stats['segments']} segments) en {stats['duration']}s"
+        ))
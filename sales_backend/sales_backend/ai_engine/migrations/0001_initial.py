@@ -0,0 +1,39 @@
+# Generated by Django 5.1.4 on 2026-10-19 11:36
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AIInsight',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('insight_type', models.CharField(choices=[('summary', 'Résumé'), ('trend', 'Tendance'), ('forecast', 'Prévision'), ('weekday', 'Jour de la semaine')], max_length=20)),
+                ('title', models.CharField(max_length=200)),
+                ('description', models.TextField()),
+                ('priority', models.CharField(choices=[('low', 'Basse'), ('medium', 'Moyenne'), ('high', 'Haute')], default='medium', max_length=10)),
+                ('confidence_score', models.FloatField(default=0.0)),
+                ('data_payload', models.JSONField(blank=True, default=dict)),
+                ('is_read', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ai_insights', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Analyse IA',
+                'verbose_name_plural': 'Analyses IA',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['user', '-created_at'], name='ai_insight_user_recent_idx')],
+            },
+        ),
+    ]
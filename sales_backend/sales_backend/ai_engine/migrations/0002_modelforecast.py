@@ -0,0 +1,35 @@
+# Generated by Django 5.1.4 on 2026-10-19 11:38
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_engine', '0001_initial'),
+        ('sales', '0005_alter_modelprofile_last_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ModelForecast',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('method', models.CharField(choices=[('trend_weekday', 'Tendance + jour de semaine'), ('mean', 'Moyenne')], max_length=20)),
+                ('history_end', models.DateField()),
+                ('horizon', models.PositiveSmallIntegerField()),
+                ('observations', models.PositiveIntegerField(default=0)),
+                ('trend_per_day', models.FloatField(default=0.0)),
+                ('total_predicted', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('forecast', models.JSONField(blank=True, default=list)),
+                ('generated_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('model_profile', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='forecast', to='sales.modelprofile')),
+            ],
+            options={
+                'verbose_name': 'Prévision',
+                'verbose_name_plural': 'Prévisions',
+            },
+        ),
+    ]
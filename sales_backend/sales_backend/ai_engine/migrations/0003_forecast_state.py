@@ -0,0 +1,59 @@
+# Generated by Django 5.1.4 on 2026-10-19 11:40
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_engine', '0002_modelforecast'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='modelforecast',
+            name='coefficients',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='modelforecast',
+            name='drift_score',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='modelforecast',
+            name='gram',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='modelforecast',
+            name='last_day_total',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='modelforecast',
+            name='moments',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='modelforecast',
+            name='origin',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='modelforecast',
+            name='refitted_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='modelforecast',
+            name='sigma',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='modelforecast',
+            name='sum_squares',
+            field=models.FloatField(default=0.0),
+        ),
+    ]
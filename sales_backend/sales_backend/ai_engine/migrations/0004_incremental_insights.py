@@ -0,0 +1,38 @@
+# Generated by Django 5.1.4 on 2026-10-19 11:42
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_engine', '0003_forecast_state'),
+        ('sales', '0005_alter_modelprofile_last_name'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PendingInsightUpdate',
+            fields=[
+                ('model_profile', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='+', serialize=False, to='sales.modelprofile')),
+                ('changed_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Analyse à recalculer',
+                'verbose_name_plural': 'Analyses à recalculer',
+            },
+        ),
+        migrations.AddField(
+            model_name='aiinsight',
+            name='model_profile',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='ai_insights', to='sales.modelprofile'),
+        ),
+        migrations.AddConstraint(
+            model_name='aiinsight',
+            constraint=models.UniqueConstraint(fields=('model_profile', 'insight_type'), name='ai_insight_model_type_unique'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.1.4 on 2026-10-19 11:44
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_engine', '0004_incremental_insights'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TenantAnalytics',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='ai_analytics', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('as_of', models.DateField()),
+                ('daily_totals', models.JSONField(blank=True, default=list)),
+                ('model_totals', models.JSONField(blank=True, default=dict)),
+                ('summary', models.JSONField(blank=True, default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Indicateurs IA',
+                'verbose_name_plural': 'Indicateurs IA',
+            },
+        ),
+    ]
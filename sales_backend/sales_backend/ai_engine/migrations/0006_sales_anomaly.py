@@ -0,0 +1,35 @@
+# Generated by Django 5.1.4 on 2026-10-19 11:47
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_engine', '0005_tenant_analytics'),
+        ('sales', '0005_alter_modelprofile_last_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SalesAnomaly',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('kind', models.CharField(choices=[('spike', 'Pic'), ('drop', 'Chute'), ('missing', 'Saisie manquante')], max_length=10)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('expected', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('score', models.FloatField()),
+                ('detected_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('model_profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='anomalies', to='sales.modelprofile')),
+            ],
+            options={
+                'verbose_name': 'Anomalie de ventes',
+                'verbose_name_plural': 'Anomalies de ventes',
+                'ordering': ['-date'],
+                'constraints': [models.UniqueConstraint(fields=('model_profile', 'date'), name='sales_anomaly_model_date_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.1.4 on 2026-10-19 11:49
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_engine', '0006_sales_anomaly'),
+        ('sales', '0005_alter_modelprofile_last_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SalesDataVersion',
+            fields=[
+                ('model_profile', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='+', serialize=False, to='sales.modelprofile')),
+                ('changed_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Version des ventes',
+                'verbose_name_plural': 'Versions des ventes',
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.1.4 on 2026-10-19 11:52
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_engine', '0007_sales_data_version'),
+        ('sales', '0005_alter_modelprofile_last_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ModelSegment',
+            fields=[
+                ('model_profile', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='segment', serialize=False, to='sales.modelprofile')),
+                ('segment', models.PositiveSmallIntegerField(db_index=True)),
+                ('label', models.CharField(blank=True, max_length=120)),
+                ('features', models.JSONField(blank=True, default=dict)),
+                ('distance', models.FloatField(default=0.0)),
+                ('computed_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Segment de modèle',
+                'verbose_name_plural': 'Segments de modèles',
+            },
+        ),
+    ]
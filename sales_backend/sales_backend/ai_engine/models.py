@@ -0,0 +1,174 @@
+from django.db import models
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+class AIInsight(models.Model):
+    """Analyse générée automatiquement à partir des ventes d'un utilisateur"""
+    
+    INSIGHT_TYPES = [
+        ('summary', 'Résumé'),
+        ('trend', 'Tendance'),
+        ('forecast', 'Prévision'),
+        ('weekday', 'Jour de la semaine'),
+    ]
+    
+    PRIORITY_CHOICES = [
+        ('low', 'Basse'),
+        ('medium', 'Moyenne'),
+        ('high', 'Haute'),
+    ]
+    
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='ai_insights')
+    # Analyses par modèle (pipeline incrémental) : une seule ligne par (modèle, type), mise à jour sur place
+    model_profile = models.ForeignKey(
+        'sales.ModelProfile', on_delete=models.CASCADE, null=True, blank=True, related_name='ai_insights'
+    )
+    insight_type = models.CharField(max_length=20, choices=INSIGHT_TYPES)
+    title = models.CharField(max_length=200)
+    description = models.TextField()
+    priority = models.CharField(max_length=10, choices=PRIORITY_CHOICES, default='medium')
+    confidence_score = models.FloatField(default=0.0)
+    data_payload = models.JSONField(default=dict, blank=True)
+    is_read = models.BooleanField(default=False)
+    created_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Analyse IA'
+        verbose_name_plural = 'Analyses IA'
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='ai_insight_user_recent_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['model_profile', 'insight_type'], name='ai_insight_model_type_unique'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.title}"
+
+class ModelForecast(models.Model):
+    """
+    Prévision d'un modèle et état de son ajustement : statistiques suffisantes depuis `origin`
+    (mises à jour à chaque vente), coefficients et prévision rendue, lue telle quelle par l'API.
+    """
+    
+    METHOD_CHOICES = [
+        ('trend_weekday', 'Tendance + jour de semaine'),
+        ('mean', 'Moyenne'),
+    ]
+    
+    model_profile = models.OneToOneField('sales.ModelProfile', on_delete=models.CASCADE, related_name='forecast')
+    method = models.CharField(max_length=20, choices=METHOD_CHOICES)
+    history_end = models.DateField()
+    horizon = models.PositiveSmallIntegerField()
+    observations = models.PositiveIntegerField(default=0)
+    trend_per_day = models.FloatField(default=0.0)
+    total_predicted = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    forecast = models.JSONField(default=list, blank=True)  # [{date, predicted, lower, upper}]
+    generated_at = models.DateTimeField(default=timezone.now)
+    
+    # État de l'ajustement : jours origin..history_end, X'WX, X'Wy et somme des wy²
+    origin = models.DateField(null=True, blank=True)
+    gram = models.JSONField(default=list, blank=True)
+    moments = models.JSONField(default=list, blank=True)
+    sum_squares = models.FloatField(default=0.0)
+    last_day_total = models.FloatField(default=0.0)  # ventes du jour history_end
+    coefficients = models.JSONField(default=list, blank=True)
+    sigma = models.FloatField(default=0.0)
+    drift_score = models.FloatField(default=0.0)  # moyenne mobile des résidus standardisés
+    refitted_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        verbose_name = 'Prévision'
+        verbose_name_plural = 'Prévisions'
+    
+    def __str__(self):
+        return f"{self.model_profile} - {self.total_predicted} $ sur {self.horizon} jours"
+
+class PendingInsightUpdate(models.Model):
+    """Modèle dont les ventes ont changé depuis le dernier calcul de ses analyses (ensemble « sale »)"""
+    
+    model_profile = models.OneToOneField('sales.ModelProfile', on_delete=models.CASCADE, primary_key=True, related_name='+')
+    changed_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        verbose_name = 'Analyse à recalculer'
+        verbose_name_plural = 'Analyses à recalculer'
+
+class TenantAnalytics(models.Model):
+    """
+    Indicateurs précalculés d'un utilisateur et des modèles qu'il gère (mêmes modèles que tenant_models),
+    mis à jour à chaque vente et reconstruits chaque jour : le tableau de bord les lit en une requête.
+    """
+    
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='ai_analytics')
+    as_of = models.DateField()
+    daily_totals = models.JSONField(default=list, blank=True)  # ventes par jour, du plus ancien à as_of
+    model_totals = models.JSONField(default=dict, blank=True)  # {model_id: {'name', 'sums': [7j, 30j, 90j]}}
+    summary = models.JSONField(default=dict, blank=True)  # résumé rendu à l'écriture, seule colonne lue par l'API
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = 'Indicateurs IA'
+        verbose_name_plural = 'Indicateurs IA'
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.as_of}"
+
+class SalesAnomaly(models.Model):
+    """Journée inhabituelle d'un modèle (pic, chute ou saisie manquante), une au plus par jour"""
+    
+    KIND_CHOICES = [
+        ('spike', 'Pic'),
+        ('drop', 'Chute'),
+        ('missing', 'Saisie manquante'),
+    ]
+    
+    model_profile = models.ForeignKey('sales.ModelProfile', on_delete=models.CASCADE, related_name='anomalies')
+    date = models.DateField()
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    amount = models.DecimalField(max_digits=12, decimal_places=2)
+    expected = models.DecimalField(max_digits=12, decimal_places=2)  # médiane glissante
+    score = models.FloatField()  # z-score robuste (MAD)
+    detected_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        ordering = ['-date']
+        verbose_name = 'Anomalie de ventes'
+        verbose_name_plural = 'Anomalies de ventes'
+        constraints = [
+            models.UniqueConstraint(fields=['model_profile', 'date'], name='sales_anomaly_model_date_unique'),
+        ]
+    
+    def __str__(self):
+        return f"{self.model_profile} - {self.date} - {self.get_kind_display()}"
+
+class SalesDataVersion(models.Model):
+    """Horodatage de la dernière modification des ventes d'un modèle : clé des caches de séries"""
+    
+    model_profile = models.OneToOneField('sales.ModelProfile', on_delete=models.CASCADE, primary_key=True, related_name='+')
+    changed_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        verbose_name = 'Version des ventes'
+        verbose_name_plural = 'Versions des ventes'
+
+class ModelSegment(models.Model):
+    """
+    Segment d'un modèle (clustering périodique de ses caractéristiques de ventes) : les admins
+    filtrent et trient les modèles par segment sans calcul à la requête. 0 = inactif.
+    """
+    
+    model_profile = models.OneToOneField('sales.ModelProfile', on_delete=models.CASCADE, primary_key=True, related_name='segment')
+    segment = models.PositiveSmallIntegerField(db_index=True)  # 1 = plus gros volume moyen
+    label = models.CharField(max_length=120, blank=True)
+    features = models.JSONField(default=dict, blank=True)
+    distance = models.FloatField(default=0.0)  # distance au centre du segment (caractéristiques réduites)
+    computed_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        verbose_name = 'Segment de modèle'
+        verbose_name_plural = 'Segments de modèles'
+    
+    def __str__(self):
+        return f"{self.model_profile} - segment {self.segment}"
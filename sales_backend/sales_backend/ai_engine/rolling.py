@@ -0,0 +1,110 @@
+from datetime import timedelta
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from .timeseries import daily_series, data_version
+
+# Honoraires prélevés sur le brut (mêmes 20 % que les statistiques des ventes)
+FEE_RATE = 0.2
+
+# Fenêtres des moyennes mobiles et portées des moyennes exponentielles (jours)
+WINDOWS = (7, 30)
+
+# Période affichée par défaut (jours) ; les calculs partent toujours du début de l'historique
+DEFAULT_DAYS = 90
+
+CACHE_PREFIX = 'ai:rolling'
+
+# Taille des blocs de la moyenne exponentielle : decay**-EWMA_BLOCK reste représentable pour span >= 2
+EWMA_BLOCK = 64
+
+def moving_average(values, window):
+    """Moyenne mobile sur `window` jours (fenêtre partielle en début de série), par sommes cumulées"""
+    cumulative = np.concatenate(([0.0], np.cumsum(values)))
+    index = np.arange(1, len(values) + 1)
+    lower = np.maximum(index - window, 0)
+    return (cumulative[index] - cumulative[lower]) / (index - lower)
+
+def ewma(values, span):
+    """
+    Moyenne exponentielle y[t] = a*x[t] + (1-a)*y[t-1], a = 2/(span+1), y[0] = x[0].
+    Forme close par blocs : y[k] = d^(k+1)*y[-1] + a * d^k * cumsum(x[j] * d^-j), d = 1-a ;
+    une itération Python par bloc de EWMA_BLOCK jours, aucune par jour.
+    """
+    if span < 2:
+        return values.astype(np.float64)
+    alpha = 2.0 / (span + 1)
+    decay = 1.0 - alpha
+    result = np.empty(len(values))
+    carry = values[0] if len(values) else 0.0
+    steps = np.arange(EWMA_BLOCK)
+
+    for start in range(0, len(values), EWMA_BLOCK):
+        chunk = values[start:start + EWMA_BLOCK]
+        k = steps[:len(chunk)]
+        weighted = np.cumsum(chunk * decay ** -k) * decay ** k
+        result[start:start + len(chunk)] = decay ** (k + 1) * carry + alpha * weighted
+        carry = result[start + len(chunk) - 1]
+    return result
+
+def _period_delta(values, days):
+    current, previous = values[-days:].sum(), values[-2 * days:-days].sum()
+    return {
+        'current': round(float(current), 2),
+        'previous': round(float(previous), 2),
+        'delta': round(float(current - previous), 2),
+        'delta_percent': round(float((current - previous) / previous * 100), 2) if previous else None,
+    }
+
+def rolling_stats(models, scope, start=None, end=None):
+    """
+    Moyennes mobiles, moyennes exponentielles, net cumulé et variations d'une période à l'autre,
+    calculés en un passage vectorisé sur le cumul journalier (une requête groupée), mis en cache
+    par version des ventes.
+    """
+    end = end or timezone.localdate()
+    start = start or end - timedelta(days=DEFAULT_DAYS - 1)
+    version = data_version(models)
+    key = f'{CACHE_PREFIX}:{scope}:{version}:{start}:{end}'
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    # Historique complet jusqu'à `end` : net cumulé et moyennes exacts dès le premier jour affiché
+    first_day, values = daily_series(models, end=end)
+    if not len(values) or first_day > end:
+        first_day, values = start, np.zeros((end - start).days + 1)
+    elif first_day > start:
+        values = np.concatenate((np.zeros((first_day - start).days), values))
+        first_day = start
+
+    columns = {'gross': values, 'cumulative_net': np.cumsum(values) * (1 - FEE_RATE)}
+    for window in WINDOWS:
+        columns[f'ma_{window}'] = moving_average(values, window)
+        columns[f'ewma_{window}'] = ewma(values, window)
+
+    offset = (start - first_day).days
+    shown = {name: column[offset:].round(2).tolist() for name, column in columns.items()}
+    dates = [(start + timedelta(days=index)).isoformat() for index in range(len(values) - offset)]
+    gross = float(values[offset:].sum())
+
+    result = {
+        'version': version,
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'fee_rate': FEE_RATE,
+        'totals': {
+            'gross_usd': round(gross, 2),
+            'fees_usd': round(gross * FEE_RATE, 2),
+            'net_usd': round(gross * (1 - FEE_RATE), 2),
+            'days_with_sales': int((values[offset:] > 0).sum()),
+        },
+        'periods': {f'{window}d': _period_delta(values, window) for window in WINDOWS},
+        'series': [
+            dict(date=day, **{name: shown[name][index] for name in shown})
+            for index, day in enumerate(dates)
+        ],
+    }
+    cache.set(key, result, settings.AI_TIMESERIES_CACHE_TTL)
+    return result
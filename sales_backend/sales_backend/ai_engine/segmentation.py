@@ -0,0 +1,133 @@
+import logging
+import time
+from datetime import timedelta
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+from sales.models import ModelProfile
+from .batch_forecast import shard_model_ids
+from .models import ModelSegment
+from .series import DEFAULT_HISTORY_DAYS, stream_daily_matrix
+from .insights import WEEKDAY_NAMES
+
+logger = logging.getLogger(__name__)
+
+FEATURE_NAMES = ('log_volume', 'activity', 'volatility', 'growth') + tuple(f'share_{name}' for name in WEEKDAY_NAMES)
+
+# Segment des modèles sans vente sur la période (non soumis au clustering)
+INACTIVE_SEGMENT = 0
+
+# Croissance (log du rapport des moyennes des deux moitiés de la période) qualifiée de hausse/baisse
+GROWTH_LABEL_THRESHOLD = 0.1
+
+def extract_features(values, first_weekday):
+    """
+    Caractéristiques par modèle (une ligne par série, calcul vectorisé sur toute la matrice) :
+    volume (log de la moyenne journalière), part de jours vendus, volatilité (coefficient de
+    variation), croissance (log du rapport seconde/première moitié) et profil hebdomadaire
+    (part des ventes de chaque jour de la semaine).
+    """
+    mean = values.mean(axis=1)
+    safe_mean = np.where(mean > 0, mean, 1.0)
+    half = values.shape[1] // 2
+
+    weekdays = (first_weekday + np.arange(values.shape[1])) % 7
+    by_weekday = values @ (weekdays[:, None] == np.arange(7)).astype(np.float64)
+    totals = by_weekday.sum(axis=1, keepdims=True)
+
+    return np.column_stack([
+        np.log1p(mean),
+        (values > 0).mean(axis=1),
+        np.where(mean > 0, values.std(axis=1) / safe_mean, 0.0),
+        np.log1p(values[:, half:].mean(axis=1)) - np.log1p(values[:, :half].mean(axis=1)),
+        by_weekday / np.where(totals > 0, totals, 1.0),
+    ])
+
+def _standardize(features):
+    """Centrage-réduction ; le profil hebdomadaire (7 colonnes) pèse autant qu'une seule caractéristique"""
+    scale = features.std(axis=0)
+    scaled = (features - features.mean(axis=0)) / np.where(scale > 1e-9, scale, 1.0)
+    scaled[:, 4:] /= np.sqrt(7)
+    return scaled
+
+def _labels(centroids):
+    """Libellés lisibles des segments à partir des centres (caractéristiques brutes), triés par volume"""
+    volume_rank = np.argsort(np.argsort(-centroids[:, 0]))
+    volatility_median = np.median(centroids[:, 2])
+    labels = []
+    for index, centroid in enumerate(centroids):
+        tier = ('Fort volume', 'Volume moyen', 'Faible volume')[min(2, volume_rank[index] * 3 // len(centroids))]
+        growth = centroid[3]
+        trend = 'en croissance' if growth > GROWTH_LABEL_THRESHOLD else 'en baisse' if growth < -GROWTH_LABEL_THRESHOLD else 'stable'
+        regularity = 'irrégulier' if centroid[2] > volatility_median else 'régulier'
+        labels.append(f"{tier}, {trend}, {regularity}, pic le {WEEKDAY_NAMES[int(np.argmax(centroid[4:]))]}")
+    return labels
+
+def cluster(features, n_clusters, seed=0):
+    """
+    MiniBatchKMeans sur les caractéristiques centrées-réduites. Les segments sont numérotés
+    à partir de 1 par volume moyen décroissant. Retourne (segments, distances au centre, libellés).
+    """
+    from sklearn.cluster import MiniBatchKMeans
+
+    n_clusters = max(1, min(n_clusters, len(features)))
+    scaled = _standardize(features)
+    kmeans = MiniBatchKMeans(n_clusters=n_clusters, batch_size=2048, n_init=3, random_state=seed).fit(scaled)
+    distances = np.linalg.norm(scaled - kmeans.cluster_centers_[kmeans.labels_], axis=1)
+
+    # Centres en caractéristiques brutes (moyenne des membres), pour l'ordre et les libellés
+    counts = np.bincount(kmeans.labels_, minlength=n_clusters)
+    sums = np.zeros((n_clusters, features.shape[1]))
+    np.add.at(sums, kmeans.labels_, features)
+    centroids = sums / np.maximum(counts, 1)[:, None]
+
+    order = np.argsort(-centroids[:, 0])
+    segment_of_cluster = np.empty(n_clusters, dtype=np.int64)
+    segment_of_cluster[order] = np.arange(1, n_clusters + 1)
+    return segment_of_cluster[kmeans.labels_], distances, _labels(centroids[order])
+
+def segment_all_models(n_clusters=None, days=DEFAULT_HISTORY_DAYS, end=None, shard_size=2000, seed=0):
+    """
+    Passage périodique : caractéristiques de tous les modèles (ventes lues en flux par lots),
+    clustering, puis un seul INSERT ... ON CONFLICT UPDATE des segments.
+    """
+    started_at = time.perf_counter()
+    n_clusters = n_clusters or settings.AI_SEGMENT_CLUSTERS
+    end = end or timezone.localdate() - timedelta(days=1)
+    model_ids = list(ModelProfile.objects.order_by('id').values_list('id', flat=True))
+
+    shards = []
+    for shard in shard_model_ids(model_ids, shard_size):
+        matrix = stream_daily_matrix(shard, end=end, days=days)
+        shards.append(extract_features(matrix.values, matrix.first_weekday))
+    features = np.vstack(shards) if shards else np.zeros((0, len(FEATURE_NAMES)))
+
+    active = features[:, 0] > 0
+    segments = np.full(len(model_ids), INACTIVE_SEGMENT, dtype=np.int64)
+    distances = np.zeros(len(model_ids))
+    labels = []
+    if active.any():
+        segments[active], distances[active], labels = cluster(features[active], n_clusters, seed)
+
+    now = timezone.now()
+    ModelSegment.objects.bulk_create(
+        [
+            ModelSegment(
+                model_profile_id=model_id,
+                segment=int(segments[row]),
+                label=labels[segments[row] - 1] if segments[row] != INACTIVE_SEGMENT else 'Inactif',
+                features=dict(zip(FEATURE_NAMES, features[row].round(4).tolist())),
+                distance=round(float(distances[row]), 4),
+                computed_at=now,
+            )
+            for row, model_id in enumerate(model_ids)
+        ],
+        batch_size=5000,
+        update_conflicts=True,
+        unique_fields=['model_profile'],
+        update_fields=['segment', 'label', 'features', 'distance', 'computed_at'],
+    )
+
+    duration = time.perf_counter() - started_at
+    logger.info(f"🧩 Segmentation: {len(model_ids)} modèles, {len(labels)} segments ({duration:.1f}s)")
+    return {'models': len(model_ids), 'active': int(active.sum()), 'segments': len(labels), 'duration': round(duration, 2)}
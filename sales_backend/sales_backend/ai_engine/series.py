@@ -0,0 +1,111 @@
+from datetime import timedelta
+import numpy as np
+from django.db.models import Q, Sum
+from django.utils import timezone
+from sales.models import ModelProfile, DailySale
+
+# Historique chargé par défaut pour l'ajustement des prévisions (26 semaines)
+DEFAULT_HISTORY_DAYS = 182
+
+class DailyMatrix:
+    """
+    Ventes quotidiennes denses : une ligne par modèle (model_ids triés), une colonne par jour
+    à partir de `start`. `observed` masque les jours antérieurs à la première vente du modèle
+    dans la fenêtre (un modèle récent n'a pas « zéro vente » avant d'exister).
+    """
+
+    def __init__(self, model_ids, start, values):
+        self.model_ids = model_ids
+        self.start = start
+        self.values = values
+        self.observed = np.maximum.accumulate(values > 0, axis=1)
+
+    @property
+    def days(self):
+        return self.values.shape[1]
+
+    @property
+    def end(self):
+        return self.start + timedelta(days=self.days - 1)
+
+    @property
+    def first_weekday(self):
+        return self.start.weekday()
+
+    def dates(self, offset=0, count=None):
+        count = self.days if count is None else count
+        return [self.start + timedelta(days=offset + index) for index in range(count)]
+
+    def row(self, model_id):
+        index = np.searchsorted(self.model_ids, model_id)
+        if index < len(self.model_ids) and self.model_ids[index] == model_id:
+            return index
+        return None
+
+def tenant_models(user):
+    """Modèles visibles par l'utilisateur : les siens, plus ceux des utilisateurs qu'il a créés (admins)"""
+    if not user.is_staff:
+        return ModelProfile.objects.filter(owner=user)
+
+    from accounts.models import UserProfile
+    created_users = UserProfile.objects.filter(created_by=user).values_list('user', flat=True)
+    return ModelProfile.objects.filter(Q(owner=user) | Q(owner__in=created_users))
+
+def load_daily_matrix(model_ids, end=None, days=DEFAULT_HISTORY_DAYS):
+    """
+    Charge en une requête (somme par modèle et par jour) les `days` derniers jours de ventes
+    des modèles donnés et les range dans une matrice NumPy dense.
+    """
+    end = end or timezone.localdate()
+    start = end - timedelta(days=days - 1)
+    model_ids = np.unique(np.asarray(list(model_ids), dtype=np.int64))
+    values = np.zeros((len(model_ids), days), dtype=np.float64)
+
+    if len(model_ids):
+        rows = list(
+            DailySale.objects
+            .filter(model_profile_id__in=model_ids.tolist(), date__range=(start, end))
+            .values_list('model_profile_id', 'date')
+            .annotate(total=Sum('amount_usd'))
+            .order_by()
+        )
+        _accumulate(values, model_ids, start, rows)
+
+    return DailyMatrix(model_ids, start, values)
+
+def stream_daily_matrix(model_ids, end=None, days=DEFAULT_HISTORY_DAYS, chunk_size=20000):
+    """
+    Variante de load_daily_matrix pour les gros lots : ventes brutes lues par curseur
+    (iterator) et cumulées par blocs, sans GROUP BY côté base ni liste complète en mémoire.
+    """
+    end = end or timezone.localdate()
+    start = end - timedelta(days=days - 1)
+    model_ids = np.unique(np.asarray(list(model_ids), dtype=np.int64))
+    values = np.zeros((len(model_ids), days), dtype=np.float64)
+
+    if len(model_ids):
+        rows = (
+            DailySale.objects
+            .filter(model_profile_id__in=model_ids.tolist(), date__range=(start, end))
+            .values_list('model_profile_id', 'date', 'amount_usd')
+            .order_by()
+            .iterator(chunk_size=chunk_size)
+        )
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                _accumulate(values, model_ids, start, chunk)
+                chunk = []
+        _accumulate(values, model_ids, start, chunk)
+
+    return DailyMatrix(model_ids, start, values)
+
+def _accumulate(values, model_ids, start, rows):
+    """Ajoute des lignes (model_id, date, montant) dans la matrice (plusieurs ventes le même jour s'additionnent)"""
+    if not rows:
+        return
+    ids, dates, totals = zip(*rows)
+    row_index = np.searchsorted(model_ids, np.asarray(ids, dtype=np.int64))
+    day_index = np.asarray([date.toordinal() for date in dates], dtype=np.int64) - start.toordinal()
+    np.add.at(values, (row_index, day_index), np.asarray(totals, dtype=np.float64))
@@ -0,0 +1,131 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_save, pre_save
+from django.dispatch import receiver
+from sales.models import DailySale
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Pas de récepteur post_delete : il désactiverait les suppressions en masse de Django (les ventes
+# supprimées en cascade seraient chargées une par une). Les suppressions via l'API appellent
+# record_sale_deletion ; les autres sont rattrapées par les traitements nocturnes.
+
+@receiver(pre_save, sender=DailySale)
+def remember_previous_sale(sender, instance, **kwargs):
+    """Mémorise la vente avant modification pour en déduire la variation"""
+    if instance.pk:
+        instance._previous_sale = (
+            DailySale.objects.filter(pk=instance.pk).values_list('model_profile_id', 'date', 'amount_usd').first()
+        )
+
+def _sale_changes(instance):
+    """Variations (model_id, date, delta) dues à l'enregistrement d'une vente"""
+    changes = [(instance.model_profile_id, instance.date, float(instance.amount_usd))]
+    previous = getattr(instance, '_previous_sale', None)
+    if previous:
+        changes.append((previous[0], previous[1], -float(previous[2])))
+    return changes
+
+def _merge(changes):
+    """Une modification de montant sur le même jour ne fait qu'une variation"""
+    merged = {}
+    for model_id, day, delta in changes:
+        merged[(model_id, day)] = merged.get((model_id, day), 0.0) + delta
+    return {key: delta for key, delta in merged.items() if abs(delta) >= 0.005}
+
+@receiver(post_save, sender=DailySale)
+def update_forecast_on_sale(sender, instance, **kwargs):
+    """Mise à jour incrémentale de la prévision du modèle après l'enregistrement d'une vente"""
+    schedule_forecast_update(_sale_changes(instance))
+
+@receiver(post_save, sender=DailySale)
+def mark_insights_dirty_on_sale(sender, instance, **kwargs):
+    """Le modèle rejoint l'ensemble des analyses à recalculer (même transaction que la vente)"""
+    from .insights import mark_models_dirty
+    
+    mark_models_dirty({model_id for model_id, _, _ in _sale_changes(instance)})
+
+@receiver(post_save, sender=DailySale)
+def update_analytics_on_sale(sender, instance, **kwargs):
+    """Mise à jour incrémentale des indicateurs du tableau de bord"""
+    schedule_analytics_update(_sale_changes(instance))
+
+@receiver(post_save, sender=DailySale)
+def check_anomaly_on_sale(sender, instance, **kwargs):
+    """Détection incrémentale : le jour de la vente est réexaminé après validation"""
+    schedule_anomaly_check(_sale_changes(instance))
+
+@receiver(post_save, sender=DailySale)
+def bump_series_version_on_sale(sender, instance, **kwargs):
+    """Nouvelle version des ventes du modèle : les séries en cache sont invalidées"""
+    from .timeseries import bump_versions
+    
+    bump_versions({model_id for model_id, _, _ in _sale_changes(instance)})
+
+def record_sale_deletion(model_id, day, amount):
+    """
+    À appeler après la suppression unitaire d'une vente (voir plus haut), dans la même
+    transaction : les mises à jour différées ne doivent plus voir la ligne supprimée.
+    """
+    from .insights import mark_models_dirty
+    from .timeseries import bump_versions
+    
+    changes = [(model_id, day, -float(amount))]
+    mark_models_dirty([model_id])
+    bump_versions([model_id])
+    schedule_forecast_update(changes)
+    schedule_analytics_update(changes)
+    schedule_anomaly_check(changes)
+
+def schedule_forecast_update(changes):
+    """Applique les variations (model_id, date, delta) après validation de la transaction en cours"""
+    if not settings.AI_FORECAST_ONLINE_UPDATES:
+        return
+    merged = _merge(changes)
+    
+    def apply():
+        from .forecast_state import apply_sale_change
+        
+        for (model_id, day), delta in merged.items():
+            try:
+                apply_sale_change(model_id, day, delta)
+            except Exception as e:
+                logger.error(f"❌ Erreur de mise à jour de la prévision du modèle #{model_id}: {str(e)}")
+    
+    transaction.on_commit(apply)
+
+def schedule_analytics_update(changes):
+    """
+    Indicateurs des utilisateurs concernés reconstruits dans une tâche Celery mise en file après
+    validation (une reconstruction de tenant ne doit pas peser sur la requête HTTP)
+    """
+    model_ids = sorted({model_id for model_id, _ in _merge(changes)})
+    if not model_ids:
+        return
+    
+    def enqueue():
+        from .tasks import refresh_tenant_analytics_async
+        
+        try:
+            refresh_tenant_analytics_async.delay(model_ids)
+        except Exception as e:
+            logger.error(f"❌ File d'attente indisponible, indicateurs rattrapés par la reconstruction nocturne: {str(e)}")
+    
+    transaction.on_commit(enqueue)
+
+def schedule_anomaly_check(changes):
+    """Réexamine chaque jour de vente modifié dans une tâche Celery, mise en file après validation"""
+    days = [[model_id, str(day)] for model_id, day in _merge(changes)]
+    if not days:
+        return
+    
+    def enqueue():
+        from .tasks import check_sale_days_async
+        
+        try:
+            check_sale_days_async.delay(days)
+        except Exception as e:
+            logger.error(f"❌ File d'attente indisponible, anomalies rattrapées par la détection nocturne: {str(e)}")
+    
+    transaction.on_commit(enqueue)
@@ -0,0 +1,67 @@
+from celery import shared_task
+import logging
+
+logger = logging.getLogger(__name__)
+
+@shared_task(ignore_result=False)
+def forecast_all_models_async(horizon=30, workers=None):
+    """
+    Recalcul nocturne des prévisions de tous les modèles (voir CELERY_BEAT_SCHEDULE).
+    Dans un worker prefork les lots sont traités en séquence ; lancer un worker
+    `--pool solo` (ou la commande forecast_all_models) pour utiliser tous les cœurs.
+    """
+    from .batch_forecast import run_batch_forecast
+    
+    return run_batch_forecast(horizon=horizon, workers=workers)
+
+@shared_task(ignore_result=True)
+def refresh_insights_async(rollover=False):
+    """
+    Recalcule les analyses des modèles modifiés (ensemble alimenté par les signaux des ventes).
+    rollover=True (passage quotidien) ajoute d'abord les modèles vendus sur les 14 derniers jours.
+    """
+    from .insights import mark_recent_activity_dirty, refresh_insights
+    
+    if rollover:
+        mark_recent_activity_dirty()
+    return refresh_insights()
+
+@shared_task(ignore_result=True)
+def rebuild_analytics_async():
+    """Reconstruction quotidienne des indicateurs (les fenêtres 7/30/90 jours glissent avec la date)"""
+    from .analytics import rebuild_all
+    
+    return rebuild_all()
+
+@shared_task(ignore_result=True)
+def refresh_tenant_analytics_async(model_ids):
+    """Indicateurs des utilisateurs concernés par des ventes modifiées, reconstruits hors requête HTTP"""
+    from .analytics import refresh_models
+    
+    return refresh_models(model_ids)
+
+@shared_task(ignore_result=True)
+def detect_anomalies_async(lookback=7):
+    """Détection nocturne des journées inhabituelles (pics, chutes, saisies manquantes)"""
+    from .anomalies import detect_all
+    
+    return detect_all(lookback=lookback)
+
+@shared_task(ignore_result=True)
+def check_sale_days_async(days):
+    """Réexamen des jours [model_id, 'AAAA-MM-JJ'] modifiés par une saisie (détection et notification)"""
+    from datetime import date
+    from .anomalies import check_sale_day
+    
+    for model_id, day in days:
+        try:
+            check_sale_day(model_id, date.fromisoformat(day))
+        except Exception as e:
+            logger.error(f"❌ Erreur de détection d'anomalie du modèle #{model_id}: {str(e)}")
+
+@shared_task(ignore_result=True)
+def segment_models_async():
+    """Segmentation nocturne des modèles (MiniBatchKMeans sur leurs caractéristiques de ventes)"""
+    from .segmentation import segment_all_models
+    
+    return segment_all_models()
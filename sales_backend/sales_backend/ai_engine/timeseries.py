@@ -0,0 +1,77 @@
+from datetime import timedelta
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max, Sum
+from django.utils import timezone
+from sales.models import DailySale
+from .downsampling import DOWNSAMPLERS
+from .models import SalesDataVersion
+
+# Nombre de points renvoyés (défaut, maximum)
+DEFAULT_POINTS = 500
+MAX_POINTS = 5000
+
+CACHE_PREFIX = 'ai:timeseries'
+
+def bump_versions(model_ids):
+    """Nouvelle version des ventes des modèles donnés (invalide les séries en cache)"""
+    now = timezone.now()
+    SalesDataVersion.objects.bulk_create(
+        [SalesDataVersion(model_profile_id=model_id, changed_at=now) for model_id in set(model_ids)],
+        update_conflicts=True, unique_fields=['model_profile'], update_fields=['changed_at']
+    )
+
+def data_version(models):
+    """
+    Version des ventes d'un ensemble de modèles (une requête) : dernière modification et nombre
+    de modèles versionnés (la suppression d'un modèle change aussi la version).
+    """
+    versions = SalesDataVersion.objects.filter(model_profile__in=models).aggregate(latest=Max('changed_at'), count=Count('pk'))
+    latest = versions['latest'].timestamp() if versions['latest'] else 0
+    return f"{versions['count']}-{latest:.6f}"
+
+def daily_series(models, start=None, end=None):
+    """Ventes journalières des modèles (une requête groupée par date), jours sans vente inclus"""
+    sales = DailySale.objects.filter(model_profile__in=models)
+    if start:
+        sales = sales.filter(date__gte=start)
+    if end:
+        sales = sales.filter(date__lte=end)
+    rows = list(sales.values_list('date').annotate(total=Sum('amount_usd')).order_by('date'))
+
+    if not rows:
+        return start, np.zeros(0)
+    first_day = start or rows[0][0]
+    last_day = end or rows[-1][0]
+    values = np.zeros((last_day - first_day).days + 1)
+    dates, totals = zip(*rows)
+    values[np.asarray([day.toordinal() for day in dates]) - first_day.toordinal()] = np.asarray(totals, dtype=np.float64)
+    return first_day, values
+
+def build_timeseries(models, scope, points=DEFAULT_POINTS, method='lttb', start=None, end=None):
+    """
+    Série prête pour un graphique : au plus `points` points choisis par `method` parmi les ventes
+    journalières. Mise en cache par version des données : toute vente enregistrée l'invalide.
+    """
+    version = data_version(models)
+    key = f'{CACHE_PREFIX}:{scope}:{version}:{method}:{points}:{start}:{end}'
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    first_day, values = daily_series(models, start, end)
+    selected = DOWNSAMPLERS[method](np.arange(len(values), dtype=np.float64), values, points) if len(values) else []
+    result = {
+        'method': method,
+        'version': version,
+        'source_points': len(values),
+        'start': first_day.isoformat() if len(values) else None,
+        'end': (first_day + timedelta(days=len(values) - 1)).isoformat() if len(values) else None,
+        'points': [
+            {'date': (first_day + timedelta(days=int(index))).isoformat(), 'value': round(float(values[index]), 2)}
+            for index in selected
+        ],
+    }
+    cache.set(key, result, settings.AI_TIMESERIES_CACHE_TTL)
+    return result
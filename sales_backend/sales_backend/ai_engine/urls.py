@@ -0,0 +1,11 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('predictions/', views.sales_predictions, name='ai-predictions'),
+    path('insights/', views.list_insights, name='ai-insights'),
+    path('insights/generate/', views.generate_insights, name='ai-insights-generate'),
+    path('analytics/summary/', views.analytics_summary, name='ai-analytics-summary'),
+    path('timeseries/', views.sales_timeseries, name='ai-timeseries'),
+    path('stats/rolling/', views.rolling_stats, name='ai-rolling-stats'),
+]
@@ -0,0 +1,166 @@
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework import status
+from datetime import date
+from django.db.models import Q
+from django.utils import timezone
+from .models import AIInsight, ModelForecast, TenantAnalytics
+
+# NumPy n'est chargé qu'au premier appel (ai_predictor_simple importé dans les vues)
+
+def _serialize_insight(insight):
+    return {
+        'id': insight.id,
+        'model_id': insight.model_profile_id,
+        'insight_type': insight.insight_type,
+        'title': insight.title,
+        'description': insight.description,
+        'priority': insight.priority,
+        'confidence_score': insight.confidence_score,
+        'data_payload': insight.data_payload,
+        'is_read': insight.is_read,
+        'created_at': insight.created_at.isoformat(),
+    }
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def sales_predictions(request):
+    """
+    Prévisions journalières (avec intervalles) des modèles de l'utilisateur, ou d'un seul modèle (model_id).
+    Lues depuis les états enregistrés (ModelForecast) ; seuls les modèles sans état sont ajustés.
+    """
+    from .ai_predictor_simple import MAX_HORIZON
+    from .forecast_state import refit_models, stored_predictions
+    from .series import tenant_models
+    
+    try:
+        horizon = max(1, min(int(request.query_params.get('horizon', 30)), MAX_HORIZON))
+        model_id = int(request.query_params['model_id']) if request.query_params.get('model_id') else None
+    except ValueError:
+        return Response({'error': 'horizon et model_id doivent être des entiers'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    model_ids = set(tenant_models(request.user).values_list('id', flat=True))
+    if model_id is not None:
+        if model_id not in model_ids:
+            return Response({'error': 'Modèle non trouvé'}, status=status.HTTP_404_NOT_FOUND)
+        model_ids = {model_id}
+    
+    states = ModelForecast.objects.filter(model_profile_id__in=model_ids).select_related('model_profile')
+    missing = model_ids - {state.model_profile_id for state in states}
+    if missing:
+        refit_models(missing)
+        states = states.all()
+    
+    return Response({
+        'generated_at': timezone.now().isoformat(),
+        'horizon': horizon,
+        'predictions': stored_predictions(sorted(states, key=lambda state: state.model_profile_id), horizon),
+    })
+
+def _user_insights(user):
+    """Analyses de l'utilisateur et celles des modèles qu'il gère"""
+    from .series import tenant_models
+    
+    return (
+        AIInsight.objects
+        .filter(Q(user=user) | Q(model_profile__in=tenant_models(user)))
+        .order_by('-created_at')[:50]
+    )
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def list_insights(request):
+    """Dernières analyses générées pour l'utilisateur"""
+    return Response([_serialize_insight(insight) for insight in _user_insights(request.user)])
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def generate_insights(request):
+    """Recalcule les analyses des modèles de l'utilisateur modifiés depuis le dernier passage"""
+    from .insights import refresh_insights
+    from .series import tenant_models
+    
+    refresh_insights(model_ids=tenant_models(request.user).values_list('id', flat=True))
+    return Response([_serialize_insight(insight) for insight in _user_insights(request.user)])
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def analytics_summary(request):
+    """
+    Résumé du tableau de bord (ventes sur 7/30/90 jours, croissance, meilleur jour, meilleurs modèles),
+    lu depuis les indicateurs précalculés : une requête, quelle que soit la taille du portefeuille.
+    """
+    summary = (
+        TenantAnalytics.objects
+        .filter(user=request.user, as_of=timezone.localdate())
+        .values_list('summary', flat=True)
+        .first()
+    )
+    if summary is None:
+        # Premier accès ou indicateurs de la veille (reconstruction quotidienne pas encore passée)
+        from .analytics import rebuild_tenant
+        summary = rebuild_tenant(request.user).summary
+    
+    return Response(summary)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def sales_timeseries(request):
+    """
+    Ventes journalières d'un modèle (model_id) ou de tous les modèles de l'utilisateur, réduites
+    côté serveur à au plus `points` points (method=lttb ou minmax) ; start/end au format AAAA-MM-JJ.
+    """
+    from .downsampling import DOWNSAMPLERS
+    from .series import tenant_models
+    from .timeseries import DEFAULT_POINTS, MAX_POINTS, build_timeseries
+    
+    method = request.query_params.get('method', 'lttb')
+    if method not in DOWNSAMPLERS:
+        return Response({'error': f"method doit être l'une de: {', '.join(DOWNSAMPLERS)}"}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        points = max(3, min(int(request.query_params.get('points', DEFAULT_POINTS)), MAX_POINTS))
+        model_id = int(request.query_params['model_id']) if request.query_params.get('model_id') else None
+        start = date.fromisoformat(request.query_params['start']) if request.query_params.get('start') else None
+        end = date.fromisoformat(request.query_params['end']) if request.query_params.get('end') else None
+    except ValueError:
+        return Response({'error': 'Paramètres invalides (points et model_id entiers, dates AAAA-MM-JJ)'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    models = tenant_models(request.user)
+    if model_id is not None:
+        models = models.filter(id=model_id)
+        if not models.exists():
+            return Response({'error': 'Modèle non trouvé'}, status=status.HTTP_404_NOT_FOUND)
+    
+    scope = f'model-{model_id}' if model_id is not None else f'user-{request.user.id}'
+    return Response(build_timeseries(models, scope, points=points, method=method, start=start, end=end))
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def rolling_stats(request):
+    """
+    Statistiques glissantes d'un modèle (model_id) ou de tous les modèles de l'utilisateur :
+    moyennes mobiles 7/30 jours, moyennes exponentielles, net cumulé et variations par période.
+    start/end au format AAAA-MM-JJ (défaut: 90 derniers jours).
+    """
+    from .rolling import rolling_stats as compute_rolling_stats
+    from .series import tenant_models
+    
+    try:
+        model_id = int(request.query_params['model_id']) if request.query_params.get('model_id') else None
+        start = date.fromisoformat(request.query_params['start']) if request.query_params.get('start') else None
+        end = date.fromisoformat(request.query_params['end']) if request.query_params.get('end') else None
+    except ValueError:
+        return Response({'error': 'Paramètres invalides (model_id entier, dates AAAA-MM-JJ)'}, status=status.HTTP_400_BAD_REQUEST)
+    end = end or timezone.localdate()
+    if start and start > end:
+        return Response({'error': 'start doit précéder end'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    models = tenant_models(request.user)
+    if model_id is not None:
+        models = models.filter(id=model_id)
+        if not models.exists():
+            return Response({'error': 'Modèle non trouvé'}, status=status.HTTP_404_NOT_FOUND)
+    
+    scope = f'model-{model_id}' if model_id is not None else f'user-{request.user.id}'
+    return Response(compute_rolling_stats(models, scope, start=start, end=end))
@@ -6,7 +6,7 @@ django.setup()
 
 from django.contrib.auth.models import User
 from sales.models import ModelProfile, DailySale
-from ai_engine.ai_predictor_simple import SalesPredictor
+from ai_engine.insights import mark_models_dirty, refresh_insights
 from ai_engine.models import AIInsight
 from django.utils import timezone
 from datetime import timedelta
@@ -39,19 +39,16 @@ def debug_insights():
     print(f'Previous sales (7-14 days ago): {previous_sales.count()}')
     
     # Check existing insights
-    existing_insights = AIInsight.objects.filter(user=user)
+    existing_insights = AIInsight.objects.filter(model_profile__owner=user)
     print(f'Existing insights: {existing_insights.count()}')
     
-    # Clear existing insights for fresh test
-    existing_insights.delete()
-    print('Cleared existing insights')
+    # Recompute only the models changed since the last run (force all of the user's models)
+    model_ids = list(ModelProfile.objects.filter(owner=user).values_list('id', flat=True))
+    mark_models_dirty(model_ids)
+    stats = refresh_insights(model_ids=model_ids)
+    print(f"Refreshed insights: {stats['insights']} for {stats['models']} models")
     
-    # Test insights generation
-    predictor = SalesPredictor(user)
-    insights = predictor.analyze_sales_trends()
-    print(f'Generated insights: {len(insights)}')
-    
-    for insight in insights:
+    for insight in AIInsight.objects.filter(model_profile__owner=user):
         print(f'- {insight.title}: {insight.description}')
 
 if __name__ == "__main__":
@@ -8,6 +8,15 @@ from django.urls import reverse
 from django.utils.http import urlencode
 from decimal import Decimal
 
+def _annotated(obj, attribute, fallback):
+    """Valeur annotée par get_queryset (liste), sinon calculée à la demande (fiche)"""
+    if hasattr(obj, attribute):
+        return getattr(obj, attribute)
+    return fallback()
+
+def _annotated_revenue(obj):
+    return _annotated(obj, '_total_revenue', lambda: obj.daily_sales.aggregate(total=Sum('amount_usd'))['total'])
+
 # FILTRES PERSONNALISÉS
 class OwnerFilter(admin.SimpleListFilter):
     title = 'Propriétaire'
@@ -71,6 +80,11 @@ class ModelProfileAdmin(admin.ModelAdmin):
     
     def get_queryset(self, request):
         qs = super().get_queryset(request)
+        # Agrégats calculés dans la requête de la liste (pas une requête par ligne)
+        qs = qs.select_related('owner').annotate(
+            _sales_count=Count('daily_sales'),
+            _total_revenue=Sum('daily_sales__amount_usd')
+        )
         
         # Super admin voit tout
         if request.user.email == 'tahiantsoaFabio17@gmail.com':
@@ -94,7 +108,7 @@ class ModelProfileAdmin(admin.ModelAdmin):
     owner_link.short_description = 'Propriétaire'
     
     def sales_count(self, obj):
-        count = obj.daily_sales.count()
+        count = _annotated(obj, '_sales_count', lambda: obj.daily_sales.count())
         url = (
             reverse('admin:sales_dailysale_changelist')
             + '?'
@@ -104,7 +118,7 @@ class ModelProfileAdmin(admin.ModelAdmin):
     sales_count.short_description = 'Nombre de ventes'
     
     def total_revenue(self, obj):
-        total = obj.daily_sales.aggregate(total=Sum('amount_usd'))['total']
+        total = _annotated_revenue(obj)
         if total:
             # ⬇️⬇️⬇️ CORRECTION : Convertir en float ⬇️⬇️⬇️
             total_float = float(total)
@@ -113,7 +127,7 @@ class ModelProfileAdmin(admin.ModelAdmin):
     total_revenue.short_description = 'Revenu total'
     
     def total_net_revenue(self, obj):
-        total = obj.daily_sales.aggregate(total=Sum('amount_usd'))['total']
+        total = _annotated_revenue(obj)
         if total:
             # ⬇️⬇️⬇️ CORRECTION : Convertir en float avant multiplication ⬇️⬇️⬇️
             total_float = float(total)
@@ -196,12 +210,18 @@ class ModelProfileInline(admin.TabularInline):
     readonly_fields = ['first_name', 'last_name', 'created_at', 'sales_count', 'total_revenue']
     fields = ['first_name', 'last_name', 'created_at', 'sales_count', 'total_revenue']
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            _sales_count=Count('daily_sales'),
+            _total_revenue=Sum('daily_sales__amount_usd')
+        )
+    
     def sales_count(self, obj):
-        return obj.daily_sales.count()
+        return _annotated(obj, '_sales_count', lambda: obj.daily_sales.count())
     sales_count.short_description = 'Nombre de ventes'
     
     def total_revenue(self, obj):
-        total = obj.daily_sales.aggregate(total=Sum('amount_usd'))['total']
+        total = _annotated_revenue(obj)
         # ⬇️⬇️⬇️ CORRECTION : Convertir en float ⬇️⬇️⬇️
         if total:
             total_float = float(total)
@@ -218,7 +238,7 @@ class CustomUserAdmin(UserAdmin):
     list_display = UserAdmin.list_display + ('date_joined', 'last_login', 'model_count', 'total_sales')
     
     def model_count(self, obj):
-        count = obj.model_profiles.count()
+        count = _annotated(obj, '_model_count', lambda: obj.model_profiles.count())
         url = (
             reverse('admin:sales_modelprofile_changelist')
             + '?'
@@ -228,7 +248,10 @@ class CustomUserAdmin(UserAdmin):
     model_count.short_description = 'Modèles'
     
     def total_sales(self, obj):
-        total = DailySale.objects.filter(model_profile__owner=obj).aggregate(total=Sum('amount_usd'))['total']
+        total = _annotated(
+            obj, '_total_sales',
+            lambda: DailySale.objects.filter(model_profile__owner=obj).aggregate(total=Sum('amount_usd'))['total']
+        )
         # ⬇️⬇️⬇️ CORRECTION : Convertir en float ⬇️⬇️⬇️
         if total:
             total_float = float(total)
@@ -238,7 +261,10 @@ class CustomUserAdmin(UserAdmin):
     
     def get_queryset(self, request):
         qs = super().get_queryset(request)
-        qs = qs.prefetch_related('model_profiles')
+        qs = qs.annotate(
+            _model_count=Count('model_profiles', distinct=True),
+            _total_sales=Sum('model_profiles__daily_sales__amount_usd')
+        )
         
         # Super admin voit tout
         if request.user.email == 'tahiantsoaFabio17@gmail.com':
@@ -7,3 +7,8 @@ class SalesConfig(AppConfig):
     
     def ready(self):
         import sales.signals
+        
+        from django.conf import settings
+        if settings.PERF_INSTRUMENTATION:
+            from .instrumentation import install_serializer_timing
+            install_serializer_timing()
@@ -0,0 +1,422 @@
+import bisect
+import json
+import os
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from django.conf import settings
+from django.core.cache.backends.base import BaseCache
+from django.core.cache.backends.locmem import LocMemCache
+
+# Bornes (secondes) des histogrammes de durée
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Bornes des histogrammes de nombre de requêtes SQL
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+class Histogram:
+    """Histogramme à bornes fixes (compteurs par tranche, somme et nombre d'observations)"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # dernière tranche : +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def snapshot(self):
+        return {'buckets': list(self.buckets), 'counts': list(self.counts), 'sum': self.sum, 'count': self.count}
+
+class MetricsRegistry:
+    """
+    Registre en mémoire (par processus) des compteurs, jauges et histogrammes,
+    indexés par (nom, labels triés). Les collecteurs enregistrés ajoutent au moment
+    du snapshot des compteurs tenus ailleurs (ex: mail_metrics).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._gauges = {}
+        self._histograms = {}
+        self._collectors = []
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted((labels or {}).items()))
+
+    def inc(self, name, value=1, labels=None):
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def inc_gauge(self, name, value=1, labels=None):
+        key = self._key(name, labels)
+        with self._lock:
+            self._gauges[key] = self._gauges.get(key, 0) + value
+
+    def observe(self, name, value, labels=None, buckets=DEFAULT_BUCKETS):
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def register_collector(self, collector):
+        """collector() retourne une liste de (nom, labels, valeur) exportés comme compteurs"""
+        if collector not in self._collectors:
+            self._collectors.append(collector)
+
+    def snapshot(self):
+        """Copie sérialisable (JSON) du registre"""
+        collected = []
+        for collector in self._collectors:
+            try:
+                collected += [
+                    {'name': name, 'labels': labels, 'value': value}
+                    for name, labels, value in collector()
+                ]
+            except Exception:
+                continue
+
+        with self._lock:
+            return {
+                'counters': [
+                    {'name': name, 'labels': dict(labels), 'value': value}
+                    for (name, labels), value in self._counters.items()
+                ] + collected,
+                'gauges': [
+                    {'name': name, 'labels': dict(labels), 'value': value}
+                    for (name, labels), value in self._gauges.items()
+                ],
+                'histograms': [
+                    {'name': name, 'labels': dict(labels), **histogram.snapshot()}
+                    for (name, labels), histogram in self._histograms.items()
+                ],
+            }
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+
+_ROUTE_GROUP_RE = re.compile(r'\(\?P<(\w+)>[^)]*\)')
+
+@lru_cache(maxsize=512)
+def route_label(route):
+    """Motif d'URL lisible : 'api/^modelprofiles/(?P<pk>[^/.]+)/$' -> '/api/modelprofiles/{pk}/'"""
+    route = _ROUTE_GROUP_RE.sub(r'{\1}', route).replace('^', '').replace('$', '')
+    return '/' + route.lstrip('/')
+
+class RequestMetrics:
+    """Mesures d'une requête en cours (SQL, cache, sérialisation)"""
+
+    __slots__ = ('sql_count', 'sql_time', 'cache_hits', 'cache_misses', 'sections', '_depth')
+
+    def __init__(self):
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.sections = {}
+        self._depth = {}
+
+_current_request = ContextVar('current_request_metrics', default=None)
+
+def current_request_metrics():
+    """Mesures de la requête en cours, ou None (hors requête ou requête non échantillonnée)"""
+    return _current_request.get()
+
+def start_request_metrics():
+    request_metrics = RequestMetrics()
+    return request_metrics, _current_request.set(request_metrics)
+
+def stop_request_metrics(token):
+    _current_request.reset(token)
+
+def should_sample():
+    """Échantillonnage des mesures détaillées (PERF_SAMPLE_RATE entre 0 et 1)"""
+    rate = getattr(settings, 'PERF_SAMPLE_RATE', 1.0)
+    return rate >= 1 or (rate > 0 and random.random() < rate)
+
+def sql_execute_wrapper(execute, sql, params, many, context):
+    """connection.execute_wrapper : compte et chronomètre chaque requête SQL"""
+    request_metrics = _current_request.get()
+    if request_metrics is None:
+        return execute(sql, params, many, context)
+
+    started_at = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        request_metrics.sql_count += 1
+        request_metrics.sql_time += time.perf_counter() - started_at
+
+def record_cache_access(hits=0, misses=0):
+    request_metrics = _current_request.get()
+    if request_metrics is not None:
+        request_metrics.cache_hits += hits
+        request_metrics.cache_misses += misses
+    if hits:
+        metrics.inc('cache_hits_total', hits)
+    if misses:
+        metrics.inc('cache_misses_total', misses)
+
+@contextmanager
+def timed_section(name):
+    """
+    Chronomètre une section de la requête en cours (ex: 'serializer').
+    Les appels imbriqués d'une même section ne sont comptés qu'une fois.
+    """
+    request_metrics = _current_request.get()
+    if request_metrics is None:
+        yield
+        return
+
+    depth = request_metrics._depth.get(name, 0)
+    request_metrics._depth[name] = depth + 1
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        request_metrics._depth[name] = depth
+        if depth == 0:
+            request_metrics.sections[name] = request_metrics.sections.get(name, 0.0) + time.perf_counter() - started_at
+
+def install_serializer_timing():
+    """Chronomètre Serializer.data / ListSerializer.data (section 'serializer')"""
+    from rest_framework import serializers
+
+    for serializer_class in (serializers.Serializer, serializers.ListSerializer):
+        data_property = serializer_class.__dict__['data']
+        if getattr(data_property.fget, '_timed', False):
+            continue
+
+        def timed_data(self, _fget=data_property.fget):
+            with timed_section('serializer'):
+                return _fget(self)
+
+        timed_data._timed = True
+        serializer_class.data = property(timed_data)
+
+# --- Agrégation multi-processus (workers gunicorn, Celery, ASGI) ---
+# Chaque processus écrit périodiquement son snapshot dans METRICS_MULTIPROC_DIR/<pid>-<démarrage>.json ;
+# /metrics additionne les fichiers. Le fichier d'un processus terminé (pid disparu, ou pid réutilisé
+# par un processus plus récent) est replié dans RETIRED_FILENAME puis supprimé : ses compteurs et
+# histogrammes restent cumulés, ses jauges disparaissent. Le répertoire doit être propre à un hôte
+# (espace de pid commun à tous les processus qui y écrivent).
+
+RETIRED_FILENAME = 'retired.json'
+_SNAPSHOT_FILENAME_RE = re.compile(r'^(\d+)-(\d+)\.json$')
+
+_PROCESS_STARTED_AT = int(time.time())
+_last_flush = {'at': 0.0, 'pid': None}
+
+def _multiproc_dir():
+    return getattr(settings, 'METRICS_MULTIPROC_DIR', None)
+
+def _write_json(path, data):
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w') as handle:
+        json.dump(data, handle)
+    os.replace(tmp_path, path)  # écriture atomique
+
+def _read_json(path):
+    try:
+        with open(path) as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return None
+
+def flush_metrics(force=False):
+    """Écrit le snapshot du processus (au plus toutes les METRICS_FLUSH_INTERVAL secondes)"""
+    directory = _multiproc_dir()
+    if not directory:
+        return False
+
+    now = time.monotonic()
+    pid = os.getpid()
+    interval = getattr(settings, 'METRICS_FLUSH_INTERVAL', 5)
+    if not force and _last_flush['pid'] == pid and now - _last_flush['at'] < interval:
+        return False
+    _last_flush.update(at=now, pid=pid)
+
+    try:
+        os.makedirs(directory, exist_ok=True)
+        _write_json(os.path.join(directory, f'{pid}-{_PROCESS_STARTED_AT}.json'), {'pid': pid, **metrics.snapshot()})
+        return True
+    except OSError:
+        return False
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+        return True
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+
+@contextmanager
+def _directory_lock(directory):
+    """Verrou exclusif du répertoire : deux collectes simultanées ne replient pas deux fois un fichier"""
+    import fcntl
+
+    with open(os.path.join(directory, '.lock'), 'a') as handle:
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+def _retired_files(filenames):
+    """Snapshots de processus terminés : pid disparu, ou pid repris par un processus démarré après"""
+    processes = {}
+    for filename in filenames:
+        match = _SNAPSHOT_FILENAME_RE.match(filename)
+        if match:
+            processes[filename] = (int(match.group(1)), int(match.group(2)))
+    latest = {}
+    for pid, started_at in processes.values():
+        latest[pid] = max(latest.get(pid, started_at), started_at)
+    return [
+        filename for filename, (pid, started_at) in processes.items()
+        if started_at < latest[pid] or not _pid_alive(pid)
+    ]
+
+def collect_metrics():
+    """Snapshot agrégé de tous les processus (ou du seul processus courant sans répertoire partagé)"""
+    directory = _multiproc_dir()
+    if not directory:
+        return metrics.snapshot()
+
+    flush_metrics(force=True)
+    if not os.path.isdir(directory):
+        return metrics.snapshot()
+
+    with _directory_lock(directory):
+        filenames = [name for name in os.listdir(directory) if _SNAPSHOT_FILENAME_RE.match(name)]
+        retired_path = os.path.join(directory, RETIRED_FILENAME)
+        retired = _read_json(retired_path) or {}
+
+        to_retire = _retired_files(filenames)
+        if to_retire:
+            snapshots = [snapshot for snapshot in (_read_json(os.path.join(directory, name)) for name in to_retire) if snapshot]
+            retired = merge_snapshots([retired] + snapshots)
+            retired['gauges'] = []
+            _write_json(retired_path, retired)
+            for name in to_retire:
+                try:
+                    os.remove(os.path.join(directory, name))
+                except OSError:
+                    pass
+
+        live = set(filenames) - set(to_retire)
+        snapshots = [snapshot for snapshot in (_read_json(os.path.join(directory, name)) for name in live) if snapshot]
+    return merge_snapshots(snapshots + [retired])
+
+def merge_snapshots(snapshots):
+    counters, gauges, histograms = {}, {}, {}
+
+    for snapshot in snapshots:
+        for counter in snapshot.get('counters', []):
+            key = MetricsRegistry._key(counter['name'], counter['labels'])
+            counters[key] = counters.get(key, 0) + counter['value']
+        for gauge in snapshot.get('gauges', []):
+            key = MetricsRegistry._key(gauge['name'], gauge['labels'])
+            gauges[key] = gauges.get(key, 0) + gauge['value']
+        for histogram in snapshot.get('histograms', []):
+            key = MetricsRegistry._key(histogram['name'], histogram['labels'])
+            merged = histograms.get(key)
+            if merged is None:
+                histograms[key] = {**histogram, 'counts': list(histogram['counts'])}
+            elif merged['buckets'] == histogram['buckets']:
+                merged['counts'] = [a + b for a, b in zip(merged['counts'], histogram['counts'])]
+                merged['sum'] += histogram['sum']
+                merged['count'] += histogram['count']
+
+    return {
+        'counters': [{'name': name, 'labels': dict(labels), 'value': value} for (name, labels), value in counters.items()],
+        'gauges': [{'name': name, 'labels': dict(labels), 'value': value} for (name, labels), value in gauges.items()],
+        'histograms': list(histograms.values()),
+    }
+
+def _format_labels(labels, extra=None):
+    items = sorted((labels or {}).items()) + list(extra or [])
+    if not items:
+        return ''
+    escaped = (
+        f'{key}="' + str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+        for key, value in items
+    )
+    return '{' + ','.join(escaped) + '}'
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+def render_prometheus(snapshot):
+    """Format d'exposition texte Prometheus (version 0.0.4)"""
+    lines = []
+
+    for kind, entries in (('counter', snapshot['counters']), ('gauge', snapshot['gauges'])):
+        seen = set()
+        for entry in sorted(entries, key=lambda entry: entry['name']):
+            if entry['name'] not in seen:
+                seen.add(entry['name'])
+                lines.append(f"# TYPE {entry['name']} {kind}")
+            lines.append(f"{entry['name']}{_format_labels(entry['labels'])} {_format_value(entry['value'])}")
+
+    seen = set()
+    for histogram in sorted(snapshot['histograms'], key=lambda histogram: histogram['name']):
+        name = histogram['name']
+        if name not in seen:
+            seen.add(name)
+            lines.append(f'# TYPE {name} histogram')
+        cumulative = 0
+        for bound, count in zip(list(histogram['buckets']) + ['+Inf'], histogram['counts']):
+            cumulative += count
+            lines.append(f"{name}_bucket{_format_labels(histogram['labels'], [('le', bound)])} {cumulative}")
+        lines.append(f"{name}_sum{_format_labels(histogram['labels'])} {_format_value(float(histogram['sum']))}")
+        lines.append(f"{name}_count{_format_labels(histogram['labels'])} {histogram['count']}")
+
+    return '\n'.join(lines) + '\n'
+
+class InstrumentedCacheMixin:
+    """Compte les hits / misses des get() et get_many() d'un backend de cache"""
+
+    _MISSING = object()
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, self._MISSING, version)
+        if value is self._MISSING:
+            record_cache_access(misses=1)
+            return default
+        record_cache_access(hits=1)
+        return value
+
+    def get_many(self, keys, version=None):
+        parent_get_many = super().get_many
+        if parent_get_many.__func__ is BaseCache.get_many:
+            # Implémentation par défaut : chaque clé passe déjà par get()
+            return parent_get_many(keys, version)
+
+        keys = list(keys)
+        found = parent_get_many(keys, version)
+        record_cache_access(hits=len(found), misses=len(keys) - len(found))
+        return found
+
+class InstrumentedLocMemCache(InstrumentedCacheMixin, LocMemCache):
+    """Cache mémoire local instrumenté (CACHES['default'])"""
+
+# Instance globale (une par processus)
+metrics = MetricsRegistry()
@@ -2,8 +2,10 @@ from django.utils.deprecation import MiddlewareMixin
 from django.contrib.auth.models import User
 from .models import UserSession
 import logging
+import time
 
 logger = logging.getLogger(__name__)
+perf_logger = logging.getLogger('sales.performance')
 
 class UserActivityMiddleware(MiddlewareMixin):
     """
@@ -92,3 +94,130 @@ class SessionCleanupMiddleware(MiddlewareMixin):
                 logger.error(f"❌ Erreur lors du nettoyage des sessions: {str(e)}")
         
         return None
+
+
+class PerformanceMetricsMiddleware:
+    """
+    Instrumentation par requête : durée totale, nombre et durée des requêtes SQL,
+    hits / misses du cache et temps de sérialisation DRF.
+    - en-tête Server-Timing (lisible dans l'onglet réseau du navigateur), uniquement pour les
+      comptes staff, en DEBUG ou si PERF_SERVER_TIMING : il révèle le nombre de requêtes SQL
+    - ligne de log structurée (logger 'sales.performance', champs dans `extra`)
+    - histogrammes du registre en mémoire (sales.instrumentation.metrics)
+    Les mesures détaillées ne portent que sur une fraction des requêtes (PERF_SAMPLE_RATE) ;
+    durée et statut sont toujours enregistrés.
+    """
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+    
+    def __call__(self, request):
+        from django.db import connection
+        from .instrumentation import (
+            metrics, should_sample, start_request_metrics, stop_request_metrics,
+            sql_execute_wrapper, QUERY_COUNT_BUCKETS
+        )
+        
+        started_at = time.perf_counter()
+        
+        if not should_sample():
+            response = self.get_response(request)
+            self.observe(request, response, time.perf_counter() - started_at)
+            return response
+        
+        request_metrics, token = start_request_metrics()
+        try:
+            with connection.execute_wrapper(sql_execute_wrapper):
+                response = self.get_response(request)
+        finally:
+            stop_request_metrics(token)
+        
+        total = time.perf_counter() - started_at
+        labels = self.observe(request, response, total)
+        metrics.observe('http_request_db_queries', request_metrics.sql_count, labels={'route': labels['route']}, buckets=QUERY_COUNT_BUCKETS)
+        metrics.observe('http_request_db_seconds', request_metrics.sql_time, labels={'route': labels['route']})
+        
+        timings = [
+            f'db;desc="SQL x{request_metrics.sql_count}";dur={request_metrics.sql_time * 1000:.1f}',
+            f'cache;desc="hit {request_metrics.cache_hits} / miss {request_metrics.cache_misses}"',
+        ]
+        timings += [f'{name};dur={duration * 1000:.1f}' for name, duration in request_metrics.sections.items()]
+        timings.append(f'total;dur={total * 1000:.1f}')
+        if self.exposes_timings(request):
+            response['Server-Timing'] = ', '.join(timings)
+        
+        perf_logger.info(
+            f"⏱️ {request.method} {labels['route']} {response.status_code} {total * 1000:.1f}ms "
+            f"sql={request_metrics.sql_count}/{request_metrics.sql_time * 1000:.1f}ms",
+            extra={
+                'method': request.method,
+                'route': labels['route'],
+                'status': response.status_code,
+                'duration_ms': round(total * 1000, 2),
+                'db_queries': request_metrics.sql_count,
+                'db_ms': round(request_metrics.sql_time * 1000, 2),
+                'cache_hits': request_metrics.cache_hits,
+                'cache_misses': request_metrics.cache_misses,
+                'serializer_ms': round(request_metrics.sections.get('serializer', 0.0) * 1000, 2),
+            }
+        )
+        return response
+    
+    @staticmethod
+    def exposes_timings(request):
+        """Server-Timing réservé au staff (utilisateur JWT répercuté par DRF sur la requête), au DEBUG ou à PERF_SERVER_TIMING"""
+        from django.conf import settings
+        
+        if settings.DEBUG or settings.PERF_SERVER_TIMING:
+            return True
+        user = getattr(request, 'user', None)
+        return bool(user and user.is_authenticated and user.is_staff)
+    
+    def observe(self, request, response, duration):
+        """Histogramme de durée par route (motif d'URL, pas le chemin brut) / méthode / statut"""
+        from .instrumentation import metrics, route_label, flush_metrics
+        
+        match = getattr(request, 'resolver_match', None)
+        labels = {
+            'route': route_label(match.route) if match and match.route else 'unmatched',
+            'method': request.method,
+            'status': str(response.status_code),
+        }
+        metrics.observe('http_request_duration_seconds', duration, labels=labels)
+        flush_metrics()
+        return labels
+
+
+class QueryBudgetMiddleware:
+    """
+    Garde-fou de développement (QUERY_BUDGET_MIDDLEWARE, activé par défaut avec DEBUG) :
+    signale les requêtes HTTP qui dépassent QUERY_BUDGET_PER_REQUEST requêtes SQL ou qui
+    répètent une même requête (N+1). En-têtes X-Query-Count / X-Query-Duplicates ;
+    avec QUERY_BUDGET_STRICT, le dépassement lève QueryBudgetExceeded (erreur 500 visible).
+    """
+    
+    def __init__(self, get_response):
+        from django.conf import settings
+        
+        self.get_response = get_response
+        self.budget = getattr(settings, 'QUERY_BUDGET_PER_REQUEST', 50)
+        self.duplicate_threshold = getattr(settings, 'QUERY_BUDGET_DUPLICATE_THRESHOLD', 3)
+        self.strict = getattr(settings, 'QUERY_BUDGET_STRICT', False)
+    
+    def __call__(self, request):
+        from .query_budget import QueryRecorder, QueryBudgetExceeded
+        
+        with QueryRecorder() as recorder:
+            response = self.get_response(request)
+        
+        duplicates = recorder.duplicates(self.duplicate_threshold)
+        response['X-Query-Count'] = str(recorder.count)
+        response['X-Query-Duplicates'] = str(len(duplicates))
+        
+        if recorder.count > self.budget or duplicates:
+            message = f"🐢 {request.method} {request.path}: budget SQL {self.budget} — {recorder.report(self.duplicate_threshold)}"
+            if self.strict:
+                raise QueryBudgetExceeded(message)
+            perf_logger.warning(message)
+        
+        return response
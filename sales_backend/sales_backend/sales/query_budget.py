@@ -0,0 +1,111 @@
+import re
+import time
+from collections import Counter
+from contextlib import ContextDecorator
+from django.db import connections
+
+# Nombre de répétitions d'une même requête SQL (paramètres exclus) signalé comme N+1
+DEFAULT_DUPLICATE_THRESHOLD = 3
+
+_WHITESPACE_RE = re.compile(r'\s+')
+_IN_LIST_RE = re.compile(r'IN \((?:%s, )*%s\)')
+
+# Contrôle de transaction (un BEGIN par bloc atomic) : jamais un N+1
+_TRANSACTION_RE = re.compile(r'^(BEGIN|COMMIT|ROLLBACK|SAVEPOINT|RELEASE SAVEPOINT|ROLLBACK TO SAVEPOINT)\b', re.IGNORECASE)
+
+class QueryBudgetExceeded(AssertionError):
+    """Budget de requêtes SQL dépassé (ou requêtes dupliquées détectées)"""
+
+def normalize_sql(sql):
+    """Motif d'une requête : paramètres déjà remplacés par %s, listes IN (...) repliées"""
+    return _IN_LIST_RE.sub('IN (...)', _WHITESPACE_RE.sub(' ', sql).strip())
+
+class QueryRecorder:
+    """Enregistre les requêtes SQL exécutées sur une connexion (via execute_wrapper)"""
+
+    def __init__(self, using='default'):
+        self.using = using
+        self.queries = []
+        self._wrapper = None
+
+    def __call__(self, execute, sql, params, many, context):
+        started_at = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, time.perf_counter() - started_at))
+
+    def __enter__(self):
+        self._wrapper = connections[self.using].execute_wrapper(self)
+        self._wrapper.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._wrapper.__exit__(*exc_info)
+        self._wrapper = None
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    @property
+    def total_time(self):
+        return sum(duration for sql, duration in self.queries)
+
+    def duplicates(self, threshold=DEFAULT_DUPLICATE_THRESHOLD):
+        """[(motif SQL, répétitions)] des requêtes exécutées au moins `threshold` fois"""
+        counter = Counter(normalize_sql(sql) for sql, duration in self.queries if not _TRANSACTION_RE.match(sql.lstrip()))
+        return [(sql, count) for sql, count in counter.most_common() if count >= threshold]
+
+    def report(self, threshold=DEFAULT_DUPLICATE_THRESHOLD, limit=5):
+        lines = [f'{self.count} requêtes SQL ({self.total_time * 1000:.1f} ms)']
+        for sql, count in self.duplicates(threshold)[:limit]:
+            lines.append(f'  x{count} {sql[:200]}')
+        return '\n'.join(lines)
+
+class query_budget(ContextDecorator):
+    """
+    Budget de requêtes SQL, utilisable en gestionnaire de contexte ou en décorateur :
+
+        with query_budget(5):
+            list(UserWithStatsSerializer(users, many=True).data)
+
+        @query_budget(3, max_duplicates=0)
+        def build_report(...): ...
+
+    Lève QueryBudgetExceeded si plus de `max_queries` requêtes sont exécutées, ou si plus de
+    `max_duplicates` requêtes distinctes (paramètres exclus) sont répétées au moins
+    `duplicate_threshold` fois (signature d'un N+1).
+    """
+
+    def __init__(self, max_queries=None, max_duplicates=None, duplicate_threshold=DEFAULT_DUPLICATE_THRESHOLD, using='default'):
+        self.max_queries = max_queries
+        self.max_duplicates = max_duplicates
+        self.duplicate_threshold = duplicate_threshold
+        self.using = using
+        self.recorder = None
+
+    def _recreate_cm(self):
+        # Un enregistreur neuf par appel de la fonction décorée
+        return query_budget(self.max_queries, self.max_duplicates, self.duplicate_threshold, self.using)
+
+    def __enter__(self):
+        self.recorder = QueryRecorder(self.using).__enter__()
+        return self.recorder
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.recorder.__exit__(exc_type, exc_value, traceback)
+        if exc_type is not None:
+            return False
+
+        errors = []
+        if self.max_queries is not None and self.recorder.count > self.max_queries:
+            errors.append(f'{self.recorder.count} requêtes > budget {self.max_queries}')
+        if self.max_duplicates is not None:
+            duplicates = self.recorder.duplicates(self.duplicate_threshold)
+            if len(duplicates) > self.max_duplicates:
+                errors.append(f'{len(duplicates)} requêtes dupliquées (N+1 probable)')
+
+        if errors:
+            raise QueryBudgetExceeded(' ; '.join(errors) + '\n' + self.recorder.report(self.duplicate_threshold))
+        return False
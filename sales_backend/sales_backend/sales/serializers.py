@@ -2,9 +2,21 @@ from rest_framework import serializers
 from .models import ModelProfile, DailySale, UserSession
 from django.contrib.auth.models import User
 from django.contrib.auth.hashers import make_password
-from django.db.models import Sum, Max
+from django.db.models import Sum, Max, Count
 from datetime import datetime
 
+# Statistiques de ventes par utilisateur, calculées en SQL (une jointure, pas une requête par modèle)
+USER_STATS_ANNOTATIONS = {
+    'stats_total_models': Count('model_profiles', distinct=True),
+    'stats_total_sales': Count('model_profiles__daily_sales'),
+    'stats_total_revenue': Sum('model_profiles__daily_sales__amount_usd'),
+    'stats_last_activity': Max('model_profiles__daily_sales__date'),
+}
+
+def annotate_user_stats(queryset):
+    """Prépare un queryset d'utilisateurs pour UserWithStatsSerializer (nombre de requêtes fixe)"""
+    return queryset.select_related('session_info').annotate(**USER_STATS_ANNOTATIONS)
+
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
@@ -31,40 +43,28 @@ class UserWithStatsSerializer(serializers.ModelSerializer):
             'password': {'write_only': True}
         }
 
+    def _stats(self, obj):
+        """
+        Statistiques de ventes de l'utilisateur : annotations posées par annotate_user_stats()
+        sur les listes, sinon une seule requête d'agrégation (création, détail non annoté).
+        """
+        if not hasattr(obj, 'stats_total_models'):
+            stats = User.objects.filter(pk=obj.pk).aggregate(**USER_STATS_ANNOTATIONS)
+            for name, value in stats.items():
+                setattr(obj, name, value)
+        return obj
+
     def get_total_models(self, obj):
-        return ModelProfile.objects.filter(owner=obj).count()
+        return self._stats(obj).stats_total_models or 0
 
     def get_total_sales(self, obj):
-        models = ModelProfile.objects.filter(owner=obj)
-        total = 0
-        for model in models:
-            total += DailySale.objects.filter(model_profile=model).count()
-        return total
-
-    def get_total_revenue(self, obj):  # ← AJOUTEZ CETTE MÉTHODE
-        models = ModelProfile.objects.filter(owner=obj)
-        total_revenue = 0
-        for model in models:
-            sales_aggregate = DailySale.objects.filter(
-                model_profile=model
-            ).aggregate(total=Sum('amount_usd'))
-            if sales_aggregate['total']:
-                total_revenue += sales_aggregate['total']
-        return total_revenue
-
-    def get_last_activity(self, obj):  # ← COMPLÉTEZ CETTE MÉTHODE
-        models = ModelProfile.objects.filter(owner=obj)
-        last_activity = None
-        
-        for model in models:
-            last_sale = DailySale.objects.filter(
-                model_profile=model
-            ).order_by('-date').first()
-            
-            if last_sale and (not last_activity or last_sale.date > last_activity):
-                last_activity = last_sale.date
-        
-        return last_activity
+        return self._stats(obj).stats_total_sales or 0
+
+    def get_total_revenue(self, obj):
+        return self._stats(obj).stats_total_revenue or 0
+
+    def get_last_activity(self, obj):
+        return self._stats(obj).stats_last_activity
 
     def create(self, validated_data):  # ← AJOUTEZ CETTE MÉTHODE POUR LA CRÉATION
         # Hash du mot de passe avant la création
@@ -89,37 +89,32 @@ class UserWithStatsSerializer(serializers.ModelSerializer):
         
         return user
 
-    def get_is_online(self, obj):
-        """Obtenir le statut de connexion de l'utilisateur"""
+    def _session(self, obj):
+        """Session de l'utilisateur (jointe par select_related('session_info') sur les listes)"""
         try:
-            session = UserSession.objects.get(user=obj)
-            return session.is_online
+            return obj.session_info
         except UserSession.DoesNotExist:
-            return False
+            return None
+
+    def get_is_online(self, obj):
+        """Obtenir le statut de connexion de l'utilisateur"""
+        session = self._session(obj)
+        return session.is_online if session else False
 
     def get_last_login(self, obj):
         """Obtenir la dernière connexion de l'utilisateur"""
-        try:
-            session = UserSession.objects.get(user=obj)
-            return session.last_login
-        except UserSession.DoesNotExist:
-            return obj.last_login
+        session = self._session(obj)
+        return session.last_login if session else obj.last_login
 
     def get_last_logout(self, obj):
         """Obtenir la dernière déconnexion de l'utilisateur"""
-        try:
-            session = UserSession.objects.get(user=obj)
-            return session.last_logout
-        except UserSession.DoesNotExist:
-            return None
+        session = self._session(obj)
+        return session.last_logout if session else None
 
     def get_connection_status(self, obj):
         """Obtenir le statut de connexion formaté"""
-        try:
-            session = UserSession.objects.get(user=obj)
-            return session.last_seen_display
-        except UserSession.DoesNotExist:
-            return "Jamais connecté"
+        session = self._session(obj)
+        return session.last_seen_display if session else "Jamais connecté"
 
 class DailySaleSerializer(serializers.ModelSerializer):
     class Meta:
@@ -149,6 +144,14 @@ class ModelProfileSerializer(serializers.ModelSerializer):
             return obj.profile_photo.url
         return None
 
+class AdminModelProfileSerializer(ModelProfileSerializer):
+    """Modèle vu par un admin : segment précalculé par la segmentation périodique (null si pas encore calculé)"""
+    segment = serializers.IntegerField(source='segment.segment', read_only=True, default=None)
+    segment_label = serializers.CharField(source='segment.label', read_only=True, default=None)
+
+    class Meta(ModelProfileSerializer.Meta):
+        fields = ModelProfileSerializer.Meta.fields + ['segment', 'segment_label']
+
 class ModelProfileCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = ModelProfile
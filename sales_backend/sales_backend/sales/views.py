@@ -3,7 +3,8 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from django.contrib.auth.models import User
-from django.db.models import Sum, Count, Q
+from django.db import transaction
+from django.db.models import Sum, Count, F, Q
 from django.http import HttpResponse
 from datetime import datetime
 from .models import ModelProfile, DailySale
@@ -12,12 +13,12 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.contrib.auth.models import User
 from .serializers import (
-    ModelProfileSerializer, ModelProfileCreateSerializer, 
-    DailySaleSerializer, StatsSerializer, UserSerializer, UserWithStatsSerializer
+    ModelProfileSerializer, AdminModelProfileSerializer, ModelProfileCreateSerializer, 
+    DailySaleSerializer, StatsSerializer, UserSerializer, UserWithStatsSerializer,
+    annotate_user_stats
 )
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
 import io
+import time
 import logging
 import traceback
 import os
@@ -41,12 +42,14 @@ class UserViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         # L'admin voit son propre compte ET les utilisateurs qu'il a créés
         if self.request.user.is_superuser:
-            return User.objects.all().order_by('-date_joined')
+            return annotate_user_stats(User.objects.all()).order_by('-date_joined')
         else:
             from accounts.models import UserProfile
             from django.db.models import Q
             user_profiles_created = UserProfile.objects.filter(created_by=self.request.user).values_list('user_id', flat=True)
-            return User.objects.filter(Q(id=self.request.user.id) | Q(id__in=user_profiles_created)).order_by('-date_joined')
+            return annotate_user_stats(
+                User.objects.filter(Q(id=self.request.user.id) | Q(id__in=user_profiles_created))
+            ).order_by('-date_joined')
 
     def get_serializer_class(self):
         if self.action == 'list':
@@ -76,22 +79,37 @@ class UserViewSet(viewsets.ModelViewSet):
 class AdminModelProfileViewSet(viewsets.ReadOnlyModelViewSet):
     """
     API endpoint for admin to view models of users they created.
+    ?segment=N filtre sur le segment précalculé, ?ordering=segment (ou -segment) trie par segment.
     """
-    serializer_class = ModelProfileSerializer
+    serializer_class = AdminModelProfileSerializer
     permission_classes = [IsAdminUser]
     
     def get_queryset(self):
         # Superuser voit tout, admin voit ses modèles + ceux des utilisateurs qu'il a créés
-        if self.request.user.is_superuser:
-            return ModelProfile.objects.all().order_by('-created_at')
-        else:
+        # Propriétaire, segment et ventes imbriqués dans le serializer : chargés en 2 requêtes
+        queryset = ModelProfile.objects.select_related('owner', 'segment').prefetch_related('daily_sales')
+        if not self.request.user.is_superuser:
             # Admin voit ses propres modèles + ceux des utilisateurs qu'il a créés
             from accounts.models import UserProfile
             created_users = UserProfile.objects.filter(created_by=self.request.user).values_list('user', flat=True)
-            return ModelProfile.objects.filter(
+            queryset = queryset.filter(
                 Q(owner=self.request.user) | 
                 Q(owner__in=created_users)
-            ).order_by('-created_at')
+            )
+        
+        segment = self.request.query_params.get('segment')
+        if segment:
+            if not segment.isdigit():
+                raise serializers.ValidationError({'segment': 'Entier attendu'})
+            queryset = queryset.filter(segment__segment=int(segment))
+        
+        # Modèles pas encore segmentés en dernier, quel que soit le sens
+        ordering = self.request.query_params.get('ordering')
+        if ordering == 'segment':
+            return queryset.order_by(F('segment__segment').asc(nulls_last=True), '-created_at')
+        if ordering == '-segment':
+            return queryset.order_by(F('segment__segment').desc(nulls_last=True), '-created_at')
+        return queryset.order_by('-created_at')
 
 class AdminDailySaleViewSet(viewsets.ReadOnlyModelViewSet):
     """
@@ -167,12 +185,14 @@ class AdminUserViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         # L'admin voit son propre compte ET les utilisateurs qu'il a créés
         if self.request.user.is_superuser:
-            return User.objects.all().order_by('-date_joined')
+            return annotate_user_stats(User.objects.all()).order_by('-date_joined')
         else:
             from accounts.models import UserProfile
             from django.db.models import Q
             user_profiles_created = UserProfile.objects.filter(created_by=self.request.user).values_list('user_id', flat=True)
-            return User.objects.filter(Q(id=self.request.user.id) | Q(id__in=user_profiles_created)).order_by('-date_joined')
+            return annotate_user_stats(
+                User.objects.filter(Q(id=self.request.user.id) | Q(id__in=user_profiles_created))
+            ).order_by('-date_joined')
 
     def perform_create(self, serializer):
         # Hash du mot de passe avant sauvegarde
@@ -264,6 +284,14 @@ class AdminUserViewSet(viewsets.ModelViewSet):
 class ModelProfileViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     
+    def base_queryset(self):
+        # Propriétaire et ventes imbriqués dans ModelProfileSerializer : chargés en 2 requêtes
+        # (les autres actions, ex: stats / upload_photo, n'ont pas besoin des ventes)
+        queryset = ModelProfile.objects.select_related('owner')
+        if self.action in ('list', 'retrieve'):
+            queryset = queryset.prefetch_related('daily_sales')
+        return queryset
+    
     def get_queryset(self):
         # Debug logging
         import logging
@@ -272,7 +300,7 @@ class ModelProfileViewSet(viewsets.ModelViewSet):
         
         # Super admin voit SEULEMENT ses propres modèles
         if self.request.user.email == 'tahiantsoaFabio17@gmail.com':
-            queryset = ModelProfile.objects.filter(owner=self.request.user).order_by('-created_at')
+            queryset = self.base_queryset().filter(owner=self.request.user).order_by('-created_at')
             logger.info(f"Super admin queryset count: {queryset.count()}")
             return queryset
         
@@ -281,7 +309,7 @@ class ModelProfileViewSet(viewsets.ModelViewSet):
             from accounts.models import UserProfile
             created_users = UserProfile.objects.filter(created_by=self.request.user).values_list('user', flat=True)
             
-            queryset = ModelProfile.objects.filter(
+            queryset = self.base_queryset().filter(
                 Q(owner=self.request.user) | 
                 Q(owner__in=created_users)
             ).order_by('-created_at')
@@ -290,7 +318,7 @@ class ModelProfileViewSet(viewsets.ModelViewSet):
             return queryset
         else:
             # Utilisateur normal ne voit que ses propres modèles
-            queryset = ModelProfile.objects.filter(owner=self.request.user)
+            queryset = self.base_queryset().filter(owner=self.request.user)
             logger.info(f"User queryset count: {queryset.count()}")
             return queryset
     
@@ -504,6 +532,16 @@ class DailySaleViewSet(viewsets.ModelViewSet):
             serializer.save(model_profile=model_profile)
         except ModelProfile.DoesNotExist:
             raise serializers.ValidationError("Modèle non trouvé ou non autorisé")
+    
+    def perform_destroy(self, instance):
+        from ai_engine.signals import record_sale_deletion
+        
+        # Pas de signal post_delete sur les ventes (voir ai_engine.signals) : la vente est
+        # supprimée avant l'enregistrement de la variation, validée avec la suppression
+        model_id, day, amount = instance.model_profile_id, instance.date, instance.amount_usd
+        with transaction.atomic():
+            instance.delete()
+            record_sale_deletion(model_id, day, amount)
 
 class StatsView(generics.GenericAPIView):
     permission_classes = [IsAuthenticated]
@@ -555,7 +593,12 @@ class PDFReportView(generics.GenericAPIView):
         except ModelProfile.DoesNotExist:
             return Response({'error': 'Modèle non trouvé'}, status=404)
         
-        # Création du PDF
+        # Création du PDF (reportlab chargé à la première génération)
+        from .instrumentation import metrics
+        from reportlab.pdfgen import canvas
+        from reportlab.lib.pagesizes import letter
+        
+        started_at = time.perf_counter()
         buffer = io.BytesIO()
         p = canvas.Canvas(buffer, pagesize=letter)
         
@@ -579,6 +622,7 @@ class PDFReportView(generics.GenericAPIView):
         
         p.showPage()
         p.save()
+        metrics.observe('pdf_report_duration_seconds', time.perf_counter() - started_at)
         
         buffer.seek(0)
         response = HttpResponse(buffer, content_type='application/pdf')
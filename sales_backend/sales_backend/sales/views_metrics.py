@@ -0,0 +1,28 @@
+import hmac
+from django.conf import settings
+from django.http import HttpResponse
+from django.views.decorators.http import require_GET
+from .instrumentation import collect_metrics, render_prometheus
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+LOOPBACK_ADDRESSES = ('127.0.0.1', '::1')
+
+def _is_authorized(request):
+    """
+    METRICS_TOKEN défini : en-tête 'Authorization: Bearer <token>' obligatoire.
+    Sinon seul un scrape local (Prometheus sur la même machine) est accepté.
+    """
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if token:
+        authorization = request.headers.get('Authorization', '')
+        return hmac.compare_digest(authorization, f'Bearer {token}')
+    return request.META.get('REMOTE_ADDR') in LOOPBACK_ADDRESSES
+
+@require_GET
+def metrics_view(request):
+    """Métriques au format Prometheus, agrégées sur tous les processus (METRICS_MULTIPROC_DIR)"""
+    if not _is_authorized(request):
+        return HttpResponse('Forbidden\n', status=403, content_type='text/plain')
+
+    return HttpResponse(render_prometheus(collect_metrics()), content_type=PROMETHEUS_CONTENT_TYPE)
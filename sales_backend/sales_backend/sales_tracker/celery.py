@@ -1,5 +1,7 @@
 import os
+import time
 from celery import Celery
+from celery.signals import task_prerun, task_postrun, worker_process_shutdown
 
 # Configuration Django pour Celery
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'sales_tracker.settings')
@@ -12,6 +14,31 @@ app.config_from_object('django.conf:settings', namespace='CELERY')
 # Auto-découverte des tâches dans les apps Django
 app.autodiscover_tasks()
 
+# Durée et issue des tâches exportées sur /metrics (celery_task_duration_seconds, celery_tasks_total)
+_task_started_at = {}
+
+@task_prerun.connect
+def record_task_start(task_id=None, **kwargs):
+    _task_started_at[task_id] = time.perf_counter()
+
+@task_postrun.connect
+def record_task_end(task_id=None, task=None, state=None, **kwargs):
+    from sales.instrumentation import metrics, flush_metrics
+
+    started_at = _task_started_at.pop(task_id, None)
+    labels = {'task': task.name if task else 'unknown'}
+    if started_at is not None:
+        metrics.observe('celery_task_duration_seconds', time.perf_counter() - started_at, labels=labels)
+    metrics.inc('celery_tasks_total', labels={**labels, 'outcome': (state or 'UNKNOWN').lower()})
+    flush_metrics()
+
+@worker_process_shutdown.connect
+def flush_metrics_on_shutdown(**kwargs):
+    """Dernier snapshot du processus enfant : /metrics le replie dans les cumuls des processus terminés"""
+    from sales.instrumentation import flush_metrics
+
+    flush_metrics(force=True)
+
 @app.task(bind=True)
 def debug_task(self):
     print(f'Request: {self.request!r}')
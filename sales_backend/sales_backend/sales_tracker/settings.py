@@ -3,6 +3,7 @@ import os
 from datetime import timedelta
 from dotenv import load_dotenv
 import dj_database_url
+from celery.schedules import crontab
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 load_dotenv(BASE_DIR / '.env')
@@ -31,6 +32,7 @@ INSTALLED_APPS = [
 
     'accounts',
     'sales',
+    'ai_engine',
 ]
 
 # Configuration pour permettre la connexion par email ET username
@@ -40,6 +42,7 @@ AUTHENTICATION_BACKENDS = [
 ]
 
 MIDDLEWARE = [
+    'sales.middleware.PerformanceMetricsMiddleware',  # En premier : mesure la requête complète
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # Pour servir les fichiers statiques
@@ -53,6 +56,41 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Instrumentation des requêtes (Server-Timing, logs structurés, histogrammes)
+PERF_INSTRUMENTATION = os.getenv('PERF_INSTRUMENTATION', 'True') == 'True'
+# Fraction des requêtes mesurées en détail (SQL, cache, sérialisation)
+PERF_SAMPLE_RATE = float(os.getenv('PERF_SAMPLE_RATE', '1.0'))
+# En-tête Server-Timing (SQL, cache) pour tous : sinon réservé aux comptes staff et au mode DEBUG
+PERF_SERVER_TIMING = os.getenv('PERF_SERVER_TIMING', 'False') == 'True'
+
+if not PERF_INSTRUMENTATION:
+    MIDDLEWARE.remove('sales.middleware.PerformanceMetricsMiddleware')
+
+# Budget de requêtes SQL par requête HTTP (garde-fou de développement contre les N+1)
+QUERY_BUDGET_MIDDLEWARE = os.getenv('QUERY_BUDGET_MIDDLEWARE', str(DEBUG)) == 'True'
+QUERY_BUDGET_PER_REQUEST = int(os.getenv('QUERY_BUDGET_PER_REQUEST', '50'))
+# Répétitions d'une même requête (paramètres exclus) signalées comme N+1
+QUERY_BUDGET_DUPLICATE_THRESHOLD = int(os.getenv('QUERY_BUDGET_DUPLICATE_THRESHOLD', '3'))
+QUERY_BUDGET_STRICT = os.getenv('QUERY_BUDGET_STRICT', 'False') == 'True'
+
+if QUERY_BUDGET_MIDDLEWARE:
+    MIDDLEWARE.insert(MIDDLEWARE.index('corsheaders.middleware.CorsMiddleware'), 'sales.middleware.QueryBudgetMiddleware')
+
+# Endpoint /metrics (Prometheus)
+# Répertoire partagé où chaque processus (workers gunicorn, Celery, ASGI) écrit ses métriques
+METRICS_MULTIPROC_DIR = os.getenv('METRICS_MULTIPROC_DIR', '')
+# Intervalle minimal (secondes) entre deux écritures des métriques d'un processus
+METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', '5'))
+# Jeton Bearer exigé pour le scrape (vide : accès réservé à localhost)
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+# Cache local instrumenté (hits / misses comptés par l'instrumentation)
+CACHES = {
+    'default': {
+        'BACKEND': 'sales.instrumentation.InstrumentedLocMemCache',
+    }
+}
+
 ROOT_URLCONF = 'sales_tracker.urls'
 
 TEMPLATES = [
@@ -216,10 +254,12 @@ FIREBASE_CLIENT_EMAIL = os.getenv('FIREBASE_CLIENT_EMAIL')
 # Configuration Email pour 2FA
 # Utiliser console backend en développement/production si pas de config SMTP
 if os.getenv('EMAIL_HOST_USER') and os.getenv('EMAIL_HOST_PASSWORD'):
-    EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+    # Backend SMTP avec pool de connexions persistantes et retry (accounts/mail_service.py)
+    EMAIL_BACKEND = 'accounts.mail_service.PooledSMTPEmailBackend'
     EMAIL_HOST = os.getenv('EMAIL_HOST', 'smtp.gmail.com')
     EMAIL_PORT = int(os.getenv('EMAIL_PORT', '587'))
     EMAIL_USE_TLS = True
+    EMAIL_TIMEOUT = int(os.getenv('EMAIL_TIMEOUT', '10'))
     EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER')
     EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD')
     DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', EMAIL_HOST_USER)
@@ -228,6 +268,12 @@ else:
     EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
     DEFAULT_FROM_EMAIL = 'noreply@sales-tracker-pro.com'
 
+# Emails transactionnels (réinitialisation, 2FA, invitations) : file d'attente Celery
+# puis envoi par connexions SMTP persistantes (EMAIL_BACKEND ci-dessus)
+TRANSACTIONAL_EMAIL_ASYNC = os.getenv('TRANSACTIONAL_EMAIL_ASYNC', 'True') == 'True'
+EMAIL_POOL_SIZE = int(os.getenv('EMAIL_POOL_SIZE', '2'))
+EMAIL_POOL_KEEPALIVE = int(os.getenv('EMAIL_POOL_KEEPALIVE', '30'))
+
 # URL du frontend pour les liens d'invitation
 FRONTEND_URL = os.getenv('FRONTEND_URL', 'https://sales-tracker-pro-v3.vercel.app')
 
@@ -237,10 +283,69 @@ CELERY_RESULT_BACKEND = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
 CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
-CELERY_TIMEZONE = 'UTC'
+# Heure locale : les tâches nocturnes (crontab) suivent le changement de jour de timezone.localdate()
+CELERY_TIMEZONE = TIME_ZONE
 CELERY_TASK_ALWAYS_EAGER = False  # False pour envoi asynchrone réel
 CELERY_TASK_EAGER_PROPAGATES = True
 
+# Tâches périodiques (Celery beat)
+CELERY_BEAT_SCHEDULE = {
+    'expire-stale-invitations': {
+        'task': 'accounts.tasks.expire_invitations_async',
+        'schedule': timedelta(minutes=15),
+    },
+    # Passages nocturnes échelonnés après minuit (heure locale) : indicateurs 00:05 (périmés au
+    # changement de jour), analyses 00:10, anomalies 00:15, prévisions 00:30, segments 01:00
+    'forecast-all-models': {
+        'task': 'ai_engine.tasks.forecast_all_models_async',
+        'schedule': crontab(hour=0, minute=30),
+    },
+    'refresh-ai-insights': {
+        'task': 'ai_engine.tasks.refresh_insights_async',
+        'schedule': timedelta(minutes=10),
+    },
+    'refresh-ai-insights-daily': {
+        'task': 'ai_engine.tasks.refresh_insights_async',
+        'schedule': crontab(hour=0, minute=10),
+        'kwargs': {'rollover': True},
+    },
+    'rebuild-ai-analytics': {
+        'task': 'ai_engine.tasks.rebuild_analytics_async',
+        'schedule': crontab(hour=0, minute=5),
+    },
+    'detect-sales-anomalies': {
+        'task': 'ai_engine.tasks.detect_anomalies_async',
+        'schedule': crontab(hour=0, minute=15),
+    },
+    'segment-models': {
+        'task': 'ai_engine.tasks.segment_models_async',
+        'schedule': crontab(hour=1, minute=0),
+    },
+}
+
+# Envoi des SMS (invitations, 2FA) : file d'attente Celery + limite de débit par fournisseur
+SMS_ASYNC = os.getenv('SMS_ASYNC', 'True') == 'True'
+SMS_HTTP_TIMEOUT = (3.05, float(os.getenv('SMS_HTTP_READ_TIMEOUT', '10')))  # (connexion, lecture)
+# Surcharge optionnelle : {'SMS77': {'rate': 5, 'capacity': 10}} (jetons/seconde, rafale)
+SMS_RATE_LIMITS = {}
+# Seaux partagés par tous les workers (vide : un seau par processus, débit multiplié par la concurrence)
+SMS_RATE_LIMIT_REDIS_URL = os.getenv('SMS_RATE_LIMIT_REDIS_URL', CELERY_BROKER_URL)
+# Routeur des fournisseurs : tentative de secours après N secondes sans réponse (0 = désactivée)
+# et disjoncteur (échecs consécutifs avant ouverture, délai avant nouvel essai)
+SMS_HEDGE_AFTER = float(os.getenv('SMS_HEDGE_AFTER', '2.0'))
+SMS_CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('SMS_CIRCUIT_FAILURE_THRESHOLD', '5'))
+SMS_CIRCUIT_RESET_TIMEOUT = int(os.getenv('SMS_CIRCUIT_RESET_TIMEOUT', '60'))
+
+# Prévisions IA : mise à jour incrémentale de l'état de prévision d'un modèle à chaque vente
+AI_FORECAST_ONLINE_UPDATES = os.getenv('AI_FORECAST_ONLINE_UPDATES', 'True') == 'True'
+# Séries réduites pour les graphiques : durée de vie du cache (invalidé à chaque vente)
+AI_TIMESERIES_CACHE_TTL = int(os.getenv('AI_TIMESERIES_CACHE_TTL', '3600'))
+# Segmentation des modèles : nombre de segments (hors inactifs)
+AI_SEGMENT_CLUSTERS = int(os.getenv('AI_SEGMENT_CLUSTERS', '6'))
+
+# Notifications push : bouchon FCM local (tests hors ligne, aucun appel réseau)
+PUSH_FCM_STUB = os.getenv('PUSH_FCM_STUB', 'False') == 'True'
+
 # Configuration Twilio pour SMS (optionnel)
 TWILIO_ACCOUNT_SID = os.getenv('TWILIO_ACCOUNT_SID')
 TWILIO_AUTH_TOKEN = os.getenv('TWILIO_AUTH_TOKEN')
@@ -6,6 +6,7 @@ from django.conf import settings
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from django.conf.urls.static import static
 from django.http import JsonResponse
+from sales.views_metrics import metrics_view
 
 # Vue simple pour la page d'accueil
 def home_view(request):
@@ -23,9 +24,11 @@ urlpatterns = [
     path('', home_view, name='home'),  # Page d'accueil
     path('api/', include('sales.urls')),  # Inclut toutes les routes API
     path('api/accounts/', include('accounts.urls')),  # Routes des comptes et invitations
+    path('api/ai/', include('ai_engine.urls')),  # Prévisions et analyses IA
     path('api/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('admin/', admin.site.urls),
+    path('metrics', metrics_view, name='metrics'),  # Scrape Prometheus
     path('media/<path:path>', serve, {'document_root': settings.MEDIA_ROOT}),
 ]
 